@@ -1,21 +1,95 @@
+import os
+from typing import NamedTuple
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from .database import get_db
-from .models import User
+from .models import User, UserRole
 from .utils.jwt_handler import verify_token
+from .utils.ttl_cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
+# Verified token -> claims, and user id -> identity; both bounded and short-lived
+_token_cache = TTLCache(
+    maxsize=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("AUTH_TOKEN_CACHE_TTL", "300")),
+)
+_user_cache = TTLCache(
+    maxsize=int(os.getenv("AUTH_USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("AUTH_USER_CACHE_TTL", "60")),
+)
+
+
+class CurrentUser(NamedTuple):
+    id: int
+    email: str
+    role: UserRole
+
+
+class TokenIdentity(NamedTuple):
+    id: int
+    role: UserRole
+
+
+def invalidate_user(user_id: int):
+    """Drop a cached identity; call it after writing users with Core (User.__table__ statements)."""
+    _user_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User):
+    invalidate_user(target.id)
+
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    payload = verify_token(token)
-    if not payload or "sub" not in payload:
+@event.listens_for(Session, "do_orm_execute")
+def _users_bulk_changed(orm_execute_state):
+    # query(User).update()/delete() and update(User) skip the mapper events and do not
+    # say which rows they touch, so every cached identity goes
+    state = orm_execute_state
+    if (state.is_update or state.is_delete) and state.bind_mapper is User.__mapper__:
+        _user_cache.clear()
+
+
+def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    claims = _token_cache.get(token)
+    if claims is None:
+        claims = verify_token(token)
+        if not claims or "sub" not in claims:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        # Never serve a token from cache past its own expiry
+        _token_cache.set(token, claims, expires_at=claims.get("exp"))
+    return claims
+
+
+def get_token_identity(claims: dict = Depends(get_token_claims)) -> TokenIdentity:
+    """User id and role straight from the verified token, without touching the database."""
+    try:
+        return TokenIdentity(id=int(claims["sub"]), role=UserRole(claims["role"]))
+    except (KeyError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == int(payload["sub"])).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
 
+def require_role(*roles: UserRole):
+    def dependency(identity: TokenIdentity = Depends(get_token_identity)) -> TokenIdentity:
+        if identity.role not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed for this role")
+        return identity
+
+    return dependency
+
+
+def get_current_user(claims: dict = Depends(get_token_claims), db: Session = Depends(get_db)) -> CurrentUser:
+    user_id = int(claims["sub"])
+    user = _user_cache.get(user_id)
+    if user is None:
+        row = db.query(User.id, User.email, User.role).filter(User.id == user_id).first()
+        if not row:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        user = CurrentUser(*row)
+        _user_cache.set(user_id, user)
+    return user
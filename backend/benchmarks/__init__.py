@@ -0,0 +1,7 @@
+"""
+Synthetic campus data and the hot-path benchmark suite.
+
+    python -m backend.benchmarks.generate --students 10000   # into DATABASE_URL
+    python -m backend.benchmarks.run --scales 1000,10000 --output bench.json
+    python -m backend.benchmarks.run --compare baseline.json bench.json
+"""
@@ -0,0 +1,263 @@
+"""
+Deterministic synthetic campus for benchmarks.
+
+generate() bulk-loads users, students with skills, faculty, companies, opportunities,
+applications and notifications into an empty database; the same seed and scale always
+give the same rows. Skill popularity follows a Zipf law (the skill of rank k is drawn
+with weight 1 / k ** ZIPF_EXPONENT), so a few skills are held by most students and a
+long tail by a handful, as on a real campus; applications are skewed towards popular
+opportunities the same way. Every user's password is PASSWORD.
+
+    DATABASE_URL=sqlite:///./bench.db python -m backend.benchmarks.generate --students 10000
+"""
+import argparse
+import bisect
+import itertools
+import random
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..database import SessionLocal
+from ..migrations import upgrade
+from ..services.search import reindex_opportunities, reindex_students
+from ..services.skills import skill_key
+from ..utils.password import hash_password
+
+PASSWORD = "benchmark"
+ZIPF_EXPONENT = 1.1
+# Students per transaction
+CHUNK_SIZE = 5000
+
+# The most popular skills, in rank order; the tail is "Skill <rank>"
+BASE_SKILLS = [
+    "Python", "Java", "JavaScript", "SQL", "C++", "Git", "HTML", "CSS", "React", "Machine Learning",
+    "Data Structures and Algorithms", "Linux", "C", "Node.js", "Django", "TypeScript", "Docker", "Flask",
+    "Pandas", "Deep Learning", "Spring Boot", "Android", "Kotlin", "MongoDB", "PostgreSQL", "AWS",
+    "TensorFlow", "Computer Vision", "Go", "Kubernetes", "Figma", "Rust", "Natural Language Processing",
+    "Excel", "Power BI", "MATLAB", "Embedded Systems", "Verilog", "AutoCAD", "Blockchain",
+]
+BRANCHES = ["CSE", "IT", "ECE", "EEE", "ME", "CE", "AI&DS"]
+DEPARTMENTS = ["Computer Science", "Electronics", "Mechanical", "Civil", "Mathematics"]
+APPLICATION_STATUSES = [models.ApplicationStatus.applied] * 6 + [
+    models.ApplicationStatus.shortlisted,
+    models.ApplicationStatus.rejected,
+]
+
+
+class Scale(NamedTuple):
+    students: int
+    skills: int
+    opportunities: int
+    faculty: int
+    companies: int
+    skills_per_student: int  # upper bound; each student gets 1..this many
+    applications_per_student: int  # average
+    notifications_per_user: int  # average
+
+    @classmethod
+    def for_students(cls, students: int, **overrides) -> "Scale":
+        """Proportions of a mid-sized college, scaled to `students`."""
+        scale = cls(
+            students=students,
+            skills=max(len(BASE_SKILLS), int(5 * students**0.5)),
+            opportunities=max(10, students // 10),
+            faculty=max(5, students // 50),
+            companies=max(5, students // 100),
+            skills_per_student=10,
+            applications_per_student=3,
+            notifications_per_user=10,
+        )
+        return scale._replace(**{name: value for name, value in overrides.items() if value is not None})
+
+
+class _Zipf:
+    """Draws distinct ranks 0..n-1 with weight 1 / (rank + 1) ** exponent."""
+
+    def __init__(self, n: int, exponent: float = ZIPF_EXPONENT):
+        self.n = n
+        self._cumulative = list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(n)))
+
+    def sample(self, rng: random.Random, k: int) -> List[int]:
+        k = min(k, self.n)
+        total = self._cumulative[-1]
+        picked = {}
+        while len(picked) < k:
+            picked[bisect.bisect(self._cumulative, rng.random() * total)] = None
+        return list(picked)
+
+
+def skill_name(rank: int) -> str:
+    return BASE_SKILLS[rank] if rank < len(BASE_SKILLS) else f"Skill {rank}"
+
+
+def _insert(db: Session, model, rows: Sequence[dict]) -> List[int]:
+    if not rows:
+        return []
+    return db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows).all()
+
+
+def _users(db: Session, role: models.UserRole, emails: List[str], password_hash: str) -> List[int]:
+    return _insert(db, models.User, [{"email": email, "password": password_hash, "role": role} for email in emails])
+
+
+def generate(db: Session, scale: Scale, seed: int = 0, log=None) -> Dict[str, int]:
+    """Load a synthetic campus into an empty, migrated database; returns row counts per table."""
+    if db.query(models.User.id).first() is not None:
+        raise ValueError("The database already has users; generate into a fresh one")
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    # One hash for everyone: hashing per user would dominate generation time
+    password_hash = hash_password(PASSWORD)
+    counts = Counter()
+
+    names = [skill_name(rank) for rank in range(scale.skills)]
+    skill_ids = _insert(db, models.Skill, [{"name": name, "name_key": skill_key(name)} for name in names])
+    skills = _Zipf(len(skill_ids))
+    counts["skills"] = len(skill_ids)
+
+    faculty_users = _users(
+        db, models.UserRole.faculty, [f"faculty{i}@bench.example" for i in range(scale.faculty)], password_hash
+    )
+    faculty_ids = _insert(
+        db,
+        models.Faculty,
+        [
+            {"user_id": user_id, "name": f"Faculty {i}", "department": DEPARTMENTS[i % len(DEPARTMENTS)]}
+            for i, user_id in enumerate(faculty_users)
+        ],
+    )
+    company_users = _users(
+        db, models.UserRole.company, [f"company{i}@bench.example" for i in range(scale.companies)], password_hash
+    )
+    company_ids = _insert(
+        db,
+        models.Company,
+        [
+            {"user_id": user_id, "name": f"Company {i}", "description": f"Recruiter {i}"}
+            for i, user_id in enumerate(company_users)
+        ],
+    )
+    counts["faculty"], counts["companies"] = len(faculty_ids), len(company_ids)
+
+    opportunities, links = [], []
+    for i in range(scale.opportunities):
+        required = skills.sample(rng, rng.randint(1, 5))
+        by_faculty = rng.random() < 0.6
+        opportunities.append(
+            {
+                "title": f"{skill_name(required[0])} {'Project' if by_faculty else 'Internship'} {i}",
+                "creator_name": f"Faculty {i % scale.faculty}" if by_faculty else f"Company {i % scale.companies}",
+                "type": models.OpportunityType.project if by_faculty else models.OpportunityType.internship,
+                "min_cgpa": rng.choice([0, 6, 6.5, 7, 7.5, 8, 8.5]),
+                "faculty_id": rng.choice(faculty_ids) if by_faculty else None,
+                "company_id": None if by_faculty else rng.choice(company_ids),
+                "is_internal": by_faculty,
+            }
+        )
+        links.append(required)
+    opportunity_ids = _insert(db, models.Opportunity, opportunities)
+    db.execute(
+        insert(models.OpportunitySkill),
+        [
+            {"opportunity_id": opportunity_id, "skill_id": skill_ids[rank]}
+            for opportunity_id, ranks in zip(opportunity_ids, links)
+            for rank in ranks
+        ],
+    )
+    reindex_opportunities(db, opportunity_ids)
+    counts["opportunities"] = len(opportunity_ids)
+    counts["opportunity_skills"] = sum(map(len, links))
+    popular_opportunities = _Zipf(len(opportunity_ids))
+    db.commit()
+    log(f"{counts['skills']} skills, {counts['opportunities']} opportunities")
+
+    for start in range(0, scale.students, CHUNK_SIZE):
+        numbers = range(start, min(start + CHUNK_SIZE, scale.students))
+        user_ids = _users(
+            db, models.UserRole.student, [f"student{i}@bench.example" for i in numbers], password_hash
+        )
+        student_ids = _insert(
+            db,
+            models.Student,
+            [
+                {
+                    "user_id": user_id,
+                    "name": f"Student {i}",
+                    "branch": rng.choice(BRANCHES),
+                    "year": rng.randint(1, 4),
+                    "cgpa": round(rng.uniform(5, 10), 2),
+                    "interests": [skill_name(rank) for rank in skills.sample(rng, 2)],
+                }
+                for i, user_id in zip(numbers, user_ids)
+            ],
+        )
+        student_skills, applications, notifications, unread = [], [], [], []
+        for student_id, user_id in zip(student_ids, user_ids):
+            for rank in skills.sample(rng, rng.randint(1, scale.skills_per_student)):
+                student_skills.append(
+                    {"student_id": student_id, "skill_id": skill_ids[rank], "level": rng.randint(1, 5)}
+                )
+            applied = popular_opportunities.sample(rng, rng.randint(0, 2 * scale.applications_per_student))
+            for rank in applied:
+                applications.append(
+                    {
+                        "student_id": student_id,
+                        "opportunity_id": opportunity_ids[rank],
+                        "status": rng.choice(APPLICATION_STATUSES),
+                    }
+                )
+            messages = rng.randint(0, 2 * scale.notifications_per_user)
+            # Older notifications are mostly read
+            read = int(messages * rng.uniform(0.5, 1))
+            notifications.extend(
+                {"user_id": user_id, "message": f"Update {n} for student {student_id}", "is_read": n < read}
+                for n in range(messages)
+            )
+            if messages > read:
+                unread.append({"user_id": user_id, "unread": messages - read})
+        db.execute(insert(models.StudentSkill), student_skills)
+        if applications:
+            db.execute(insert(models.Application), applications)
+        if notifications:
+            db.execute(insert(models.Notification), notifications)
+        if unread:
+            db.execute(insert(models.NotificationCounter), unread)
+        reindex_students(db, student_ids)
+        db.commit()
+        counts["students"] += len(student_ids)
+        counts["student_skills"] += len(student_skills)
+        counts["applications"] += len(applications)
+        counts["notifications"] += len(notifications)
+        log(f"{counts['students']}/{scale.students} students")
+
+    counts["users"] = len(faculty_users) + len(company_users) + counts["students"]
+    return dict(counts)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Load a synthetic campus into a fresh DATABASE_URL")
+    parser.add_argument("--students", type=int, required=True)
+    parser.add_argument("--skills", type=int, default=None, help="default: 5 * sqrt(students)")
+    parser.add_argument("--opportunities", type=int, default=None, help="default: students / 10")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    upgrade()
+    scale = Scale.for_students(args.students, skills=args.skills, opportunities=args.opportunities)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        counts = generate(db, scale, args.seed, log=print)
+    finally:
+        db.close()
+    print(", ".join(f"{count} {table}" for table, count in counts.items()))
+    print(f"generated in {time.perf_counter() - start:.1f}s; every password is {PASSWORD!r}")
+
+
+if __name__ == "__main__":
+    main()
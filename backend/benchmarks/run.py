@@ -0,0 +1,585 @@
+"""
+Benchmarks of the hot request paths at several data scales.
+
+Each scale runs in its own process against a freshly generated SQLite database, since
+the engine binds DATABASE_URL at import. Requests go through the ASGI app in process
+(TestClient), so latencies include routing, validation and serialization but no
+network. Per endpoint the report holds latency percentiles, SQL statements per request
+(the background notification writer excluded) and the peak of Python allocations
+during one request; tracemalloc slows everything down, so peaks come from a separate
+pass. Request parameters are drawn from a seeded generator, so two runs issue the same
+requests. Settings such as ASYNC_DB, BCRYPT_ROUNDS or RESPONSE_CACHE_BYTES are taken
+from the environment and recorded in the report.
+
+Storms send their requests from --concurrency clients at once (httpx.AsyncClient on the
+app's event loop, asyncio.gather) and report throughput and latency, plus the latency
+of GET / probes sent meanwhile: a route blocking the event loop shows up there. With
+--db-modes sync,async every scale runs once per ASYNC_DB setting and the storms'
+throughput is compared side by side.
+
+    python -m backend.benchmarks.run --scales 1000,10000 --output bench.json
+    python -m backend.benchmarks.run --compare baseline.json bench.json
+    python -m backend.benchmarks.run --scales 10000 --only read_storm --db-modes sync,async
+    python -m backend.benchmarks.run --scales 1000 --opportunities 10000 --only opportunity_all,opportunity_page
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from sqlalchemy import event, func
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Both compare modes flag a metric that grew by more than this fraction...
+DEFAULT_THRESHOLD = 0.25
+# ...and by more than these absolute amounts, so noise on tiny values is ignored
+MIN_LATENCY_DELTA_MS = 0.2
+MIN_SQL_DELTA = 0.5
+MIN_MEMORY_DELTA_KIB = 64
+
+# Requests per endpoint in the memory pass
+MEMORY_SAMPLES = 10
+REPORTED_ENV = ("ASYNC_DB", "BCRYPT_ROUNDS", "RESPONSE_CACHE_BYTES", "DB_PROFILE", "DB_POOL_SIZE")
+
+# Project root, so child processes can import the backend package
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class Endpoint(NamedTuple):
+    name: str
+    # Fraction of --requests; logins are bcrypt-bound and teams write projects
+    share: float
+    description: str
+
+
+ENDPOINTS = [
+    Endpoint("matching", 1, "GET /matching/{student_id}?limit=20, fit scores already cached"),
+    Endpoint("matching_cold", 0.5, "GET /matching/{student_id}?limit=20 for students never scored"),
+    Endpoint("opportunity_all", 1, "GET /opportunity/all, the full list"),
+    Endpoint("opportunity_page", 1, "GET /opportunity/all?limit=50 from a random cursor"),
+    Endpoint("student_profile", 1, "GET /student/{id}"),
+    Endpoint("team_auto_generate", 0.25, "POST /team/auto-generate with three popular-skill roles"),
+    # At --scales 5000 this is the optimal solver over twenty roles and a 5k-student pool
+    Endpoint("team_20_roles", 0.1, "POST /team/auto-generate with twenty popular-skill roles"),
+    Endpoint("apply", 1, "POST /applications/apply for a pair that has not applied"),
+    Endpoint("login", 0.1, "POST /login"),
+    Endpoint("notifications", 1, "GET /notifications/{user_id}?limit=20"),
+    Endpoint("search", 1, "GET /search/opportunities?q=<skill prefix>"),
+    Endpoint("skills_suggest", 1, "GET /skills/suggest?q=<skill prefix>"),
+]
+
+
+class Storm(NamedTuple):
+    name: str
+    workload: str  # endpoint whose requests are sent
+    share: float
+    description: str
+
+
+STORMS = [
+    Storm("login_storm", "login", 0.25, "POST /login from --concurrency clients at once"),
+    Storm("read_storm", "reads", 1, "matching, profile, catalog page and notification reads, all at once"),
+]
+# ASYNC_DB value per --db-modes name
+DB_MODES = {"sync": "0", "async": "1"}
+DEFAULT_CONCURRENCY = 32
+# Seconds between GET / probes during a storm
+PROBE_INTERVAL = 0.01
+
+Request = Tuple[str, str, Optional[dict]]  # (method, url, json body)
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of unsorted values."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+# Worker: one scale in this process
+
+
+class _SqlCounter:
+    def __init__(self, engines):
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self)
+
+    def __call__(self, *args):
+        if threading.current_thread().name != "notification-writer":
+            self.count += 1
+
+
+def _workloads(db, rng: random.Random) -> Dict[str, Callable[[], Request]]:
+    """Per endpoint, a function returning the next request to send."""
+    from .. import models
+    from ..utils.cursor import encode_cursor
+    from .generate import PASSWORD
+
+    student_ids = [student_id for (student_id,) in db.query(models.Student.id).order_by(models.Student.id)]
+    student_users = dict(db.query(models.Student.id, models.Student.user_id))
+    emails = [email for (email,) in db.query(models.User.email).filter(models.User.role == models.UserRole.student)]
+    faculty_ids = [faculty_id for (faculty_id,) in db.query(models.Faculty.id)]
+    opportunity_ids = [opportunity_id for (opportunity_id,) in db.query(models.Opportunity.id)]
+    applied = set(db.query(models.Application.student_id, models.Application.opportunity_id))
+    # Skills by popularity, as users would type them
+    popular = [
+        name
+        for name, _ in db.query(models.Skill.name, models.Skill.id)
+        .join(models.StudentSkill, models.StudentSkill.skill_id == models.Skill.id)
+        .group_by(models.Skill.id)
+        .order_by(func.count().desc(), models.Skill.id)
+        .limit(50)
+    ] or ["Python"]
+    db.rollback()
+
+    shuffled = rng.sample(student_ids, len(student_ids))
+    # A few students are scored over and over; the rest once each, from scratch (small scales cycle)
+    warm, cold = shuffled[:20], itertools.cycle(shuffled[20:] or shuffled)
+
+    def prefix():
+        name = rng.choice(popular)
+        return quote(name[: rng.randint(1, min(4, len(name)))])
+
+    def application():
+        while True:
+            pair = (rng.choice(student_ids), rng.choice(opportunity_ids))
+            if pair not in applied:
+                applied.add(pair)
+                return "POST", "/applications/apply", {"student_id": pair[0], "opportunity_id": pair[1]}
+
+    teams = iter(range(1, 10**9))
+
+    def team(size: int):
+        # Large teams repeat skills, as several roles can ask for the same one
+        roles = rng.sample(popular[:10], min(size, len(popular))) if size <= 3 else rng.choices(popular[:10], k=size)
+        return (
+            "POST",
+            "/team/auto-generate",
+            {
+                "faculty_id": rng.choice(faculty_ids),
+                "title": f"Benchmark team {next(teams)}",
+                "required_roles": [{"role": f"Role {i}", "skill_name": name} for i, name in enumerate(roles)],
+            },
+        )
+
+    workloads = {
+        "matching": lambda: ("GET", f"/matching/{rng.choice(warm)}?limit=20", None),
+        "matching_cold": lambda: ("GET", f"/matching/{next(cold)}?limit=20", None),
+        "opportunity_all": lambda: ("GET", "/opportunity/all", None),
+        "opportunity_page": lambda: (
+            "GET",
+            f"/opportunity/all?limit=50&cursor={encode_cursor(rng.choice(opportunity_ids))}",
+            None,
+        ),
+        "student_profile": lambda: ("GET", f"/student/{rng.choice(student_ids)}", None),
+        "team_auto_generate": lambda: team(3),
+        "team_20_roles": lambda: team(20),
+        "apply": application,
+        "login": lambda: ("POST", "/login", {"email": rng.choice(emails), "password": PASSWORD}),
+        "notifications": lambda: ("GET", f"/notifications/{student_users[rng.choice(student_ids)]}?limit=20", None),
+        "search": lambda: ("GET", f"/search/opportunities?q={prefix()}", None),
+        "skills_suggest": lambda: ("GET", f"/skills/suggest?q={prefix()}", None),
+    }
+    # The routes ASYNC_DB moves to the async engine
+    reads = [workloads[name] for name in ("matching", "student_profile", "opportunity_page", "notifications")]
+    workloads["reads"] = lambda: rng.choice(reads)()
+    return workloads
+
+
+def _measure(client, next_request: Callable[[], Request], requests: int, warmup: int, sql: _SqlCounter) -> dict:
+    latencies, statements, errors, first_error = [], [], 0, None
+    for i in range(warmup + requests):
+        method, url, body = next_request()
+        sql_before = sql.count
+        start = time.perf_counter()
+        response = client.request(method, url, json=body)
+        elapsed = time.perf_counter() - start
+        if i < warmup:
+            continue
+        latencies.append(elapsed * 1000)
+        statements.append(sql.count - sql_before)
+        if response.status_code >= 400:
+            errors += 1
+            first_error = first_error or f"{method} {url}: {response.status_code} {response.text[:200]}"
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(MEMORY_SAMPLES):
+            method, url, body = next_request()
+            tracemalloc.reset_peak()
+            client.request(method, url, json=body)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        "requests": requests,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p90_ms": round(percentile(latencies, 90), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "max_ms": round(max(latencies), 3),
+        "sql_per_request": round(sum(statements) / len(statements), 2),
+        "peak_kib": round(peak / 1024, 1),
+        "errors": errors,
+    }
+    if first_error:
+        result["first_error"] = first_error
+    return result
+
+
+async def _storm(app, next_request: Callable[[], Request], requests: int, concurrency: int) -> dict:
+    """Send requests with at most `concurrency` in flight, probing GET / until they are done."""
+    import httpx
+
+    batch = [next_request() for _ in range(requests)]
+    slots = asyncio.Semaphore(concurrency)
+    latencies, probes, failures = [], [], []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def send(method, url, body):
+            async with slots:
+                start = time.perf_counter()
+                response = await client.request(method, url, json=body)
+                latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                failures.append(f"{method} {url}: {response.status_code} {response.text[:200]}")
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/")
+                probes.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        prober = asyncio.ensure_future(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(send(*request) for request in batch))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+
+    result = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p90_ms": round(percentile(latencies, 90), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "probe_p50_ms": round(percentile(probes, 50), 3),
+        "probe_p99_ms": round(percentile(probes, 99), 3),
+        "errors": len(failures),
+    }
+    if failures:
+        result["first_error"] = failures[0]
+    return result
+
+
+def run_scale(
+    students: int,
+    seed: int,
+    requests: int,
+    warmup: int,
+    only: Optional[List[str]] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    opportunities: Optional[int] = None,
+) -> dict:
+    """Generate a campus into DATABASE_URL and benchmark it; call in a fresh process."""
+    start = time.perf_counter()
+    from ..main import app
+
+    import_seconds = time.perf_counter() - start
+    from fastapi.testclient import TestClient
+
+    from ..database import SessionLocal, async_engine, engine
+    from ..migrations import upgrade
+    from ..utils.response_cache import response_cache
+    from .generate import Scale, generate
+
+    upgrade()
+    scale = Scale.for_students(students, opportunities=opportunities)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rows = generate(db, scale, seed)
+        generate_seconds = time.perf_counter() - start
+        workloads = _workloads(db, random.Random(seed))
+    finally:
+        db.close()
+
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    sql = _SqlCounter(engines)
+    endpoints = {}
+    start = time.perf_counter()
+    with TestClient(app) as client:
+        startup_seconds = time.perf_counter() - start
+        for endpoint in ENDPOINTS:
+            if only and endpoint.name not in only:
+                continue
+            count = max(1, round(requests * endpoint.share))
+            endpoints[endpoint.name] = _measure(
+                client, workloads[endpoint.name], count, max(1, round(warmup * endpoint.share)), sql
+            )
+        storms = {}
+        for storm in STORMS:
+            if only and storm.name not in only:
+                continue
+            count = max(1, round(requests * storm.share))
+            # On the portal's loop, where the app's lifespan and async engine live
+            storms[storm.name] = client.portal.call(_storm, app, workloads[storm.workload], count, concurrency)
+    report = {
+        "scale": scale._asdict(),
+        "rows": rows,
+        "generate_seconds": round(generate_seconds, 2),
+        "import_seconds": round(import_seconds, 3),
+        "startup_seconds": round(startup_seconds, 3),
+        "response_cache": response_cache.stats(),
+        "endpoints": endpoints,
+        "storms": storms,
+    }
+    if resource is not None:
+        # KiB on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report["maxrss_mib"] = round(maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return report
+
+
+# Parent: one child process per scale
+
+
+def run(
+    scales: List[int],
+    seed: int,
+    requests: int,
+    warmup: int,
+    only: Optional[List[str]] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    db_modes: Optional[List[str]] = None,
+    opportunities: Optional[int] = None,
+) -> dict:
+    """Benchmark every scale in a child process; with db_modes, once per ASYNC_DB setting.
+
+    Scales are keyed by student count, or "<students>:<mode>" when db_modes is given.
+    """
+    runs = [(str(students), students, {}) for students in scales]
+    if db_modes:
+        runs = [
+            (f"{students}:{mode}", students, {"ASYNC_DB": DB_MODES[mode]}) for students in scales for mode in db_modes
+        ]
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+            "cpus": os.cpu_count(),
+            "seed": seed,
+            "requests": requests,
+            "concurrency": concurrency,
+            "opportunities": opportunities,
+            "env": {name: os.environ[name] for name in REPORTED_ENV if name in os.environ},
+        },
+        "scales": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="campus-bench-") as directory:
+        for key, students, mode_env in runs:
+            name = key.replace(":", "_")
+            output = os.path.join(directory, f"scale_{name}.json")
+            database_url = f"sqlite:///{os.path.join(directory, f'campus_{name}.db')}"
+            env = {**os.environ, **mode_env, "DATABASE_URL": database_url}
+            command = [sys.executable, "-m", "backend.benchmarks.run", "--worker", output]
+            command += ["--scales", str(students), "--seed", str(seed), "--requests", str(requests)]
+            command += ["--warmup", str(warmup), "--concurrency", str(concurrency)]
+            command += ["--only", ",".join(only)] if only else []
+            command += ["--opportunities", str(opportunities)] if opportunities else []
+            print(f"scale {key}: generating and measuring...", file=sys.stderr)
+            subprocess.run(command, cwd=_ROOT, env=env, check=True)
+            with open(output) as f:
+                report["scales"][key] = json.load(f)
+    return report
+
+
+def _scale_label(key: str) -> str:
+    students, _, mode = key.partition(":")
+    return f"{students} students" + (f", {mode} DB" if mode else "")
+
+
+def print_report(report: dict):
+    for key, result in report["scales"].items():
+        print(
+            f"\n{_scale_label(key)}: generated in {result['generate_seconds']}s, "
+            f"import {result['import_seconds']}s, startup {result['startup_seconds']}s, "
+            f"max RSS {result.get('maxrss_mib', '?')} MiB"
+        )
+        if result["endpoints"]:
+            print(
+                f"  {'endpoint':<20}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'SQL/req':>9}{'peak KiB':>10}{'errors':>8}"
+            )
+        for name, metrics in result["endpoints"].items():
+            print(
+                f"  {name:<20}{metrics['p50_ms']:>9.2f}{metrics['p90_ms']:>9.2f}{metrics['p99_ms']:>9.2f}"
+                f"{metrics['sql_per_request']:>9.2f}{metrics['peak_kib']:>10.1f}{metrics['errors']:>8}"
+            )
+            if "first_error" in metrics:
+                print(f"    first error: {metrics['first_error']}")
+        if result.get("storms"):
+            print(f"  {'storm':<20}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'probe p99':>10}{'errors':>8}")
+        for name, metrics in result.get("storms", {}).items():
+            print(
+                f"  {name:<20}{metrics['throughput_rps']:>9.1f}{metrics['p50_ms']:>9.2f}{metrics['p90_ms']:>9.2f}"
+                f"{metrics['p99_ms']:>9.2f}{metrics['probe_p99_ms']:>10.2f}{metrics['errors']:>8}"
+            )
+            if "first_error" in metrics:
+                print(f"    first error: {metrics['first_error']}")
+    _print_db_modes(report)
+
+
+def _print_db_modes(report: dict):
+    """Storm throughput of each scale's sync and async runs, side by side."""
+    by_scale: Dict[str, Dict[str, dict]] = {}
+    for key, result in report["scales"].items():
+        students, _, mode = key.partition(":")
+        if mode:
+            by_scale.setdefault(students, {})[mode] = result.get("storms", {})
+    for students, modes in by_scale.items():
+        if not {"sync", "async"} <= modes.keys():
+            continue
+        print(f"\n{students} students, sync vs async DB (concurrency {report['meta'].get('concurrency')})")
+        print(f"  {'storm':<20}{'sync req/s':>12}{'async req/s':>13}{'change':>9}")
+        for name, sync in modes["sync"].items():
+            other = modes["async"].get(name)
+            if other is None:
+                continue
+            change = (other["throughput_rps"] / sync["throughput_rps"] - 1) * 100
+            print(f"  {name:<20}{sync['throughput_rps']:>12.1f}{other['throughput_rps']:>13.1f}{change:>+8.0f}%")
+
+
+# Compare mode
+
+_CHECKS = [
+    # (metric, minimum absolute growth)
+    ("p50_ms", MIN_LATENCY_DELTA_MS),
+    ("p90_ms", MIN_LATENCY_DELTA_MS),
+    ("sql_per_request", MIN_SQL_DELTA),
+    ("peak_kib", MIN_MEMORY_DELTA_KIB),
+]
+_STORM_CHECKS = [
+    ("p90_ms", MIN_LATENCY_DELTA_MS),
+    ("probe_p99_ms", MIN_LATENCY_DELTA_MS),
+]
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Regressions of current against baseline, one line each."""
+    regressions = []
+    for students, result in current["scales"].items():
+        base_result = baseline["scales"].get(students)
+        if base_result is None:
+            continue
+        for name, metrics in result["endpoints"].items():
+            base = base_result["endpoints"].get(name)
+            if base is None:
+                continue
+            for metric, min_delta in _CHECKS:
+                before, after = base[metric], metrics[metric]
+                if after > before * (1 + threshold) and after - before > min_delta:
+                    change = f"+{(after / before - 1) * 100:.0f}%" if before else "new"
+                    regressions.append(f"{students} students, {name}: {metric} {before} -> {after} ({change})")
+            if metrics["errors"] > base["errors"]:
+                regressions.append(f"{students} students, {name}: errors {base['errors']} -> {metrics['errors']}")
+        for name, metrics in result.get("storms", {}).items():
+            base = base_result.get("storms", {}).get(name)
+            if base is None:
+                continue
+            for metric, min_delta in _STORM_CHECKS:
+                before, after = base[metric], metrics[metric]
+                if after > before * (1 + threshold) and after - before > min_delta:
+                    change = f"+{(after / before - 1) * 100:.0f}%" if before else "new"
+                    regressions.append(f"{students} students, {name}: {metric} {before} -> {after} ({change})")
+            before, after = base["throughput_rps"], metrics["throughput_rps"]
+            if after < before * (1 - threshold):
+                change = f"{(after / before - 1) * 100:.0f}%"
+                regressions.append(f"{students} students, {name}: throughput_rps {before} -> {after} ({change})")
+    return regressions
+
+
+def _report_regressions(baseline: dict, current: dict, threshold: float) -> int:
+    if not set(baseline["scales"]) & set(current["scales"]):
+        print("The reports have no scale in common; rerun with the baseline's --scales")
+        return 1
+    regressions = compare(baseline, current, threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regressions against the baseline (threshold {threshold:.0%})")
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the hot request paths at several data scales")
+    parser.add_argument("--scales", default="1000,10000", help="comma-separated student counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint (some send fewer)")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests per endpoint first")
+    parser.add_argument("--only", default=None, help="comma-separated endpoint or storm names")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="clients in flight during storms")
+    parser.add_argument("--opportunities", type=int, default=None, help="default: students / 10")
+    parser.add_argument("--db-modes", default=None, help="e.g. sync,async: run each scale once per ASYNC_DB setting")
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    parser.add_argument("--baseline", default=None, help="after the run, flag regressions against this report")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="relative growth flagged")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="only compare two reports")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    only = args.only.split(",") if args.only else None
+    unknown = set(only or ()) - {endpoint.name for endpoint in ENDPOINTS} - {storm.name for storm in STORMS}
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    db_modes = args.db_modes.split(",") if args.db_modes else None
+    if set(db_modes or ()) - DB_MODES.keys():
+        parser.error(f"--db-modes takes {', '.join(DB_MODES)}")
+
+    if args.compare:
+        with open(args.compare[0]) as f, open(args.compare[1]) as g:
+            raise SystemExit(_report_regressions(json.load(f), json.load(g), args.threshold))
+
+    scales = [int(value) for value in args.scales.split(",")]
+    if args.worker:
+        result = run_scale(scales[0], args.seed, args.requests, args.warmup, only, args.concurrency, args.opportunities)
+        with open(args.worker, "w") as f:
+            json.dump(result, f)
+        return
+
+    report = run(scales, args.seed, args.requests, args.warmup, only, args.concurrency, db_modes, args.opportunities)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nreport written to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            raise SystemExit(_report_regressions(json.load(f), report, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
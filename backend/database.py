@@ -1,17 +1,128 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
 
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+# Engine profile: "sqlite" (PRAGMA tuning) or "server" (pool tuning); defaults from the URL
+DB_PROFILE = os.getenv("DB_PROFILE", "sqlite" if DATABASE_URL.startswith("sqlite") else "server")
+
+# Applied to every new SQLite connection. WAL lets readers run alongside a writer and
+# busy_timeout makes a second writer wait for the lock instead of failing at once.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative means KiB rather than pages
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "65536")),
+    "foreign_keys": "ON",
+}
+
+
+def _engine_options(profile: str, url: str) -> dict:
+    if url.startswith("sqlite") and (url.endswith(":memory:") or url.rstrip("/").endswith(":")):
+        # In-memory databases use a single-connection pool without these knobs
+        return {}
+    options = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    }
+    if profile == "server":
+        options["pool_pre_ping"] = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+        options["pool_recycle"] = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    elif profile != "sqlite":
+        raise ValueError(f"Unknown DB_PROFILE {profile!r}")
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _configure(sync_engine):
+    if DB_PROFILE == "sqlite" and sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+
+
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **_engine_options(DB_PROFILE, DATABASE_URL))
+_configure(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+# Optional async engine for the read-heavy routes (aiosqlite locally, asyncpg for Postgres)
+ASYNC_DB = os.getenv("ASYNC_DB", "0") == "1"
+
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+def create_async_session_factory(url: str):
+    """(engine, sessionmaker) for AsyncSessions on url, tuned like the sync engine."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    options = _engine_options(DB_PROFILE, url)
+    if options and url.startswith("sqlite"):
+        # aiosqlite defaults to NullPool, i.e. a new connection and thread per session
+        options["poolclass"] = AsyncAdaptedQueuePool
+    async_engine = create_async_engine(url, connect_args=connect_args, **options)
+    _configure(async_engine.sync_engine)
+    return async_engine, async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB:
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", async_database_url(DATABASE_URL))
+    async_engine, AsyncSessionLocal = create_async_session_factory(ASYNC_DATABASE_URL)
+
+
+def _pool_stats(pool) -> dict:
+    stats = {"pool": type(pool).__name__}
+    # Only QueuePool-style pools keep counters
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    return stats
+
+
+def pool_stats() -> dict:
+    """Connection pool counters for monitoring."""
+    stats = {"profile": DB_PROFILE, "engine": _pool_stats(engine.pool)}
+    if async_engine is not None:
+        stats["async_engine"] = _pool_stats(async_engine.sync_engine.pool)
+    return stats
+
+
+def dialect_insert(db, model):
+    """INSERT construct for the session's dialect, so ON CONFLICT clauses are available."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return insert(model)
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -19,3 +130,30 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    """Session for async routes: an AsyncSession when ASYNC_DB=1, else a plain Session.
+
+    Routes call into it through run_db(), so the same code runs in both modes.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+
+async def run_db(db, fn, *args, **kwargs):
+    """Run fn(session, *args, **kwargs) without blocking the event loop.
+
+    On an AsyncSession the sync code runs via run_sync, awaiting the async driver for
+    every statement; on a plain Session it runs in the threadpool.
+    """
+    if isinstance(db, Session):
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+    return await db.run_sync(fn, *args, **kwargs)
+
@@ -1,7 +1,11 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import engine, Base
+from .database import async_engine, pool_stats, SessionLocal
+from .migrations import check_schema_version, upgrade
 from .routes import (
     auth_routes,
     student,
@@ -12,11 +16,41 @@ from .routes import (
     matching,
     team,
     notification,
+    bulk_import,
+    search,
+    skills,
 )
+from .services.notification import notification_queue
+from .services.resume_parser import shutdown_extract_pool
+from .services.skill_index import skill_index
+from .services.skill_lexicon import skill_lexicon
+from .utils.cursor import NEXT_CURSOR_HEADER
+from .utils.response_cache import response_cache
+
+# Development convenience; deployments run `python -m backend.migrations` once instead
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "0") == "1"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if AUTO_MIGRATE:
+        upgrade()
+    check_schema_version()
+    db = SessionLocal()
+    try:
+        skill_index.build(db)
+        skill_lexicon.build(db)
+    finally:
+        db.close()
+    notification_queue.start()
+    yield
+    notification_queue.stop()
+    shutdown_extract_pool()
+    if async_engine is not None:
+        await async_engine.dispose()
 
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Campus Opportunity Platform", version="1.0.0")
+app = FastAPI(title="Campus Opportunity Platform", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +61,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 app.include_router(auth_routes.router, tags=["auth"])
@@ -38,9 +73,21 @@ app.include_router(application.router, prefix="/applications", tags=["applicatio
 app.include_router(matching.router, prefix="/matching", tags=["matching"])
 app.include_router(team.router, prefix="/team", tags=["team"])
 app.include_router(notification.router, prefix="/notifications", tags=["notifications"])
+app.include_router(bulk_import.router, prefix="/import", tags=["import"])
+app.include_router(search.router, prefix="/search", tags=["search"])
+app.include_router(skills.router, prefix="/skills", tags=["skills"])
 
 
 @app.get("/")
 def read_root():
     return {"status": "ok", "message": "Campus AI Opportunity API"}
 
+
+@app.get("/health/db")
+def database_health():
+    return pool_stats()
+
+
+@app.get("/health/cache")
+def response_cache_health():
+    return response_cache.stats()
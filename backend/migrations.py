@@ -0,0 +1,281 @@
+"""
+Versioned schema migrations.
+
+Run once per deploy, before starting workers:
+
+    python -m backend.migrations            # upgrade to the latest version
+    python -m backend.migrations --status   # print current and latest version
+    python -m backend.migrations --new-cache-epoch  # invalidate every ETag, e.g. after a restore
+
+Workers do not touch the schema: at startup they only confirm the version with a
+single query (check_schema_version) and refuse to boot against an outdated database.
+Each migration runs in its own transaction and records its version in schema_version.
+"""
+import argparse
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, bindparam, func, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from . import models
+from .database import Base, engine
+from .services import search
+from .services.skills import skill_key
+from .utils.response_cache import new_epoch
+
+logger = logging.getLogger(__name__)
+
+_meta = MetaData()
+schema_version = Table(
+    "schema_version",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _create_tables(conn: Connection, *tables: Table):
+    Base.metadata.create_all(conn, tables=list(tables), checkfirst=True)
+
+
+def _create_indexes(conn: Connection, *tables: Table):
+    """Create the tables' indexes that do not exist yet; create_all skips existing tables."""
+    for table in tables:
+        for index in table.indexes:
+            # IF NOT EXISTS rather than checkfirst: reflection cannot see expression indexes
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _add_missing_columns(conn: Connection, table: Table):
+    """ALTER in nullable model columns that an older database was created without."""
+    existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    for column in table.columns:
+        if column.name not in existing:
+            if not column.nullable:
+                raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name}")
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+            logger.info("Added column %s.%s", table.name, column.name)
+
+
+def _v1_baseline(conn: Connection):
+    # The tables the project started with; a pre-existing app.db already has them
+    _create_tables(
+        conn,
+        models.User.__table__,
+        models.Student.__table__,
+        models.Faculty.__table__,
+        models.Company.__table__,
+        models.Skill.__table__,
+        models.StudentSkill.__table__,
+        models.Opportunity.__table__,
+        models.OpportunitySkill.__table__,
+        models.Application.__table__,
+        models.Project.__table__,
+        models.Team.__table__,
+        models.Notification.__table__,
+    )
+
+
+def _drop_duplicate_links(conn: Connection, link: Table, owner: str, skill_id: int):
+    """Keep the lowest-id link per owner to skill_id; student links keep the highest level among them."""
+    if "level" in link.c:
+        other = link.alias()
+        highest = (
+            select(func.max(other.c.level))
+            .where(other.c.skill_id == skill_id, other.c[owner] == link.c[owner])
+            .scalar_subquery()
+        )
+        conn.execute(link.update().where(link.c.skill_id == skill_id).values(level=highest))
+    kept = select(func.min(link.c.id)).where(link.c.skill_id == skill_id).group_by(link.c[owner])
+    conn.execute(link.delete().where(link.c.skill_id == skill_id, link.c.id.not_in(kept)))
+
+
+def _merge_skills(conn: Connection, duplicates: Dict[int, List[int]]):
+    """Fold each list of skill ids into the id it is keyed by, repointing every link.
+
+    A student or opportunity linked to several of the spellings ends up with one link.
+    """
+    links = ((models.StudentSkill.__table__, "student_id"), (models.OpportunitySkill.__table__, "opportunity_id"))
+    for keep_id, drop_ids in duplicates.items():
+        for link, owner in links:
+            conn.execute(link.update().where(link.c.skill_id.in_(drop_ids)).values(skill_id=keep_id))
+            _drop_duplicate_links(conn, link, owner, keep_id)
+        conn.execute(models.Skill.__table__.delete().where(models.Skill.id.in_(drop_ids)))
+    if duplicates:
+        # Cached scores may name the merged-away spellings; they are recomputed on demand
+        conn.execute(models.FitScore.__table__.delete())
+        logger.info("Merged %d duplicate skill names", len(duplicates))
+
+
+def _merge_duplicate_skills(conn: Connection):
+    """Fold skills differing only by case into the lowest id, so the unique key can be built."""
+    duplicates = conn.execute(
+        select(func.lower(models.Skill.name), func.min(models.Skill.id))
+        .group_by(func.lower(models.Skill.name))
+        .having(func.count() > 1)
+    ).all()
+    _merge_skills(
+        conn,
+        {
+            keep_id: conn.scalars(
+                select(models.Skill.id).where(func.lower(models.Skill.name) == key, models.Skill.id != keep_id)
+            ).all()
+            for key, keep_id in duplicates
+        },
+    )
+
+
+def _v2_matching_and_inbox(conn: Connection):
+    _create_tables(conn, models.FitScore.__table__, models.NotificationCounter.__table__)
+    _merge_duplicate_skills(conn)
+    _create_indexes(conn, models.FitScore.__table__, models.Notification.__table__)
+    # The skill key as first built; version 9 replaces it with the name_key column
+    conn.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS ux_skills_name_key ON skills (lower(name))")
+
+
+def _v3_student_skill_lookup(conn: Connection):
+    _create_indexes(conn, models.StudentSkill.__table__)
+
+
+def _v4_applicant_queue(conn: Connection):
+    _create_indexes(conn, models.Application.__table__)
+
+
+def _v5_search_index(conn: Connection):
+    # Databases created before the profile JSON columns lack them; the student documents read them
+    _add_missing_columns(conn, models.Student.__table__)
+    _create_tables(conn, models.SearchTerm.__table__)
+    _create_indexes(conn, models.SearchTerm.__table__)
+    if search.fts5_supported(conn):
+        search.create_fts_tables(conn)
+    # The session joins this connection's transaction
+    with Session(bind=conn) as db:
+        search.reindex_opportunities(db, db.scalars(select(models.Opportunity.id)).all())
+        search.reindex_students(db, db.scalars(select(models.Student.id)).all())
+
+
+def _v6_skill_aliases(conn: Connection):
+    _create_tables(conn, models.SkillAlias.__table__)
+
+
+def _v7_skill_holders(conn: Connection):
+    _create_indexes(conn, models.StudentSkill.__table__)
+
+
+def _v8_cache_versions(conn: Connection):
+    _create_tables(conn, models.CacheVersion.__table__)
+
+
+def _v9_skill_name_key(conn: Connection):
+    if "name_key" not in {column["name"] for column in inspect(conn).get_columns("skills")}:
+        conn.exec_driver_sql("ALTER TABLE skills ADD COLUMN name_key VARCHAR NOT NULL DEFAULT ''")
+    # Keys are folded in Python, so names that lower() left apart ("Éclair", "éclair") can collide
+    ids_by_key: Dict[str, List[int]] = {}
+    for skill_id, name in conn.execute(select(models.Skill.id, models.Skill.name).order_by(models.Skill.id)):
+        ids_by_key.setdefault(skill_key(name), []).append(skill_id)
+    _merge_skills(conn, {ids[0]: ids[1:] for ids in ids_by_key.values() if len(ids) > 1})
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ux_skills_name_key")
+    if ids_by_key:
+        conn.execute(
+            models.Skill.__table__.update().where(models.Skill.id == bindparam("skill_id")),
+            [{"skill_id": ids[0], "name_key": key} for key, ids in ids_by_key.items()],
+        )
+    _create_indexes(conn, models.Skill.__table__)
+
+
+def _v10_cache_epoch(conn: Connection):
+    with Session(bind=conn) as db:
+        new_epoch(db)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline schema", _v1_baseline),
+    Migration(2, "fit score cache, unread counters, skill key and inbox indexes", _v2_matching_and_inbox),
+    Migration(3, "student skill lookup index", _v3_student_skill_lookup),
+    Migration(4, "applicant queue index", _v4_applicant_queue),
+    Migration(5, "student profile columns, full-text search index", _v5_search_index),
+    Migration(6, "skill aliases", _v6_skill_aliases),
+    Migration(7, "skill holder index", _v7_skill_holders),
+    Migration(8, "response cache versions", _v8_cache_versions),
+    Migration(9, "skill keys folded in Python", _v9_skill_name_key),
+    Migration(10, "response cache epoch", _v10_cache_epoch),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn: Connection) -> Optional[int]:
+    """Applied schema version, or None for a database that was never migrated."""
+    try:
+        return conn.execute(select(func.max(schema_version.c.version))).scalar()
+    except (OperationalError, ProgrammingError):
+        # No schema_version table yet
+        conn.rollback()
+        return None
+
+
+def upgrade(bind: Engine = engine, target: int = LATEST_VERSION) -> int:
+    """Apply every pending migration up to target; returns the resulting version."""
+    with bind.begin() as conn:
+        _meta.create_all(conn, checkfirst=True)
+        version = current_version(conn) or 0
+    for migration in MIGRATIONS:
+        if version < migration.version <= target:
+            logger.info("Applying migration %d: %s", migration.version, migration.description)
+            with bind.begin() as conn:
+                migration.upgrade(conn)
+                conn.execute(
+                    schema_version.insert().values(version=migration.version, description=migration.description)
+                )
+            version = migration.version
+    return version
+
+
+def check_schema_version(bind: Engine = engine):
+    """Fail fast when the database is not at LATEST_VERSION; costs one query."""
+    with bind.connect() as conn:
+        version = current_version(conn)
+    if version != LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {LATEST_VERSION}; "
+            "run `python -m backend.migrations` first"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--status", action="store_true", help="only print current and latest version")
+    parser.add_argument("--target", type=int, default=LATEST_VERSION, help="upgrade up to this version")
+    parser.add_argument(
+        "--new-cache-epoch", action="store_true", help="invalidate every ETag, e.g. after restoring a backup"
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.new_cache_epoch:
+        with Session(engine) as db:
+            new_epoch(db)
+            db.commit()
+        print("response cache epoch renewed")
+        return
+
+    if args.status:
+        with engine.connect() as conn:
+            print(f"current: {current_version(conn)}, latest: {LATEST_VERSION}")
+        return
+    print(f"schema version: {upgrade(target=args.target)}")
+
+
+if __name__ == "__main__":
+    main()
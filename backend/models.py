@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, Boolean, Enum, Text, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Boolean, Enum, Text, JSON, Index
 from sqlalchemy.orm import relationship
 import enum
 
@@ -76,11 +76,26 @@ class Skill(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
+    # services.skills.skill_key(name), folded in Python: SQLite's lower() only folds ASCII
+    name_key = Column(String, nullable=False)
 
     student_skills = relationship("StudentSkill", back_populates="skill")
     opportunity_skills = relationship("OpportunitySkill", back_populates="skill")
 
 
+Index("ux_skills_name_key", Skill.name_key, unique=True)
+
+
+class SkillAlias(Base):
+    """Another spelling of a skill ("js" for JavaScript), resolved to the skill on write."""
+
+    __tablename__ = "skill_aliases"
+
+    # Case-folded like the skill key
+    alias = Column(String, primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), nullable=False)
+
+
 class StudentSkill(Base):
     __tablename__ = "student_skills"
 
@@ -93,6 +108,12 @@ class StudentSkill(Base):
     skill = relationship("Skill", back_populates="student_skills")
 
 
+# Per-student skill lookups (profile, fit scores, bulk import upserts)
+Index("ix_student_skills_student_skill", StudentSkill.student_id, StudentSkill.skill_id)
+# Holders of a skill (team formation, ranking students for an opportunity)
+Index("ix_student_skills_skill", StudentSkill.skill_id)
+
+
 class OpportunityType(str, enum.Enum):
     internship = "internship"
     project = "project"
@@ -145,6 +166,27 @@ class Application(Base):
     opportunity = relationship("Opportunity", back_populates="applications")
 
 
+# An opportunity's applicants (review queue) and the one-application-per-student check
+Index("ix_applications_opportunity_student", Application.opportunity_id, Application.student_id)
+
+
+class FitScore(Base):
+    """Materialized matching_engine output per (student, opportunity) pair."""
+
+    __tablename__ = "fit_scores"
+
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    opportunity_id = Column(Integer, ForeignKey("opportunities.id"), primary_key=True, index=True)
+    fit_score = Column(Float, nullable=False)
+    eligible = Column(Boolean, nullable=False)
+    missing_skills = Column(JSON, nullable=False)
+    reason = Column(String, nullable=True)
+
+
+# Serves /matching/{student_id} ordering (fit_score desc, opportunity_id) straight from the index
+Index("ix_fit_scores_student_rank", FitScore.student_id, FitScore.fit_score.desc(), FitScore.opportunity_id)
+
+
 class Project(Base):
     __tablename__ = "projects"
 
@@ -178,3 +220,39 @@ class Notification(Base):
 
     user = relationship("User", back_populates="notifications")
 
+
+# Inbox pages walk (user_id, id) in reverse without sorting
+Index("ix_notifications_user_id_id", Notification.user_id, Notification.id)
+
+
+class NotificationCounter(Base):
+    """Maintained unread count per user, so badges never scan notifications."""
+
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)
+
+
+class SearchTerm(Base):
+    """Weighted term postings for full-text search where SQLite FTS5 is unavailable."""
+
+    __tablename__ = "search_terms"
+
+    doc_type = Column(String, primary_key=True)
+    term = Column(String, primary_key=True)
+    doc_id = Column(Integer, primary_key=True)
+    weight = Column(Float, nullable=False)
+
+
+# Rewriting one document's terms
+Index("ix_search_terms_doc", SearchTerm.doc_type, SearchTerm.doc_id)
+
+
+class CacheVersion(Base):
+    """Version counter of a cached entity, e.g. "student:5"; bumped by every write to it."""
+
+    __tablename__ = "cache_versions"
+
+    entity = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from .. import schemas, models
 from ..database import get_db
-from ..services.notification import create_notification
+from ..services.application_review import ALLOWED_TRANSITIONS, list_applicants, set_application_status
+from ..services.notification import notification_queue
+from ..utils.cursor import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 
 router = APIRouter()
 
@@ -31,8 +35,8 @@ def apply(payload: schemas.ApplicationCreate, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(application)
 
-    create_notification(
-        db,
+    # Written by the background notification worker, outside this request's transaction
+    notification_queue.enqueue(
         user_id=student.user_id,
         message=f"You applied to {opportunity.title}",
     )
@@ -62,3 +66,52 @@ def list_student_applications(student_id: int, db: Session = Depends(get_db)):
         for app in applications
     ]
 
+
+def _get_opportunity(db: Session, opportunity_id: int) -> models.Opportunity:
+    opportunity = db.query(models.Opportunity).filter(models.Opportunity.id == opportunity_id).first()
+    if not opportunity:
+        raise HTTPException(status_code=404, detail="Opportunity not found")
+    return opportunity
+
+
+@router.get("/opportunity/{opportunity_id}", response_model=list[schemas.ApplicantOut])
+def list_opportunity_applicants(
+    opportunity_id: int,
+    response: Response,
+    status: Optional[schemas.ApplicationStatus] = Query(None),
+    sort: schemas.ApplicantSort = Query(schemas.ApplicantSort.fit),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; all applicants when omitted"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: Session = Depends(get_db),
+):
+    """Review queue: an opportunity's applicants with their fit score, best fit first by default."""
+    opportunity = _get_opportunity(db, opportunity_id)
+    by_fit = sort == schemas.ApplicantSort.fit
+    applicants = list_applicants(
+        db,
+        opportunity,
+        status=models.ApplicationStatus(status.value) if status else None,
+        sort=sort.value,
+        limit=limit,
+        after=decode_cursor(cursor, *((float, int) if by_fit else (int,))),
+    )
+    if limit is not None and len(applicants) == limit:
+        last = applicants[-1]
+        key = (last["fit_score"], last["application_id"]) if by_fit else (last["application_id"],)
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key)
+    return applicants
+
+
+@router.post("/opportunity/{opportunity_id}/status", response_model=schemas.ApplicationStatusUpdateOut)
+def update_applicant_status(
+    opportunity_id: int,
+    payload: schemas.ApplicationStatusUpdate,
+    db: Session = Depends(get_db),
+):
+    """Shortlist or reject many applications at once; each moved applicant is notified."""
+    status = models.ApplicationStatus(payload.status.value)
+    if status not in ALLOWED_TRANSITIONS:
+        raise HTTPException(status_code=400, detail="Applications can only be shortlisted or rejected")
+    opportunity = _get_opportunity(db, opportunity_id)
+    updated, skipped = set_application_status(db, opportunity, payload.application_ids, status)
+    return schemas.ApplicationStatusUpdateOut(status=payload.status, updated=updated, skipped=skipped)
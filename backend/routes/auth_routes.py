@@ -1,21 +1,27 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from .. import schemas, models
-from ..database import get_db
-from ..utils.password import hash_password, verify_password
+from ..database import get_async_db, run_db
+from ..services.search import reindex_students
+from ..utils.password import hash_password_async, verify_and_update_async
 from ..utils.jwt_handler import create_access_token
 
 router = APIRouter()
 
 
-@router.post("/register", response_model=schemas.Token)
-def register(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == user_in.email).first()
-    if existing:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+def _email_registered(db: Session, email: str) -> bool:
+    registered = db.query(models.User.id).filter(models.User.email == email).first() is not None
+    # End the read transaction so no pooled connection is held while hashing
+    db.rollback()
+    return registered
+
 
-    user = models.User(email=user_in.email, password=hash_password(user_in.password), role=user_in.role)
+def _create_user(db: Session, user_in: schemas.UserCreate, password_hash: str) -> tuple:
+    """Create the user and profile; returns (id, role)."""
+    user = models.User(email=user_in.email, password=password_hash, role=user_in.role)
     db.add(user)
     db.commit()
     db.refresh(user)
@@ -31,6 +37,8 @@ def register(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
             cgpa=user_in.cgpa,
         )
         db.add(student)
+        db.flush()
+        reindex_students(db, [student.id])
     elif user_in.role == models.UserRole.faculty:
         if not (user_in.name and user_in.department):
             raise HTTPException(status_code=400, detail="Faculty details required")
@@ -43,16 +51,43 @@ def register(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
         db.add(company)
 
     db.commit()
+    return user.id, user.role
 
-    token = create_access_token({"sub": str(user.id), "role": user.role})
+
+@router.post("/register", response_model=schemas.Token)
+async def register(user_in: schemas.UserCreate, db: Session = Depends(get_async_db)):
+    if await run_db(db, _email_registered, user_in.email):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+    password_hash = await hash_password_async(user_in.password)
+    user_id, role = await run_db(db, _create_user, user_in, password_hash)
+    token = create_access_token({"sub": str(user_id), "role": role})
     return schemas.Token(access_token=token)
 
 
+def _load_credentials(db: Session, email: str) -> Optional[tuple]:
+    """(id, role, password hash) of the user with this email."""
+    row = db.query(models.User.id, models.User.role, models.User.password).filter(models.User.email == email).first()
+    # End the read transaction so no pooled connection is held while hashing
+    db.rollback()
+    return tuple(row) if row else None
+
+
+def _update_password_hash(db: Session, user_id: int, password_hash: str):
+    db.query(models.User).filter(models.User.id == user_id).update({"password": password_hash})
+    db.commit()
+
+
 @router.post("/login", response_model=schemas.Token)
-def login(credentials: schemas.UserLogin, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == credentials.email).first()
-    if not user or not verify_password(credentials.password, user.password):
+async def login(credentials: schemas.UserLogin, db: Session = Depends(get_async_db)):
+    found = await run_db(db, _load_credentials, credentials.email)
+    if not found:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    user_id, role, stored_hash = found
+    valid, new_hash = await verify_and_update_async(credentials.password, stored_hash)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    token = create_access_token({"sub": str(user.id), "role": user.role})
+    if new_hash:
+        # Stored hash used a different bcrypt cost; upgrade it transparently
+        await run_db(db, _update_password_hash, user_id, new_hash)
+    token = create_access_token({"sub": str(user_id), "role": role})
     return schemas.Token(access_token=token)
-
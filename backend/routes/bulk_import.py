@@ -0,0 +1,42 @@
+import io
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from ..database import get_db
+from ..services.bulk_import import DEFAULT_CHUNK_SIZE, import_rows, read_rows
+
+router = APIRouter()
+
+_FORMATS_BY_SUFFIX = {
+    ".csv": schemas.ImportFormat.csv,
+    ".jsonl": schemas.ImportFormat.jsonl,
+    ".ndjson": schemas.ImportFormat.jsonl,
+}
+
+
+@router.post("/{kind}", response_model=schemas.ImportReportOut)
+def bulk_import(
+    kind: schemas.ImportKind,
+    file: UploadFile = File(..., description="CSV with a header row, or one JSON object per line"),
+    format: Optional[schemas.ImportFormat] = Query(None, description="Defaults from the file extension"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=10000, description="Rows per transaction"),
+    db: Session = Depends(get_db),
+):
+    """Stream a file of users, student skills or opportunities into the database.
+
+    Rows are committed chunk by chunk; rejected rows are listed with their row number.
+    """
+    if format is None:
+        suffix = "." + (file.filename or "").rsplit(".", 1)[-1].lower()
+        format = _FORMATS_BY_SUFFIX.get(suffix)
+        if format is None:
+            raise HTTPException(status_code=400, detail="Cannot tell the file format; pass format=csv or format=jsonl")
+    # The upload is spooled to disk, so it is read row by row rather than held in memory
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return import_rows(db, kind, read_rows(stream, format), chunk_size).out()
+    finally:
+        stream.detach()
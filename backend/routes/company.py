@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from .. import models
-from ..database import get_db
+from ..database import get_async_db, get_db, run_db
+from ..utils.response_cache import cached_json
 
 router = APIRouter()
 
@@ -24,10 +25,13 @@ def create_company(user_id: int, name: str, description: str = "", db: Session =
     return {"id": company.id, "name": company.name, "description": company.description}
 
 
-@router.get("/{id}")
-def get_company(id: int, db: Session = Depends(get_db)):
+def _load_company(db: Session, id: int) -> dict:
     company = db.query(models.Company).filter(models.Company.id == id).first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     return {"id": company.id, "name": company.name, "description": company.description}
 
+
+@router.get("/{id}")
+async def get_company(id: int, request: Request, db: Session = Depends(get_async_db)):
+    return await cached_json(request, db, ("company", id), lambda: run_db(db, _load_company, id))
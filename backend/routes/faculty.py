@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from .. import schemas, models
-from ..database import get_db
+from ..database import get_async_db, get_db, run_db
+from ..utils.response_cache import cached_json
 
 router = APIRouter()
 
@@ -24,10 +25,13 @@ def create_faculty(user_id: int, name: str, department: str, db: Session = Depen
     return {"id": faculty.id, "name": faculty.name, "department": faculty.department}
 
 
-@router.get("/{id}")
-def get_faculty(id: int, db: Session = Depends(get_db)):
+def _load_faculty(db: Session, id: int) -> dict:
     faculty = db.query(models.Faculty).filter(models.Faculty.id == id).first()
     if not faculty:
         raise HTTPException(status_code=404, detail="Faculty not found")
     return {"id": faculty.id, "name": faculty.name, "department": faculty.department}
 
+
+@router.get("/{id}")
+async def get_faculty(id: int, request: Request, db: Session = Depends(get_async_db)):
+    return await cached_json(request, db, ("faculty", id), lambda: run_db(db, _load_faculty, id))
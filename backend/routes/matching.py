@@ -1,23 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
-from ..database import get_db
-from ..services.matching_engine import calculate_fit_score
+from ..database import get_async_db, run_db
+from ..services.fit_score_cache import get_student_fit_scores
+from ..services.matching_engine import rank_students
+from ..utils.cursor import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 
 router = APIRouter()
 
 
-@router.get("/{student_id}", response_model=list[schemas.MatchResult])
-def get_matches(student_id: int, db: Session = Depends(get_db)):
+def _rank_candidates(db: Session, opportunity_id: int, limit: int, min_score: float):
+    opportunity = db.query(models.Opportunity).filter(models.Opportunity.id == opportunity_id).first()
+    if not opportunity:
+        raise HTTPException(status_code=404, detail="Opportunity not found")
+    return rank_students(db, opportunity, limit=limit, min_score=min_score)
+
+
+@router.get("/opportunity/{opportunity_id}", response_model=list[schemas.CandidateMatch])
+async def get_candidates(
+    opportunity_id: int,
+    limit: int = Query(50, ge=1, le=500, description="Number of top students to return"),
+    min_score: float = Query(0, ge=0, le=100, description="Only return students scoring at least this"),
+    db: Session = Depends(get_async_db),
+):
+    return await run_db(db, _rank_candidates, opportunity_id, limit, min_score)
+
+
+def _student_matches(db: Session, student_id: int, **filters):
     student = db.query(models.Student).filter(models.Student.id == student_id).first()
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    opportunities = db.query(models.Opportunity).all()
-    if not opportunities:
-        return []
-    results = [calculate_fit_score(db, student, opp) for opp in opportunities]
-    # Sort by fit_score descending (best matches first)
-    results.sort(key=lambda x: x["fit_score"], reverse=True)
-    return results
+    # Sorted by fit_score descending (best matches first), ties by opportunity_id
+    return get_student_fit_scores(db, student, **filters)
+
 
+@router.get("/{student_id}", response_model=list[schemas.MatchResult])
+async def get_matches(
+    student_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; all matches when omitted"),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    eligible_only: bool = Query(False),
+    type: Optional[schemas.OpportunityType] = Query(None),
+    is_internal: Optional[bool] = Query(None),
+    db: Session = Depends(get_async_db),
+):
+    results = await run_db(
+        db,
+        _student_matches,
+        student_id,
+        limit=limit,
+        offset=offset,
+        after=decode_cursor(cursor, float, int),
+        eligible_only=eligible_only,
+        type=type,
+        is_internal=is_internal,
+    )
+    if limit is not None and len(results) == limit:
+        last = results[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last["fit_score"], last["opportunity_id"])
+    return results
@@ -1,25 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
-from ..database import get_db
+from ..database import SessionLocal, get_async_db, run_db
+from ..services.notification import mark_read, unread_count
+from ..services.notification_bus import notification_bus
+from ..utils.cursor import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 
 router = APIRouter()
 
 
-@router.get("/{user_id}", response_model=list[schemas.NotificationOut])
-def list_notifications(user_id: int, db: Session = Depends(get_db)):
+def _list_notifications(db: Session, user_id: int, limit: Optional[int], before: Optional[tuple], unread_only: bool):
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    notifs = db.query(models.Notification).filter(models.Notification.user_id == user_id).order_by(models.Notification.id.desc()).all()
+
+    # Newest first, walking the (user_id, id) index
+    query = db.query(models.Notification).filter(models.Notification.user_id == user_id)
+    if unread_only:
+        query = query.filter(models.Notification.is_read.is_(False))
+    if before is not None:
+        query = query.filter(models.Notification.id < before[0])
+    query = query.order_by(models.Notification.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
     return [
         schemas.NotificationOut(
             id=notif.id,
             message=notif.message,
             is_read=notif.is_read,
         )
-        for notif in notifs
+        for notif in query.all()
     ]
 
+
+@router.get("/{user_id}", response_model=list[schemas.NotificationOut])
+async def list_notifications(
+    user_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; all notifications when omitted"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    unread_only: bool = Query(False),
+    db: Session = Depends(get_async_db),
+):
+    notifs = await run_db(db, _list_notifications, user_id, limit, decode_cursor(cursor, int), unread_only)
+    if limit is not None and len(notifs) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(notifs[-1].id)
+    return notifs
+
+
+@router.get("/{user_id}/unread-count", response_model=schemas.UnreadCountOut)
+async def get_unread_count(user_id: int, db: Session = Depends(get_async_db)):
+    return schemas.UnreadCountOut(unread=await run_db(db, unread_count, user_id))
+
+
+def _mark_read(db: Session, user_id: int, up_to_id: int) -> int:
+    mark_read(db, user_id, up_to_id)
+    return unread_count(db, user_id)
+
+
+@router.post("/{user_id}/mark-read", response_model=schemas.UnreadCountOut)
+async def mark_notifications_read(
+    user_id: int,
+    up_to_id: int = Query(..., description="Mark every notification with id <= up_to_id as read"),
+    db: Session = Depends(get_async_db),
+):
+    return schemas.UnreadCountOut(unread=await run_db(db, _mark_read, user_id, up_to_id))
+
+
+KEEPALIVE_SECONDS = 15
+
+
+def _load_since(user_id: int, last_id: int):
+    db = SessionLocal()
+    try:
+        notifs = (
+            db.query(models.Notification)
+            .filter(models.Notification.user_id == user_id, models.Notification.id > last_id)
+            .order_by(models.Notification.id)
+            .all()
+        )
+        return [
+            {"id": n.id, "user_id": n.user_id, "message": n.message, "is_read": n.is_read}
+            for n in notifs
+        ]
+    finally:
+        db.close()
+
+
+def _sse(notif: dict) -> str:
+    data = json.dumps({"id": notif["id"], "message": notif["message"], "is_read": notif["is_read"]})
+    return f"id: {notif['id']}\nevent: notification\ndata: {data}\n\n"
+
+
+@router.get("/{user_id}/stream")
+async def stream_notifications(
+    user_id: int,
+    request: Request,
+    last_id: Optional[int] = Query(None, description="Resume after this notification id"),
+    last_event_id: Optional[int] = Header(None),
+):
+    """Server-Sent Events stream of new notifications.
+
+    Live delivery comes from the in-process bus without touching the database. On
+    reconnect, pass the last seen id (Last-Event-ID header or last_id) to replay what
+    was missed; the database is only read when the bus history does not cover it.
+    """
+    resume_from = last_event_id if last_event_id is not None else last_id
+
+    async def events():
+        # Subscribe before replaying so nothing published in between is missed
+        subscriber = notification_bus.subscribe(user_id)
+        try:
+            sent = -1
+            if resume_from is not None:
+                backlog = notification_bus.since(user_id, resume_from)
+                if backlog is None:
+                    backlog = await run_in_threadpool(_load_since, user_id, resume_from)
+                for notif in backlog:
+                    sent = notif["id"]
+                    yield _sse(notif)
+            while not await request.is_disconnected():
+                try:
+                    notif = await asyncio.wait_for(subscriber.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if notif is None:
+                    # Fell too far behind; the client reconnects with its last id
+                    break
+                if notif["id"] > sent:
+                    sent = notif["id"]
+                    yield _sse(notif)
+        finally:
+            notification_bus.unsubscribe(subscriber)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -1,9 +1,16 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
 
 from .. import schemas, models
-from ..database import get_db
+from ..database import get_async_db, get_db, run_db
+from ..services.fit_score_cache import refresh_opportunity_fit_scores
+from ..services.search import reindex_opportunities
+from ..services.skill_index import skill_index
+from ..services.skills import resolve_skills, skill_key
+from ..utils.cursor import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from ..utils.response_cache import cached_json, response_cache
 
 router = APIRouter()
 
@@ -50,21 +57,20 @@ def create_opportunity(payload: schemas.OpportunityCreate, db: Session = Depends
         is_internal=payload.is_internal,
     )
     db.add(opportunity)
-    db.commit()
-    db.refresh(opportunity)
+    db.flush()
 
-    required_names = []
-    for skill_name in payload.required_skills:
-        skill = db.query(models.Skill).filter(models.Skill.name.ilike(skill_name)).first()
-        if not skill:
-            skill = models.Skill(name=skill_name)
-            db.add(skill)
-            db.commit()
-            db.refresh(skill)
-        link = models.OpportunitySkill(opportunity_id=opportunity.id, skill_id=skill.id)
-        db.add(link)
-        required_names.append(skill.name)
+    skills = resolve_skills(db, payload.required_skills)
+    if skills:
+        db.execute(
+            insert(models.OpportunitySkill),
+            [{"opportunity_id": opportunity.id, "skill_id": skill.id} for skill in skills],
+        )
+    required_names = [skill.name for skill in skills]
+    refresh_opportunity_fit_scores(db, opportunity, [name.lower() for name in required_names])
+    reindex_opportunities(db, [opportunity.id])
+    response_cache.invalidate(db, ("opportunities",))
     db.commit()
+    skill_index.set_opportunity_skills(opportunity.id, [skill.id for skill in skills])
     return schemas.OpportunityOut(
         id=opportunity.id,
         title=opportunity.title,
@@ -78,20 +84,48 @@ def create_opportunity(payload: schemas.OpportunityCreate, db: Session = Depends
     )
 
 
-@router.get("/all", response_model=list[schemas.OpportunityOut])
-def list_opportunities(
-    is_internal: Optional[bool] = Query(None, description="Filter by internal/external opportunities"),
-    db: Session = Depends(get_db),
+def _list_opportunities(
+    db: Session,
+    is_internal: Optional[bool],
+    type: Optional[schemas.OpportunityType],
+    cgpa: Optional[float],
+    company_id: Optional[int],
+    faculty_id: Optional[int],
+    skill: Optional[str],
+    limit: Optional[int],
+    after: Optional[tuple],
 ):
-    query = db.query(models.Opportunity)
-    
-    # Apply filter if provided
+    # Skills are loaded with two selectin queries per page instead of lazily per row
+    query = db.query(models.Opportunity).options(
+        selectinload(models.Opportunity.required_skills).selectinload(models.OpportunitySkill.skill)
+    )
+
+    # Apply filters if provided
     if is_internal is not None:
         query = query.filter(models.Opportunity.is_internal == is_internal)
-    
-    opportunities = query.all()
+    if type is not None:
+        query = query.filter(models.Opportunity.type == type)
+    if cgpa is not None:
+        query = query.filter(models.Opportunity.min_cgpa <= cgpa)
+    if company_id is not None:
+        query = query.filter(models.Opportunity.company_id == company_id)
+    if faculty_id is not None:
+        query = query.filter(models.Opportunity.faculty_id == faculty_id)
+    if skill:
+        query = query.filter(
+            models.Opportunity.required_skills.any(
+                models.OpportunitySkill.skill.has(models.Skill.name_key == skill_key(skill))
+            )
+        )
+
+    if after is not None:
+        query = query.filter(models.Opportunity.id > after[0])
+    query = query.order_by(models.Opportunity.id)
+    if limit is not None:
+        query = query.limit(limit)
+
     result = []
-    for opp in opportunities:
+    for opp in query.all():
         skills = [rs.skill.name for rs in opp.required_skills]
         result.append(
             schemas.OpportunityOut(
@@ -108,3 +142,32 @@ def list_opportunities(
         )
     return result
 
+
+@router.get("/all", response_model=list[schemas.OpportunityOut])
+async def list_opportunities(
+    request: Request,
+    is_internal: Optional[bool] = Query(None, description="Filter by internal/external opportunities"),
+    type: Optional[schemas.OpportunityType] = Query(None),
+    cgpa: Optional[float] = Query(None, ge=0, le=10, description="Only opportunities with min_cgpa <= cgpa"),
+    company_id: Optional[int] = Query(None),
+    faculty_id: Optional[int] = Query(None),
+    skill: Optional[str] = Query(None, description="Only opportunities requiring this skill"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; all opportunities when omitted"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: Session = Depends(get_async_db),
+):
+    after = decode_cursor(cursor, int)
+
+    def next_cursor(result) -> dict:
+        if limit is not None and len(result) == limit:
+            return {NEXT_CURSOR_HEADER: encode_cursor(result[-1].id)}
+        return {}
+
+    return await cached_json(
+        request,
+        db,
+        ("opportunities",),
+        lambda: run_db(db, _list_opportunities, is_internal, type, cgpa, company_id, faculty_id, skill, limit, after),
+        variant=(is_internal, type, cgpa, company_id, faculty_id, skill, limit, after),
+        headers=next_cursor,
+    )
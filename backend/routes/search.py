@@ -0,0 +1,102 @@
+from collections import defaultdict
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.orm import Session, selectinload
+
+from .. import schemas, models
+from ..database import get_async_db, run_db
+from ..services.search import DOC_OPPORTUNITY, DOC_STUDENT, search
+from ..utils.cursor import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+router = APIRouter()
+
+
+def _search_opportunities(db: Session, q: str, limit: int, after):
+    hits = search(db, DOC_OPPORTUNITY, q, limit, after)
+    opportunities = {
+        opp.id: opp
+        for opp in db.query(models.Opportunity)
+        .options(selectinload(models.Opportunity.required_skills).selectinload(models.OpportunitySkill.skill))
+        .filter(models.Opportunity.id.in_([doc_id for doc_id, _ in hits]))
+    }
+    return [
+        schemas.OpportunitySearchResult(
+            id=opp.id,
+            title=opp.title,
+            creator_name=opp.creator_name,
+            type=opp.type,
+            min_cgpa=opp.min_cgpa,
+            required_skills=[rs.skill.name for rs in opp.required_skills],
+            company_id=opp.company_id,
+            faculty_id=opp.faculty_id,
+            is_internal=opp.is_internal,
+            score=score,
+        )
+        for doc_id, score in hits
+        if (opp := opportunities.get(doc_id)) is not None
+    ]
+
+
+def _search_students(db: Session, q: str, limit: int, after):
+    hits = search(db, DOC_STUDENT, q, limit, after)
+    ids = [doc_id for doc_id, _ in hits]
+    skills = defaultdict(list)
+    for student_id, name in (
+        db.query(models.StudentSkill.student_id, models.Skill.name)
+        .join(models.Skill, models.Skill.id == models.StudentSkill.skill_id)
+        .filter(models.StudentSkill.student_id.in_(ids))
+    ):
+        skills[student_id].append(name)
+    students = {
+        student.id: student
+        for student in db.query(
+            models.Student.id, models.Student.name, models.Student.branch, models.Student.year, models.Student.cgpa
+        ).filter(models.Student.id.in_(ids))
+    }
+    return [
+        schemas.StudentSearchResult(
+            id=student.id,
+            name=student.name,
+            branch=student.branch,
+            year=student.year,
+            cgpa=student.cgpa,
+            skills=skills[student.id],
+            score=score,
+        )
+        for doc_id, score in hits
+        if (student := students.get(doc_id)) is not None
+    ]
+
+
+def _set_next_cursor(response: Response, results: list, limit: int):
+    if len(results) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(results[-1].score, results[-1].id)
+
+
+@router.get("/opportunities", response_model=list[schemas.OpportunitySearchResult])
+async def search_opportunities(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words in the title, creator or required skills"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: Session = Depends(get_async_db),
+):
+    """Opportunities matching every word of q (the last one as a prefix), best match first."""
+    results = await run_db(db, _search_opportunities, q, limit, decode_cursor(cursor, float, int))
+    _set_next_cursor(response, results, limit)
+    return results
+
+
+@router.get("/students", response_model=list[schemas.StudentSearchResult])
+async def search_students(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words in the name, skills or profile"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: Session = Depends(get_async_db),
+):
+    """Students matching every word of q (the last one as a prefix), best match first."""
+    results = await run_db(db, _search_students, q, limit, decode_cursor(cursor, float, int))
+    _set_next_cursor(response, results, limit)
+    return results
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from .. import schemas, models
+from ..database import SessionLocal, get_db
+from ..services.skill_lexicon import MAX_SUGGESTIONS, skill_lexicon
+from ..services.skills import skill_key
+
+router = APIRouter()
+
+
+def _build_lexicon():
+    db = SessionLocal()
+    try:
+        skill_lexicon.build(db)
+    finally:
+        db.close()
+
+
+@router.get("/suggest", response_model=list[schemas.SkillOut])
+async def suggest_skills(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+):
+    """Autocomplete: skills (or their aliases) starting with q, most used first, then close spellings."""
+    # Served from memory; the lexicon is normally built at startup
+    if not skill_lexicon.ready:
+        await run_in_threadpool(_build_lexicon)
+    return [schemas.SkillOut(id=skill_id, name=name) for skill_id, name in skill_lexicon.suggest(q, limit)]
+
+
+@router.post("/aliases", response_model=schemas.SkillAliasOut)
+def create_skill_alias(payload: schemas.SkillAliasCreate, db: Session = Depends(get_db)):
+    """Make another spelling resolve to an existing skill on every write path."""
+    alias = skill_key(payload.alias)
+    if not alias:
+        raise HTTPException(status_code=400, detail="Alias is empty")
+    skill = db.query(models.Skill).filter(models.Skill.name_key == skill_key(payload.skill_name)).first()
+    if not skill:
+        raise HTTPException(status_code=404, detail="Skill not found")
+    if db.query(models.Skill.id).filter(models.Skill.name_key == alias).first():
+        raise HTTPException(status_code=400, detail="A skill with this name already exists")
+    if db.get(models.SkillAlias, alias):
+        raise HTTPException(status_code=400, detail="Alias already exists")
+
+    db.add(models.SkillAlias(alias=alias, skill_id=skill.id))
+    db.commit()
+    skill_lexicon.add_alias(alias, skill.id)
+    return schemas.SkillAliasOut(alias=alias, skill_id=skill.id, skill_name=skill.name)
@@ -1,8 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, selectinload
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
 
 from .. import schemas, models
-from ..database import get_db
+from ..database import get_async_db, get_db, run_db
+from ..services.fit_score_cache import refresh_student_fit_scores
+from ..services.resume_parser import (
+    MAX_RESUME_BYTES,
+    SUPPORTED_SUFFIXES,
+    ResumeRejected,
+    add_extracted_skills,
+    extract_text_async,
+)
+from ..services.search import reindex_students
+from ..services.skill_automaton import skill_automaton
+from ..services.skills import resolve_skill
+from ..utils.response_cache import cached_json, response_cache
 
 router = APIRouter()
 
@@ -25,6 +42,8 @@ def create_student_profile(payload: schemas.StudentProfileCreate, db: Session =
         cgpa=payload.cgpa,
     )
     db.add(student)
+    db.flush()
+    reindex_students(db, [student.id])
     db.commit()
     db.refresh(student)
     return schemas.StudentOut(
@@ -32,10 +51,13 @@ def create_student_profile(payload: schemas.StudentProfileCreate, db: Session =
     )
 
 
-@router.get("/{id}", response_model=schemas.StudentOut)
-def get_student(id: int, db: Session = Depends(get_db)):
-    """Get full enriched student profile"""
-    student = db.query(models.Student).filter(models.Student.id == id).first()
+def _load_student(db: Session, id: int) -> schemas.StudentOut:
+    student = (
+        db.query(models.Student)
+        .options(selectinload(models.Student.skills).selectinload(models.StudentSkill.skill))
+        .filter(models.Student.id == id)
+        .first()
+    )
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     skills = [ss.skill.name for ss in student.skills]
@@ -53,6 +75,12 @@ def get_student(id: int, db: Session = Depends(get_db)):
     )
 
 
+@router.get("/{id}", response_model=schemas.StudentOut)
+async def get_student(id: int, request: Request, db: Session = Depends(get_async_db)):
+    """Get full enriched student profile"""
+    return await cached_json(request, db, ("student", id), lambda: run_db(db, _load_student, id))
+
+
 @router.put("/{id}/profile", response_model=schemas.StudentOut)
 def update_student_profile(id: int, payload: schemas.StudentProfileUpdate, db: Session = Depends(get_db)):
     """Update student enhanced profile (projects, certifications, interests, links)"""
@@ -70,6 +98,9 @@ def update_student_profile(id: int, payload: schemas.StudentProfileUpdate, db: S
     if payload.external_links is not None:
         student.external_links = payload.external_links
     
+    db.flush()
+    reindex_students(db, [student.id])
+    response_cache.invalidate(db, ("student", student.id))
     db.commit()
     db.refresh(student)
     
@@ -94,12 +125,7 @@ def add_skill(payload: schemas.StudentSkillCreate, db: Session = Depends(get_db)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    skill = db.query(models.Skill).filter(models.Skill.name.ilike(payload.skill_name)).first()
-    if not skill:
-        skill = models.Skill(name=payload.skill_name)
-        db.add(skill)
-        db.commit()
-        db.refresh(skill)
+    skill = resolve_skill(db, payload.skill_name)
 
     # Check for duplicate skill assignment
     existing = (
@@ -118,7 +144,110 @@ def add_skill(payload: schemas.StudentSkillCreate, db: Session = Depends(get_db)
 
     student_skill = models.StudentSkill(student_id=student.id, skill_id=skill.id, level=payload.level)
     db.add(student_skill)
+    db.flush()
+    refresh_student_fit_scores(db, student)
+    reindex_students(db, [student.id])
+    response_cache.invalidate(db, ("student", student.id))
     db.commit()
     db.refresh(student_skill)
     return {"message": "Skill added", "skill_id": skill.id, "level": payload.level}
 
+
+def _student_exists(db: Session, id: int) -> bool:
+    exists = db.query(models.Student.id).filter(models.Student.id == id).first() is not None
+    # End the read transaction so no pooled connection is held while the resume is parsed
+    db.rollback()
+    return exists
+
+
+def _add_resume_skills(db: Session, id: int, text: str) -> schemas.ResumeSkillsOut:
+    student = db.query(models.Student).filter(models.Student.id == id).first()
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    found = skill_automaton.get(db).find(text)
+    rows = add_extracted_skills(db, {student.id: found})
+    if rows:
+        refresh_student_fit_scores(db, student)
+        response_cache.invalidate(db, ("student", student.id))
+    db.commit()
+    names = dict(db.query(models.Skill.id, models.Skill.name).filter(models.Skill.id.in_(found)))
+    return schemas.ResumeSkillsOut(
+        student_id=student.id,
+        skills_found=[names[skill_id] for skill_id in found],
+        skills_added=[names[row["skill_id"]] for row in rows],
+    )
+
+
+# Room for the multipart boundaries and part headers around the resume itself
+_MULTIPART_OVERHEAD = 64 * 1024
+_RESUME_TOO_LARGE = HTTPException(status_code=413, detail=f"Resume larger than {MAX_RESUME_BYTES} bytes")
+
+
+async def _receive_resume(request: Request) -> Tuple[str, bytes]:
+    """Parse the multipart body as it arrives, giving up once it exceeds the resume limit.
+
+    UploadFile parameters would receive and spool the whole body before the route runs.
+    """
+    limit = MAX_RESUME_BYTES + _MULTIPART_OVERHEAD
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise _RESUME_TOO_LARGE
+
+    async def limited():
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > limit:
+                raise _RESUME_TOO_LARGE
+            yield chunk
+
+    try:
+        form = await MultiPartParser(request.headers, limited(), max_files=1, max_fields=0).parse()
+    except MultiPartException as exc:
+        raise HTTPException(status_code=400, detail=exc.message)
+    try:
+        file = form.get("file")
+        if not isinstance(file, StarletteUploadFile):
+            raise HTTPException(status_code=422, detail="Expected the resume in a multipart field named 'file'")
+        data = await file.read(MAX_RESUME_BYTES + 1)
+        if len(data) > MAX_RESUME_BYTES:
+            raise _RESUME_TOO_LARGE
+        return file.filename or "", data
+    finally:
+        await form.close()
+
+
+@router.post(
+    "/{id}/resume",
+    response_model=schemas.ResumeSkillsOut,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {
+                            "file": {
+                                "type": "string",
+                                "format": "binary",
+                                "description": f"Resume as {', '.join(SUPPORTED_SUFFIXES)}",
+                            }
+                        },
+                    }
+                }
+            },
+        }
+    },
+)
+async def upload_resume(id: int, request: Request, db: Session = Depends(get_db)):
+    """Extract known skills from a resume and add the ones the student does not have yet."""
+    if not await run_in_threadpool(_student_exists, db, id):
+        raise HTTPException(status_code=404, detail="Student not found")
+    filename, data = await _receive_resume(request)
+    try:
+        text = await extract_text_async(filename, data)
+    except ResumeRejected as exc:
+        raise HTTPException(status_code=415, detail=str(exc))
+    return await run_in_threadpool(_add_resume_skills, db, id, text)
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 
 from .. import schemas, models
 from ..database import get_db
-from ..services.team_engine import generate_team
+from ..services.team_engine import generate_team, generate_teams
 
 router = APIRouter()
 
@@ -29,6 +29,7 @@ def auto_generate_team(
         project_title=payload.title,
         faculty_id=payload.faculty_id,
         required_roles=required_roles,
+        mode=payload.mode.value,
     )
     return {
         "project_id": project.id,
@@ -36,3 +37,32 @@ def auto_generate_team(
         "team": members,
     }
 
+
+@router.post("/auto-generate/batch")
+def auto_generate_teams(
+    payload: schemas.TeamBatchGenerationRequest,
+    db: Session = Depends(get_db),
+):
+    if not payload.projects:
+        raise HTTPException(status_code=400, detail="At least one project is needed")
+
+    faculty_ids = {spec.faculty_id for spec in payload.projects}
+    found = {row.id for row in db.query(models.Faculty.id).filter(models.Faculty.id.in_(faculty_ids)).all()}
+    if found != faculty_ids:
+        raise HTTPException(status_code=404, detail=f"Faculty not found: {sorted(faculty_ids - found)}")
+
+    for spec in payload.projects:
+        if not spec.required_roles:
+            raise HTTPException(status_code=400, detail="At least one required role is needed")
+        if not spec.title or not spec.title.strip():
+            raise HTTPException(status_code=400, detail="Project title is required")
+
+    projects = [
+        {
+            "title": spec.title,
+            "faculty_id": spec.faculty_id,
+            "required_roles": [role.dict() for role in spec.required_roles],
+        }
+        for spec in payload.projects
+    ]
+    return {"projects": generate_teams(db, projects, max_projects_per_student=payload.max_projects_per_student)}
@@ -56,6 +56,28 @@ class StudentSkillCreate(BaseModel):
     level: int = Field(ge=1, le=5)
 
 
+class SkillOut(BaseModel):
+    id: int
+    name: str
+
+
+class SkillAliasCreate(BaseModel):
+    alias: str = Field(min_length=1, max_length=100)
+    skill_name: str = Field(min_length=1, max_length=100)
+
+
+class SkillAliasOut(BaseModel):
+    alias: str
+    skill_id: int
+    skill_name: str
+
+
+class ResumeSkillsOut(BaseModel):
+    student_id: int
+    skills_found: List[str]
+    skills_added: List[str]
+
+
 class StudentOut(BaseModel):
     id: int
     name: str
@@ -120,6 +142,33 @@ class ApplicationOut(BaseModel):
         from_attributes = True
 
 
+class ApplicantSort(str, Enum):
+    fit = "fit"  # Best fit first, ties by application id
+    applied = "applied"  # Oldest application first
+
+
+class ApplicantOut(BaseModel):
+    application_id: int
+    student_id: int
+    student_name: str
+    cgpa: float
+    status: ApplicationStatus
+    fit_score: float
+    eligible: bool
+    missing_skills: List[str]
+
+
+class ApplicationStatusUpdate(BaseModel):
+    application_ids: List[int] = Field(min_length=1, max_length=5000)
+    status: ApplicationStatus
+
+
+class ApplicationStatusUpdateOut(BaseModel):
+    status: ApplicationStatus
+    updated: List[int]
+    skipped: List[int]  # Unknown, not for this opportunity, or not allowed to move to status
+
+
 class MatchResult(BaseModel):
     opportunity_id: int
     opportunity: str
@@ -129,15 +178,46 @@ class MatchResult(BaseModel):
     reason: Optional[str] = None  # Clear reason if not eligible
 
 
+class CandidateMatch(BaseModel):
+    student_id: int
+    student_name: str
+    fit_score: float
+    eligible: bool
+    missing_skills: List[str]
+    reason: Optional[str] = None
+
+
 class TeamRoleRequirement(BaseModel):
     role: str
     skill_name: str
 
 
+class TeamAssignmentMode(str, Enum):
+    optimal = "optimal"  # Hungarian assignment maximizing total skill level
+    greedy = "greedy"  # Each role in order takes the best remaining student
+
+
 class TeamGenerationRequest(BaseModel):
     faculty_id: int
     title: str
     required_roles: List[TeamRoleRequirement]
+    mode: TeamAssignmentMode = TeamAssignmentMode.optimal
+
+
+class TeamProjectSpec(BaseModel):
+    """One project of a batch; batches are drafted together, so there is no per-project mode."""
+
+    faculty_id: int
+    title: str
+    required_roles: List[TeamRoleRequirement]
+
+    class Config:
+        extra = "forbid"
+
+
+class TeamBatchGenerationRequest(BaseModel):
+    projects: List[TeamProjectSpec]
+    max_projects_per_student: int = Field(1, ge=1)
 
 
 class TeamMemberOut(BaseModel):
@@ -154,3 +234,45 @@ class NotificationOut(BaseModel):
     class Config:
         from_attributes = True
 
+
+class UnreadCountOut(BaseModel):
+    unread: int
+
+
+class ImportKind(str, Enum):
+    users = "users"  # UserCreate rows (password or password_hash)
+    student_skills = "student_skills"  # StudentSkillCreate rows; email may replace student_id
+    opportunities = "opportunities"  # OpportunityCreate rows; CSV skills separated by ';'
+
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    jsonl = "jsonl"
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReportOut(BaseModel):
+    kind: ImportKind
+    rows: int
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
+
+
+class OpportunitySearchResult(OpportunityOut):
+    score: float
+
+
+class StudentSearchResult(BaseModel):
+    id: int
+    name: str
+    branch: str
+    year: int
+    cgpa: float
+    skills: List[str] = []
+    score: float
@@ -0,0 +1,127 @@
+"""
+Applicant review queue for an opportunity.
+
+Applicants are listed with their cached fit score in a single joined query (pairs
+without a fit_scores row are scored first), and status changes for many applications
+are applied with one UPDATE plus one batch of notifications.
+"""
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+
+from ..models import Application, ApplicationStatus, FitScore, Opportunity, Student
+from .fit_score_cache import fill_opportunity_fit_scores
+from .notification import create_notifications
+
+# Statuses an application may move to, and from which
+ALLOWED_TRANSITIONS = {
+    ApplicationStatus.shortlisted: (ApplicationStatus.applied,),
+    ApplicationStatus.rejected: (ApplicationStatus.applied, ApplicationStatus.shortlisted),
+}
+
+
+def list_applicants(
+    db: Session,
+    opportunity: Opportunity,
+    status: Optional[ApplicationStatus] = None,
+    sort: str = "fit",
+    limit: Optional[int] = None,
+    after: Optional[tuple] = None,
+) -> List[dict]:
+    """Applicants of an opportunity with their fit.
+
+    sort="fit" orders by fit_score desc then application id, and `after` is the
+    (fit_score, application_id) of the previous page's last row; sort="applied" orders
+    by application id and `after` is (application_id,).
+    """
+    fit_join = and_(
+        FitScore.student_id == Application.student_id, FitScore.opportunity_id == Application.opportunity_id
+    )
+    unscored = (
+        db.query(Application.student_id)
+        .outerjoin(FitScore, fit_join)
+        .filter(Application.opportunity_id == opportunity.id, FitScore.student_id.is_(None))
+    )
+    if fill_opportunity_fit_scores(db, opportunity, (student_id for (student_id,) in unscored)):
+        db.commit()
+
+    query = (
+        db.query(Application.id, Application.student_id, Application.status, Student.name, Student.cgpa, FitScore)
+        .join(Student, Student.id == Application.student_id)
+        .join(FitScore, fit_join)
+        .filter(Application.opportunity_id == opportunity.id)
+    )
+    if status is not None:
+        query = query.filter(Application.status == status)
+    if sort == "fit":
+        if after is not None:
+            score, application_id = after
+            query = query.filter(
+                or_(FitScore.fit_score < score, and_(FitScore.fit_score == score, Application.id > application_id))
+            )
+        query = query.order_by(FitScore.fit_score.desc(), Application.id)
+    else:
+        if after is not None:
+            query = query.filter(Application.id > after[0])
+        query = query.order_by(Application.id)
+    if limit is not None:
+        query = query.limit(limit)
+
+    return [
+        {
+            "application_id": application_id,
+            "student_id": student_id,
+            "student_name": name,
+            "cgpa": cgpa,
+            "status": application_status,
+            "fit_score": score.fit_score,
+            "eligible": score.eligible,
+            "missing_skills": score.missing_skills,
+        }
+        for application_id, student_id, application_status, name, cgpa, score in query.all()
+    ]
+
+
+def set_application_status(
+    db: Session, opportunity: Opportunity, application_ids: List[int], status: ApplicationStatus
+) -> Tuple[List[int], List[int]]:
+    """Move many applications of one opportunity to `status` in a single transaction.
+
+    Applications that do not belong to the opportunity or cannot make the transition
+    are skipped. Returns (updated ids, skipped ids).
+    """
+    requested = list(dict.fromkeys(application_ids))
+    rows = db.execute(
+        update(Application)
+        .where(
+            Application.opportunity_id == opportunity.id,
+            Application.id.in_(requested),
+            Application.status.in_(ALLOWED_TRANSITIONS[status]),
+        )
+        .values(status=status)
+        .returning(Application.id, Application.student_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    updated = {application_id for application_id, _ in rows}
+    if rows:
+        user_ids = dict(
+            db.query(Student.id, Student.user_id).filter(Student.id.in_({student_id for _, student_id in rows}))
+        )
+        create_notifications(
+            db,
+            [
+                {
+                    "user_id": user_ids[student_id],
+                    "message": f"Your application to {opportunity.title} was {status.value}",
+                }
+                for _, student_id in rows
+            ],
+            commit=False,
+        )
+    db.commit()
+    return (
+        [application_id for application_id in requested if application_id in updated],
+        [application_id for application_id in requested if application_id not in updated],
+    )
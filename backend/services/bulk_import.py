@@ -0,0 +1,447 @@
+"""
+Streaming bulk import of users, student skills and opportunities.
+
+Rows are read from CSV or JSONL and processed in chunks. Each chunk is validated
+against the request schemas, resolved with a fixed number of queries (existing
+emails, students, skills) and written in its own transaction, so memory stays flat
+whatever the file size. Invalid or conflicting rows are reported by row number and
+skipped; if a chunk's write fails, the chunk is rolled back and each of its rows is
+reported.
+
+Imported students and opportunities get their fit scores on first read, like any
+pair without a cached row; students whose skills change have their rows dropped. Search
+documents of imported students and opportunities are rewritten in the chunk's
+transaction.
+
+    python -m backend.services.bulk_import users students.csv --errors errors.jsonl
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from ..database import SessionLocal
+from ..utils.password import hash_passwords, is_password_hash
+from ..utils.response_cache import response_cache
+from .search import reindex_opportunities, reindex_students
+from .skill_index import skill_index
+from .skill_lexicon import skill_lexicon
+from .skills import resolve_skills
+
+DEFAULT_CHUNK_SIZE = 1000
+# Errors kept in the report; the on_error callback still sees every one
+MAX_REPORTED_ERRORS = 1000
+
+# CSV cells holding lists
+_CSV_LIST_SEPARATOR = ";"
+_CSV_LIST_FIELDS = {"required_skills"}
+
+
+class _Unparsable(str):
+    """Stands in for a row that could not be parsed; the value is the error."""
+
+
+class RowRejected(Exception):
+    pass
+
+
+class ImportReport:
+    __slots__ = ("kind", "rows", "imported", "errors", "error_count", "on_error", "chunk_rejected")
+
+    def __init__(self, kind: schemas.ImportKind, on_error: Optional[Callable[[int, str], None]] = None):
+        self.kind = kind
+        self.rows = 0
+        self.imported = 0
+        self.errors: List[schemas.ImportRowError] = []
+        self.error_count = 0
+        self.on_error = on_error
+        # Rows of the current chunk already rejected, so a failed write does not report them twice
+        self.chunk_rejected: Set[int] = set()
+
+    def reject(self, row: int, error: str):
+        self.chunk_rejected.add(row)
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(schemas.ImportRowError(row=row, error=error))
+        if self.on_error:
+            self.on_error(row, error)
+
+    def out(self) -> schemas.ImportReportOut:
+        return schemas.ImportReportOut(
+            kind=self.kind,
+            rows=self.rows,
+            imported=self.imported,
+            failed=self.error_count,
+            errors=self.errors,
+            errors_truncated=self.error_count > len(self.errors),
+        )
+
+
+def read_rows(stream: TextIO, format: schemas.ImportFormat) -> Iterator[dict]:
+    """Yield one dict per record; empty CSV cells are treated as missing."""
+    if format == schemas.ImportFormat.csv:
+        for row in csv.DictReader(stream):
+            record = {key: value for key, value in row.items() if key and value not in (None, "")}
+            for key in _CSV_LIST_FIELDS & record.keys():
+                record[key] = [item.strip() for item in record[key].split(_CSV_LIST_SEPARATOR) if item.strip()]
+            yield record
+    else:
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield _Unparsable(f"Invalid JSON: {exc}")
+                continue
+            yield record if isinstance(record, dict) else _Unparsable("Expected a JSON object")
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+def _validate(model, record: dict):
+    try:
+        return model.model_validate(record)
+    except ValidationError as exc:
+        raise RowRejected(_validation_message(exc))
+
+
+# Users
+
+
+def _prepare_user(record: dict) -> Tuple[schemas.UserCreate, Optional[str]]:
+    """Validate a user row; returns it with its pre-hashed password, if one was given."""
+    password_hash = record.pop("password_hash", None)
+    if password_hash is not None:
+        if "password" in record:
+            raise RowRejected("Give either password or password_hash, not both")
+        if not is_password_hash(password_hash):
+            raise RowRejected("password_hash is not a supported hash")
+        record["password"] = ""
+    user = _validate(schemas.UserCreate, record)
+    # Same profile requirements as /register
+    if user.role == schemas.UserRole.student:
+        if not (user.name and user.branch and user.year and user.cgpa is not None):
+            raise RowRejected("Student details required")
+        # user_id is assigned on insert
+        _validate(schemas.StudentProfileCreate, {**record, "user_id": 0})
+    elif user.role == schemas.UserRole.faculty:
+        if not (user.name and user.department):
+            raise RowRejected("Faculty details required")
+    elif not user.name:
+        raise RowRejected("Company name required")
+    return user, password_hash
+
+
+def _import_users(db: Session, chunk: List[Tuple[int, dict]], report: ImportReport):
+    accepted: Dict[str, Tuple[int, schemas.UserCreate, Optional[str]]] = {}
+    for row, record in chunk:
+        try:
+            user, password_hash = _prepare_user(record)
+            if user.email in accepted:
+                raise RowRejected(f"Duplicate email in file (row {accepted[user.email][0]})")
+        except RowRejected as exc:
+            report.reject(row, str(exc))
+            continue
+        accepted[user.email] = (row, user, password_hash)
+
+    existing = {
+        email for (email,) in db.query(models.User.email).filter(models.User.email.in_(list(accepted)))
+    }
+    for email in existing:
+        report.reject(accepted.pop(email)[0], "Email already registered")
+    if not accepted:
+        return [], None
+
+    entries = list(accepted.values())
+    plain = [user.password for _, user, password_hash in entries if password_hash is None]
+    hashed = iter(hash_passwords(plain))
+    user_rows = [
+        {
+            "email": user.email,
+            "password": password_hash if password_hash is not None else next(hashed),
+            "role": models.UserRole(user.role.value),
+        }
+        for _, user, password_hash in entries
+    ]
+    user_ids = {
+        email: user_id
+        for user_id, email in db.execute(insert(models.User).returning(models.User.id, models.User.email), user_rows)
+    }
+
+    profiles: Dict[type, List[dict]] = {models.Student: [], models.Faculty: [], models.Company: []}
+    for _, user, _ in entries:
+        user_id = user_ids[user.email]
+        if user.role == schemas.UserRole.student:
+            profiles[models.Student].append(
+                {"user_id": user_id, "name": user.name, "branch": user.branch, "year": user.year, "cgpa": user.cgpa}
+            )
+        elif user.role == schemas.UserRole.faculty:
+            profiles[models.Faculty].append({"user_id": user_id, "name": user.name, "department": user.department})
+        else:
+            profiles[models.Company].append({"user_id": user_id, "name": user.name, "description": user.description})
+    for model, rows in profiles.items():
+        if rows:
+            db.execute(model.__table__.insert(), rows)
+    if profiles[models.Student]:
+        reindex_students(
+            db,
+            db.scalars(
+                select(models.Student.id).where(
+                    models.Student.user_id.in_([row["user_id"] for row in profiles[models.Student]])
+                )
+            ),
+        )
+    return [row for row, _, _ in entries], None
+
+
+# Student skills
+
+
+def _import_student_skills(db: Session, chunk: List[Tuple[int, dict]], report: ImportReport):
+    emails = {record["email"] for _, record in chunk if "student_id" not in record and "email" in record}
+    by_email = {}
+    if emails:
+        by_email = dict(
+            db.query(models.User.email, models.Student.id)
+            .join(models.Student, models.Student.user_id == models.User.id)
+            .filter(models.User.email.in_(emails))
+            .all()
+        )
+
+    parsed: List[Tuple[int, schemas.StudentSkillCreate]] = []
+    for row, record in chunk:
+        try:
+            if "student_id" not in record:
+                if "email" not in record:
+                    raise RowRejected("student_id or email is required")
+                if record["email"] not in by_email:
+                    raise RowRejected("No student with this email")
+                record["student_id"] = by_email[record.pop("email")]
+            parsed.append((row, _validate(schemas.StudentSkillCreate, record)))
+        except RowRejected as exc:
+            report.reject(row, str(exc))
+
+    known = {
+        student_id
+        for (student_id,) in db.query(models.Student.id).filter(
+            models.Student.id.in_({item.student_id for _, item in parsed})
+        )
+    }
+    valid = []
+    for row, item in parsed:
+        if item.student_id in known:
+            valid.append((row, item))
+        else:
+            report.reject(row, "Student not found")
+    if not valid:
+        return [], None
+
+    skills = resolve_skills(db, [item.skill_name for _, item in valid])
+    # Later rows for the same (student, skill) win, like repeated /student/add-skill calls
+    levels: Dict[Tuple[int, int], int] = {}
+    for (_, item), skill in zip(valid, skills):
+        levels[(item.student_id, skill.id)] = item.level
+
+    student_ids = {student_id for student_id, _ in levels}
+    existing = {
+        (student_id, skill_id): row_id
+        for row_id, student_id, skill_id in db.query(
+            models.StudentSkill.id, models.StudentSkill.student_id, models.StudentSkill.skill_id
+        ).filter(
+            models.StudentSkill.student_id.in_(student_ids),
+            models.StudentSkill.skill_id.in_({skill_id for _, skill_id in levels}),
+        )
+    }
+    updates = [{"b_id": existing[pair], "b_level": level} for pair, level in levels.items() if pair in existing]
+    inserts = [
+        {"student_id": student_id, "skill_id": skill_id, "level": level}
+        for (student_id, skill_id), level in levels.items()
+        if (student_id, skill_id) not in existing
+    ]
+    if updates:
+        table = models.StudentSkill.__table__
+        db.execute(table.update().where(table.c.id == bindparam("b_id")).values(level=bindparam("b_level")), updates)
+    if inserts:
+        db.execute(models.StudentSkill.__table__.insert(), inserts)
+    db.query(models.FitScore).filter(models.FitScore.student_id.in_(student_ids)).delete(synchronize_session=False)
+    reindex_students(db, student_ids)
+    response_cache.invalidate(db, *{("student", row["student_id"]) for row in inserts})
+    return [row for row, _ in valid], None
+
+
+# Opportunities
+
+
+def _import_opportunities(db: Session, chunk: List[Tuple[int, dict]], report: ImportReport):
+    parsed: List[Tuple[int, schemas.OpportunityCreate]] = []
+    for row, record in chunk:
+        try:
+            item = _validate(schemas.OpportunityCreate, record)
+            # Same rules as /opportunity/create
+            if item.company_id is not None and item.faculty_id is not None:
+                raise RowRejected("Cannot specify both company_id and faculty_id")
+            if item.company_id is None and item.faculty_id is None:
+                raise RowRejected("Must specify either company_id or faculty_id")
+            if item.company_id is not None and item.is_internal:
+                raise RowRejected("Companies cannot create internal opportunities")
+            if item.min_cgpa < 0 or item.min_cgpa > 10:
+                raise RowRejected("min_cgpa must be between 0 and 10")
+            parsed.append((row, item))
+        except RowRejected as exc:
+            report.reject(row, str(exc))
+
+    companies = {
+        company_id
+        for (company_id,) in db.query(models.Company.id).filter(
+            models.Company.id.in_({item.company_id for _, item in parsed if item.company_id is not None})
+        )
+    }
+    faculty = {
+        faculty_id
+        for (faculty_id,) in db.query(models.Faculty.id).filter(
+            models.Faculty.id.in_({item.faculty_id for _, item in parsed if item.faculty_id is not None})
+        )
+    }
+    valid = []
+    for row, item in parsed:
+        if item.company_id is not None and item.company_id not in companies:
+            report.reject(row, "Company not found")
+        elif item.faculty_id is not None and item.faculty_id not in faculty:
+            report.reject(row, "Faculty not found")
+        else:
+            valid.append((row, item))
+    if not valid:
+        return [], None
+
+    names = [name for _, item in valid for name in item.required_skills]
+    skill_ids = iter([skill.id for skill in resolve_skills(db, names)])
+    required = [list(dict.fromkeys(next(skill_ids) for _ in item.required_skills)) for _, item in valid]
+
+    opportunity_ids = db.scalars(
+        insert(models.Opportunity).returning(models.Opportunity.id, sort_by_parameter_order=True),
+        [
+            {
+                "title": item.title,
+                "creator_name": item.creator_name,
+                "type": models.OpportunityType(item.type.value),
+                "min_cgpa": item.min_cgpa,
+                "company_id": item.company_id,
+                "faculty_id": item.faculty_id,
+                "is_internal": item.is_internal,
+            }
+            for _, item in valid
+        ],
+    ).all()
+    links = [
+        {"opportunity_id": opportunity_id, "skill_id": skill_id}
+        for opportunity_id, ids in zip(opportunity_ids, required)
+        for skill_id in ids
+    ]
+    if links:
+        db.execute(models.OpportunitySkill.__table__.insert(), links)
+    reindex_opportunities(db, opportunity_ids)
+    response_cache.invalidate(db, ("opportunities",))
+
+    def after_commit():
+        for opportunity_id, ids in zip(opportunity_ids, required):
+            skill_index.set_opportunity_skills(opportunity_id, ids)
+
+    return [row for row, _ in valid], after_commit
+
+
+_IMPORTERS = {
+    schemas.ImportKind.users: _import_users,
+    schemas.ImportKind.student_skills: _import_student_skills,
+    schemas.ImportKind.opportunities: _import_opportunities,
+}
+
+
+def import_rows(
+    db: Session,
+    kind: schemas.ImportKind,
+    records: Iterable[dict],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_error: Optional[Callable[[int, str], None]] = None,
+) -> ImportReport:
+    """Import records of one kind, committing every chunk_size rows. Row numbers start at 1."""
+    importer = _IMPORTERS[kind]
+    report = ImportReport(kind, on_error)
+    numbered = enumerate(records, start=1)
+    while True:
+        chunk = list(itertools.islice(numbered, chunk_size))
+        if not chunk:
+            break
+        report.rows += len(chunk)
+        parsed = []
+        for row, record in chunk:
+            if isinstance(record, _Unparsable):
+                report.reject(row, str(record))
+            else:
+                parsed.append((row, record))
+        report.chunk_rejected.clear()
+        try:
+            imported, after_commit = importer(db, parsed, report)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            for row, _ in parsed:
+                if row not in report.chunk_rejected:
+                    report.reject(row, f"Chunk failed: {exc.__class__.__name__}: {exc}")
+            continue
+        # The skill index only learns about rows once they are committed
+        if after_commit:
+            after_commit()
+        report.imported += len(imported)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import users, student skills or opportunities")
+    parser.add_argument("kind", choices=[kind.value for kind in schemas.ImportKind])
+    parser.add_argument("path", help="CSV or JSONL file, '-' for stdin")
+    parser.add_argument("--format", choices=[fmt.value for fmt in schemas.ImportFormat])
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--errors", help="write every rejected row to this JSONL file")
+    args = parser.parse_args(argv)
+
+    format = args.format or ("csv" if args.path.endswith(".csv") else "jsonl")
+    stream = (
+        io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+        if args.path == "-"
+        else open(args.path, encoding="utf-8-sig", newline="")
+    )
+    errors = open(args.errors, "w") if args.errors else None
+    on_error = (lambda row, error: errors.write(json.dumps({"row": row, "error": error}) + "\n")) if errors else None
+
+    db = SessionLocal()
+    try:
+        # Resolve skill spellings the way the running app does
+        skill_lexicon.build(db)
+        records = read_rows(stream, schemas.ImportFormat(format))
+        report = import_rows(db, schemas.ImportKind(args.kind), records, args.chunk_size, on_error)
+    finally:
+        db.close()
+        stream.close()
+        if errors:
+            errors.close()
+    print(f"{report.rows} rows, {report.imported} imported, {report.error_count} rejected")
+    if report.error_count and not errors:
+        for error in report.errors[:20]:
+            print(f"  row {error.row}: {error.error}")
+
+
+if __name__ == "__main__":
+    main()
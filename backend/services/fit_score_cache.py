@@ -0,0 +1,138 @@
+"""
+Materialized fit scores.
+
+`fit_scores` holds one matching_engine result per (student, opportunity) pair.
+Staleness rules:
+- a student's skills change -> that student's row set is recomputed
+- an opportunity is created -> that opportunity's column is computed
+- any pair without a row (new students, invalidated rows) is scored on first read
+Refresh helpers only flush; the calling route owns the commit. Stored scores are
+computed from the database alone, never from the per-process skill index, which does
+not see other workers' writes.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from ..database import dialect_insert
+from ..models import FitScore, Opportunity, OpportunityType, Student
+from .matching_engine import calculate_fit_scores, calculate_student_fit_scores
+
+
+def _row(student_id: int, match: dict) -> dict:
+    return {
+        "student_id": student_id,
+        "opportunity_id": match["opportunity_id"],
+        "fit_score": match["fit_score"],
+        "eligible": match["eligible"],
+        "missing_skills": match["missing_skills"],
+        "reason": match["reason"],
+    }
+
+
+def _insert(db: Session, rows: List[dict]):
+    # Core insert keeps all rows in one executemany batch (ORM bulk insert splits on NULL reasons).
+    # Another request may score the same missing pairs at the same time; its rows are identical.
+    if rows:
+        table = FitScore.__table__
+        pair = [table.c.student_id, table.c.opportunity_id]
+        db.execute(dialect_insert(db, table).on_conflict_do_nothing(index_elements=pair), rows)
+
+
+def refresh_student_fit_scores(db: Session, student: Student):
+    db.query(FitScore).filter(FitScore.student_id == student.id).delete(synchronize_session=False)
+    matches = calculate_fit_scores(db, student, db.query(Opportunity).all(), use_index=False)
+    _insert(db, [_row(student.id, match) for match in matches])
+
+
+def refresh_opportunity_fit_scores(db: Session, opportunity: Opportunity, required_skill_names: List[str] = None):
+    db.query(FitScore).filter(FitScore.opportunity_id == opportunity.id).delete(synchronize_session=False)
+    matches = calculate_student_fit_scores(db, opportunity, required_skill_names, use_index=False)
+    _insert(db, [_row(student_id, match) for student_id, match in matches])
+
+
+def fill_opportunity_fit_scores(db: Session, opportunity: Opportunity, student_ids: Iterable[int]) -> int:
+    """Score the given students for an opportunity where no cached row exists yet; returns rows added."""
+    student_ids = set(student_ids)
+    if not student_ids:
+        return 0
+    cached = {
+        student_id
+        for (student_id,) in db.query(FitScore.student_id).filter(
+            FitScore.opportunity_id == opportunity.id, FitScore.student_id.in_(student_ids)
+        )
+    }
+    missing = student_ids - cached
+    if missing:
+        matches = calculate_student_fit_scores(db, opportunity, student_ids=missing, use_index=False)
+        _insert(db, [_row(student_id, match) for student_id, match in matches])
+    return len(missing)
+
+
+def get_student_fit_scores(
+    db: Session,
+    student: Student,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    after: Optional[Tuple[float, int]] = None,
+    eligible_only: bool = False,
+    type: Optional[OpportunityType] = None,
+    is_internal: Optional[bool] = None,
+) -> List[dict]:
+    """Cached matches for a student, best first with ties by opportunity id.
+
+    Filters are applied to the opportunity set before any missing pair is scored, and
+    `after` is the (fit_score, opportunity_id) keyset of the previous page's last row.
+    """
+    # Read before the commit below, which would expire the student and reload it
+    student_id = student.id
+    in_scope = []
+    if type is not None:
+        in_scope.append(Opportunity.type == type)
+    if is_internal is not None:
+        in_scope.append(Opportunity.is_internal == is_internal)
+    if eligible_only:
+        in_scope.append(Opportunity.min_cgpa <= student.cgpa)
+
+    missing = (
+        db.query(Opportunity)
+        .outerjoin(FitScore, and_(FitScore.opportunity_id == Opportunity.id, FitScore.student_id == student_id))
+        .filter(FitScore.student_id.is_(None), *in_scope)
+        .all()
+    )
+    if missing:
+        _insert(db, [_row(student_id, match) for match in calculate_fit_scores(db, student, missing, use_index=False)])
+        db.commit()
+
+    query = (
+        db.query(FitScore, Opportunity.title)
+        .join(Opportunity, Opportunity.id == FitScore.opportunity_id)
+        .filter(FitScore.student_id == student_id, *in_scope)
+    )
+    if eligible_only:
+        query = query.filter(FitScore.eligible.is_(True))
+    if after is not None:
+        score, opportunity_id = after
+        query = query.filter(
+            or_(
+                FitScore.fit_score < score,
+                and_(FitScore.fit_score == score, FitScore.opportunity_id > opportunity_id),
+            )
+        )
+    query = query.order_by(FitScore.fit_score.desc(), FitScore.opportunity_id)
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    return [
+        {
+            "opportunity_id": score.opportunity_id,
+            "opportunity": title,
+            "fit_score": score.fit_score,
+            "eligible": score.eligible,
+            "missing_skills": score.missing_skills,
+            "reason": score.reason,
+        }
+        for score, title in query.all()
+    ]
@@ -0,0 +1,249 @@
+"""
+Campus-wide student x opportunity fit scores.
+
+Builds a sparse student x skill matrix (1 where the student has the skill) and an
+opportunity x skill matrix (how often the opportunity requires it), so one sparse
+product gives every pair's matched-skill count. The CGPA gate is a vectorized
+comparison. Scores are exactly matching_engine's: a fit score only depends on
+(matched, required, cgpa_ok), so every reachable triple is scored once with
+matching_engine._fit_score and the pairs look theirs up in that table.
+
+Student rows are scored in chunks on a process pool. The result is written as one
+compressed .npz holding the ids, scores in hundredths (uint16) and the bit-packed
+eligibility matrix.
+
+    python -m backend.services.match_matrix matches.npz --verify 1000
+"""
+import argparse
+import contextlib
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import Opportunity, OpportunitySkill, Skill, Student, StudentSkill
+from .matching_engine import _fit_score, calculate_fit_score
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class MatchMatrix(NamedTuple):
+    student_ids: np.ndarray  # (students,) int64
+    opportunity_ids: np.ndarray  # (opportunities,) int64
+    scores: np.ndarray  # (students, opportunities) uint16, fit score x 100
+    eligible: np.ndarray  # (students, opportunities) bool
+
+    def fit_score(self, student_id: int, opportunity_id: int) -> float:
+        row = np.searchsorted(self.student_ids, student_id)
+        column = np.searchsorted(self.opportunity_ids, opportunity_id)
+        if (
+            row == len(self.student_ids)
+            or self.student_ids[row] != student_id
+            or column == len(self.opportunity_ids)
+            or self.opportunity_ids[column] != opportunity_id
+        ):
+            raise KeyError((student_id, opportunity_id))
+        return int(self.scores[row, column]) / 100
+
+    def save(self, path: str):
+        np.savez_compressed(
+            path,
+            student_ids=self.student_ids,
+            opportunity_ids=self.opportunity_ids,
+            scores=self.scores,
+            eligible=np.packbits(self.eligible, axis=1),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "MatchMatrix":
+        with np.load(path) as data:
+            opportunity_ids = data["opportunity_ids"]
+            return cls(
+                student_ids=data["student_ids"],
+                opportunity_ids=opportunity_ids,
+                scores=data["scores"],
+                eligible=np.unpackbits(data["eligible"], axis=1, count=len(opportunity_ids)).astype(bool),
+            )
+
+
+class _Inputs(NamedTuple):
+    student_ids: np.ndarray
+    cgpa: np.ndarray
+    student_skills: sparse.csr_matrix  # students x skill names, 0/1
+    opportunity_ids: np.ndarray
+    min_cgpa: np.ndarray
+    required: sparse.csc_matrix  # skill names x opportunities, requirement counts
+    required_totals: np.ndarray
+
+
+def _array(query, dtype) -> np.ndarray:
+    # Rows as plain tuples: numpy converts those far faster than Row objects
+    return np.array([tuple(row) for row in query], dtype=dtype).reshape(-1, len(query.column_descriptions))
+
+
+def _load_inputs(db: Session) -> _Inputs:
+    students = _array(db.query(Student.id, Student.cgpa).order_by(Student.id), np.float64)
+    opportunities = _array(db.query(Opportunity.id, Opportunity.min_cgpa).order_by(Opportunity.id), np.float64)
+    student_ids = students[:, 0].astype(np.int64)
+    opportunity_ids = opportunities[:, 0].astype(np.int64)
+    held = _array(db.query(StudentSkill.student_id, StudentSkill.skill_id), np.int64)
+    links = _array(db.query(OpportunitySkill.opportunity_id, OpportunitySkill.skill_id), np.int64)
+
+    # One column per skill key (the folded name), which is what matching_engine compares
+    names = db.query(Skill.id, Skill.name_key).order_by(Skill.id).all()
+    skill_ids = np.array([row[0] for row in names], dtype=np.int64)
+    name_columns, columns_by_id = np.unique([row[1] for row in names], return_inverse=True)
+    skill_columns = columns_by_id.reshape(-1).astype(np.int64)[
+        np.searchsorted(skill_ids, np.concatenate([held[:, 1], links[:, 1]]))
+    ]
+
+    student_skills = sparse.csr_matrix(
+        (np.ones(len(held), dtype=np.int32), (np.searchsorted(student_ids, held[:, 0]), skill_columns[: len(held)])),
+        shape=(len(student_ids), len(name_columns)),
+    )
+    # A name held twice by a student still counts once, as in the name set matching_engine builds
+    student_skills.data[:] = 1
+    # Duplicate requirement rows add up, as the engine counts them in len(required)
+    required = sparse.csc_matrix(
+        (
+            np.ones(len(links), dtype=np.int32),
+            (skill_columns[len(held) :], np.searchsorted(opportunity_ids, links[:, 0])),
+        ),
+        shape=(len(name_columns), len(opportunity_ids)),
+    )
+    return _Inputs(
+        student_ids=student_ids,
+        cgpa=students[:, 1],
+        student_skills=student_skills,
+        opportunity_ids=opportunity_ids,
+        min_cgpa=opportunities[:, 1],
+        required=required,
+        required_totals=np.asarray(required.sum(axis=0)).ravel().astype(np.int64),
+    )
+
+
+def _score_table(required_totals: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Every reachable (matched, required, cgpa_ok) triple scored with matching_engine._fit_score.
+
+    Returns the scores (x 100) and eligibility flat tables, and per opportunity the offset of
+    its required count's block: triple (m, n, c) sits at offsets[opportunity] + 2 * m + c.
+    """
+    totals = np.unique(required_totals)
+    block_offsets = np.concatenate([[0], np.cumsum(2 * (totals + 1))])
+    scores = np.empty(block_offsets[-1], dtype=np.uint16)
+    eligible = np.empty(block_offsets[-1], dtype=bool)
+    for total, offset in zip(totals.tolist(), block_offsets.tolist()):
+        for matched in range(total + 1):
+            skill_match = matched / total if total else 1
+            for cgpa_match in (0, 1):
+                scores[offset + 2 * matched + cgpa_match] = round(_fit_score(skill_match, cgpa_match) * 100)
+                eligible[offset + 2 * matched + cgpa_match] = cgpa_match == 1 and skill_match > 0
+    return scores, eligible, block_offsets[np.searchsorted(totals, required_totals)]
+
+
+def _score_chunk(
+    student_skills: sparse.csr_matrix,
+    cgpa: np.ndarray,
+    required: sparse.csc_matrix,
+    min_cgpa: np.ndarray,
+    table: Tuple[np.ndarray, np.ndarray, np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray]:
+    scores, eligible, offsets = table
+    matched = (student_skills @ required).toarray()
+    cgpa_ok = cgpa[:, None] >= min_cgpa[None, :]
+    index = offsets[None, :] + 2 * matched + cgpa_ok
+    return scores[index], eligible[index]
+
+
+def build_match_matrix(
+    db: Session, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> MatchMatrix:
+    """Fit score and eligibility of every student for every opportunity.
+
+    workers=1 scores in this process; otherwise chunks of chunk_size students run on a
+    process pool of `workers` (default: every core).
+    """
+    inputs = _load_inputs(db)
+    n_students, n_opportunities = len(inputs.student_ids), len(inputs.opportunity_ids)
+    scores = np.zeros((n_students, n_opportunities), dtype=np.uint16)
+    eligible = np.zeros((n_students, n_opportunities), dtype=bool)
+    starts = range(0, n_students, chunk_size)
+    chunks = (
+        (inputs.student_skills[start : start + chunk_size], inputs.cgpa[start : start + chunk_size]) for start in starts
+    )
+    shared = (inputs.required, inputs.min_cgpa, _score_table(inputs.required_totals))
+
+    workers = workers or os.cpu_count() or 1
+    with contextlib.ExitStack() as stack:
+        if workers == 1 or len(starts) <= 1:
+            mapper = map
+        else:
+            mp_context = multiprocessing.get_context("spawn")
+            mapper = stack.enter_context(ProcessPoolExecutor(max_workers=workers, mp_context=mp_context)).map
+        results = mapper(_score_chunk, *zip(*chunks), *(itertools.repeat(value) for value in shared))
+        for start, (chunk_scores, chunk_eligible) in zip(starts, results):
+            scores[start : start + chunk_size] = chunk_scores
+            eligible[start : start + chunk_size] = chunk_eligible
+    return MatchMatrix(inputs.student_ids, inputs.opportunity_ids, scores, eligible)
+
+
+def verify_against_engine(db: Session, matrix: MatchMatrix, samples: int, seed: int = 0) -> List[str]:
+    """Compare random pairs with calculate_fit_score; returns a description of every mismatch."""
+    if not len(matrix.student_ids) or not len(matrix.opportunity_ids):
+        return []
+    rng = random.Random(seed)
+    problems = []
+    for _ in range(samples):
+        row = rng.randrange(len(matrix.student_ids))
+        column = rng.randrange(len(matrix.opportunity_ids))
+        student = db.get(Student, int(matrix.student_ids[row]))
+        opportunity = db.get(Opportunity, int(matrix.opportunity_ids[column]))
+        expected = calculate_fit_score(db, student, opportunity)
+        actual = (int(matrix.scores[row, column]) / 100, bool(matrix.eligible[row, column]))
+        if actual != (expected["fit_score"], expected["eligible"]):
+            problems.append(
+                f"student {student.id} x opportunity {opportunity.id}: "
+                f"{actual} != {(expected['fit_score'], expected['eligible'])}"
+            )
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score every student against every opportunity")
+    parser.add_argument("output", help=".npz file to write")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: every core)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="students per task")
+    parser.add_argument("--verify", type=int, default=0, metavar="N", help="check N random pairs against the engine")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        matrix = build_match_matrix(db, args.workers, args.chunk_size)
+        elapsed = time.perf_counter() - start
+        matrix.save(args.output)
+        print(
+            f"{len(matrix.student_ids)} students x {len(matrix.opportunity_ids)} opportunities "
+            f"scored in {elapsed:.1f}s -> {args.output}"
+        )
+        if args.verify:
+            problems = verify_against_engine(db, matrix, args.verify)
+            for problem in problems[:20]:
+                print(f"  mismatch: {problem}")
+            print(f"verified {args.verify} pairs: {len(problems)} mismatches")
+            if problems:
+                raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,57 @@
+import heapq
+from collections import defaultdict
+from typing import Collection, Dict, List, Optional
+
 from sqlalchemy.orm import Session
 
-from ..models import Student, Opportunity, OpportunitySkill, StudentSkill
+from ..models import Student, Opportunity, OpportunitySkill, StudentSkill, Skill
+from .skill_index import skill_index
 
 
 def _student_skills_map(db: Session, student_id: int):
-    return {
-        ss.skill.name.lower(): ss.level
-        for ss in db.query(StudentSkill).filter(StudentSkill.student_id == student_id).all()
-    }
+    rows = (
+        db.query(Skill.name, StudentSkill.level)
+        .join(StudentSkill, StudentSkill.skill_id == Skill.id)
+        .filter(StudentSkill.student_id == student_id)
+        .all()
+    )
+    return {name.lower(): level for name, level in rows}
 
 
-def calculate_fit_score(db: Session, student: Student, opportunity: Opportunity):
-    required_skill_names = [
-        rs.skill.name.lower()
-        for rs in db.query(OpportunitySkill).filter(OpportunitySkill.opportunity_id == opportunity.id).all()
-    ]
-    student_skills = _student_skills_map(db, student.id)
+def _required_skills_map(db: Session, opportunity_ids: List[int], use_index: bool = True) -> Dict[int, List[str]]:
+    """Lowercased required skill names per opportunity.
+
+    With use_index, opportunities the skill index knows are answered from it and only
+    the others (e.g. created by another worker) are queried, in one joined query.
+    """
+    known = {}
+    if use_index and skill_index.ready:
+        known = skill_index.required_skill_names(opportunity_ids)
+        opportunity_ids = [opportunity_id for opportunity_id in opportunity_ids if opportunity_id not in known]
+    required = defaultdict(list, known)
+    if not opportunity_ids:
+        return required
+    query = (
+        db.query(OpportunitySkill.opportunity_id, Skill.name)
+        .join(Skill, Skill.id == OpportunitySkill.skill_id)
+        .order_by(OpportunitySkill.id)
+    )
+    # Loading the whole link table is cheaper than a huge IN list when scoring the full catalog
+    if len(opportunity_ids) <= 500:
+        query = query.filter(OpportunitySkill.opportunity_id.in_(opportunity_ids))
+    for opportunity_id, name in query.all():
+        if opportunity_id not in known:
+            required[opportunity_id].append(name.lower())
+    return required
+
+
+def _fit_score(skill_match: float, cgpa_match: int) -> float:
+    final_score = (0.7 * skill_match) + (0.3 * cgpa_match)
+    # Ensure fit_score is bounded between 0 and 100
+    return max(0, min(100, round(final_score * 100, 2)))
 
+
+def _score(student: Student, opportunity: Opportunity, required_skill_names: List[str], student_skills: dict):
     if not required_skill_names:
         skill_match = 1
         missing_skills = []
@@ -26,11 +61,8 @@ def calculate_fit_score(db: Session, student: Student, opportunity: Opportunity)
         missing_skills = [s for s in required_skill_names if s not in student_skills]
 
     cgpa_match = 1 if student.cgpa >= opportunity.min_cgpa else 0
-    final_score = (0.7 * skill_match) + (0.3 * cgpa_match)
-    
-    # Ensure fit_score is bounded between 0 and 100
-    fit_score = max(0, min(100, round(final_score * 100, 2)))
-    
+    fit_score = _fit_score(skill_match, cgpa_match)
+
     # Determine eligibility and reason
     eligible = cgpa_match == 1 and skill_match > 0
     reason = None
@@ -53,3 +85,105 @@ def calculate_fit_score(db: Session, student: Student, opportunity: Opportunity)
         "reason": reason,
     }
 
+
+def calculate_fit_score(db: Session, student: Student, opportunity: Opportunity):
+    required_skill_names = _required_skills_map(db, [opportunity.id]).get(opportunity.id, [])
+    student_skills = _student_skills_map(db, student.id)
+    return _score(student, opportunity, required_skill_names, student_skills)
+
+
+def calculate_fit_scores(db: Session, student: Student, opportunities: List[Opportunity], use_index: bool = True):
+    """Score many opportunities for one student with a constant number of queries.
+
+    Produces exactly what calling calculate_fit_score once per opportunity would. Pass
+    use_index=False for scores that get stored, so they only depend on the database.
+    """
+    if not opportunities:
+        return []
+    student_skills = _student_skills_map(db, student.id)
+    required = _required_skills_map(db, [opp.id for opp in opportunities], use_index)
+    return [_score(student, opp, required.get(opp.id, []), student_skills) for opp in opportunities]
+
+
+def calculate_student_fit_scores(
+    db: Session,
+    opportunity: Opportunity,
+    required_skill_names: List[str] = None,
+    student_ids: Optional[Collection[int]] = None,
+    use_index: bool = True,
+):
+    """Score every student (or only student_ids) for one opportunity with two queries.
+
+    Yields (student_id, match). use_index is as for calculate_fit_scores.
+    """
+    if required_skill_names is None:
+        required_skill_names = _required_skills_map(db, [opportunity.id], use_index).get(opportunity.id, [])
+    skills_by_student = defaultdict(set)
+    if required_skill_names:
+        query = (
+            db.query(StudentSkill.student_id, Skill.name)
+            .join(Skill, Skill.id == StudentSkill.skill_id)
+            .filter(Skill.name_key.in_(set(required_skill_names)))
+        )
+        if student_ids is not None:
+            query = query.filter(StudentSkill.student_id.in_(student_ids))
+        for student_id, name in query.all():
+            skills_by_student[student_id].add(name.lower())
+    students = db.query(Student.id, Student.cgpa)
+    if student_ids is not None:
+        students = students.filter(Student.id.in_(student_ids))
+    for student in students.all():
+        yield student.id, _score(student, opportunity, required_skill_names, skills_by_student.get(student.id, ()))
+
+
+def rank_students(db: Session, opportunity: Opportunity, limit: int = 50, min_score: float = 0):
+    """Top `limit` students for an opportunity, best fit first (ties by student id).
+
+    Students are pruned in SQL when min_score is out of their reach: those sharing none
+    of the required skills top out at 30, those below min_cgpa at 70.
+    """
+    required = _required_skills_map(db, [opportunity.id]).get(opportunity.id, [])
+
+    query = db.query(Student.id, Student.name, Student.cgpa)
+    if min_score > _fit_score(1, 0):
+        query = query.filter(Student.cgpa >= opportunity.min_cgpa)
+
+    candidates = {}
+    # Skill overlap only prunes when students without any required skill cannot reach min_score
+    if not required or min_score <= _fit_score(0, 1):
+        for student_id, name, cgpa in query.all():
+            candidates[student_id] = (student_id, name, cgpa, set())
+    if required:
+        rows = (
+            query.add_columns(Skill.name)
+            .join(StudentSkill, StudentSkill.student_id == Student.id)
+            .join(Skill, Skill.id == StudentSkill.skill_id)
+            .filter(Skill.name_key.in_(set(required)))
+            .all()
+        )
+        for student_id, name, cgpa, skill_name in rows:
+            candidate = candidates.setdefault(student_id, (student_id, name, cgpa, set()))
+            candidate[3].add(skill_name.lower())
+
+    def fit(candidate):
+        skills = candidate[3]
+        skill_match = sum(1 for s in required if s in skills) / len(required) if required else 1
+        return _fit_score(skill_match, 1 if candidate[2] >= opportunity.min_cgpa else 0)
+
+    scored = ((fit(c), -c[0], c) for c in candidates.values())
+    top = heapq.nlargest(limit, (item for item in scored if item[0] >= min_score))
+
+    results = []
+    for _, _, (student_id, name, cgpa, skills) in top:
+        match = _score(Student(id=student_id, cgpa=cgpa), opportunity, required, skills)
+        results.append(
+            {
+                "student_id": student_id,
+                "student_name": name,
+                "fit_score": match["fit_score"],
+                "eligible": match["eligible"],
+                "missing_skills": match["missing_skills"],
+                "reason": match["reason"],
+            }
+        )
+    return results
@@ -1,12 +1,245 @@
+import logging
+import queue
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event, func, insert, literal, select, update
 from sqlalchemy.orm import Session
 
-from ..models import Notification
+from ..database import SessionLocal, dialect_insert
+from ..models import Notification, NotificationCounter
+from .notification_bus import notification_bus
+
+logger = logging.getLogger(__name__)
+
+# Rows per multi-row INSERT, well under SQLite's bound parameter limit
+_INSERT_CHUNK = 500
+_PENDING_KEY = "pending_notifications"
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session):
+    created = session.info.pop(_PENDING_KEY, None)
+    if created:
+        notification_bus.publish(created)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_uncommitted(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _event(notif) -> dict:
+    return {"id": notif.id, "user_id": notif.user_id, "message": notif.message, "is_read": notif.is_read}
+
+
+def adjust_unread(db: Session, deltas: Dict[int, int]):
+    """Apply unread-count deltas per user, one UPDATE per distinct delta.
+
+    Run after the notification rows themselves are written: a user without a counter
+    yet gets one seeded from an actual count, which already includes the change.
+    """
+    users_by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            users_by_delta[delta].append(user_id)
+    for delta, user_ids in users_by_delta.items():
+        result = db.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.user_id.in_(user_ids))
+            .values(unread=NotificationCounter.unread + delta)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount < len(user_ids):
+            _seed_counters(db, user_ids, delta)
+
+
+def _seed_counters(db: Session, user_ids: List[int], delta: int):
+    existing = set(
+        db.scalars(select(NotificationCounter.user_id).where(NotificationCounter.user_id.in_(user_ids)))
+    )
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    counts = dict(
+        db.execute(
+            select(Notification.user_id, func.count())
+            .where(Notification.user_id.in_(missing), Notification.is_read.is_(False))
+            .group_by(Notification.user_id)
+        ).all()
+    )
+    stmt = dialect_insert(db, NotificationCounter).values(
+        [{"user_id": user_id, "unread": counts.get(user_id, 0)} for user_id in missing]
+    )
+    # A counter seeded concurrently counted committed rows only, so it still needs this change
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[NotificationCounter.user_id],
+            set_={"unread": NotificationCounter.unread + delta},
+        )
+    )
+
 
+def unread_count(db: Session, user_id: int) -> int:
+    unread = db.query(NotificationCounter.unread).filter(NotificationCounter.user_id == user_id).scalar()
+    if unread is None:
+        # First read for this user: initialize the counter from the table once
+        counts = select(literal(user_id), func.count()).where(
+            Notification.user_id == user_id, Notification.is_read.is_(False)
+        )
+        db.execute(
+            dialect_insert(db, NotificationCounter).from_select(["user_id", "unread"], counts).on_conflict_do_nothing()
+        )
+        db.commit()
+        unread = db.query(NotificationCounter.unread).filter(NotificationCounter.user_id == user_id).scalar()
+    return unread
 
-def create_notification(db: Session, user_id: int, message: str) -> Notification:
-    notif = Notification(user_id=user_id, message=message)
-    db.add(notif)
+
+def mark_read(db: Session, user_id: int, up_to_id: int) -> int:
+    """Mark every unread notification of a user with id <= up_to_id as read in one UPDATE."""
+    result = db.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.id <= up_to_id, Notification.is_read.is_(False))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        adjust_unread(db, {user_id: -result.rowcount})
     db.commit()
-    db.refresh(notif)
-    return notif
+    return result.rowcount
+
+
+def create_notifications(db: Session, items: List[dict], commit: bool = True):
+    """Insert many {user_id, message} notifications with multi-row INSERT ... RETURNING.
+
+    They are published to subscribers once the transaction commits.
+    """
+    rows = [{"user_id": item["user_id"], "message": item["message"], "is_read": False} for item in items]
+    for start in range(0, len(rows), _INSERT_CHUNK):
+        stmt = (
+            insert(Notification)
+            .values(rows[start:start + _INSERT_CHUNK])
+            .returning(Notification.id, Notification.user_id, Notification.message, Notification.is_read)
+        )
+        db.info.setdefault(_PENDING_KEY, []).extend(_event(row) for row in db.execute(stmt))
+    if rows:
+        adjust_unread(db, Counter(row["user_id"] for row in rows))
+    if commit:
+        db.commit()
+
+
+class NotificationQueue:
+    """Background writer that batches notifications by size or time window.
+
+    stop() drains the queue, so nothing enqueued before shutdown is lost. When the
+    worker is not running or is stopping, enqueue() writes synchronously instead.
+    A batch that fails to write is retried with the next one; at most max_failed
+    notifications are held for retry, and the oldest are dropped beyond that.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = 200,
+        flush_interval: float = 0.25,
+        max_failed: int = 10000,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_failed = max_failed
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        # Orders enqueue() against the stop marker, and guards _failed
+        self._lock = threading.Lock()
+        self._failed: List[dict] = []
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="notification-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """Flush the queue and stop the worker; False if it is still writing after timeout."""
+        with self._lock:
+            if not self.running:
+                return True
+            if not self._stopping:
+                self._stopping = True
+                self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("Notification writer still flushing after %.1fs", timeout)
+            return False
+        self._thread = None
+        if self._failed:
+            # Last chance for a batch whose final flush failed
+            self._write([])
+        return True
+
+    def enqueue(self, user_id: int, message: str):
+        item = {"user_id": user_id, "message": message}
+        with self._lock:
+            if self.running and not self._stopping:
+                self._queue.put(item)
+                return
+        self._write([item])
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            if stopping:
+                # Drain whatever was enqueued ahead of the stop marker
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not None:
+                        batch.append(item)
+            if batch or self._failed:
+                self._write(batch)
+
+    def _write(self, batch: List[dict]):
+        with self._lock:
+            items, self._failed = self._failed + batch, []
+        db = None
+        try:
+            db = self.session_factory()
+            create_notifications(db, items)
+        except Exception:
+            if db is not None:
+                db.rollback()
+            logger.exception("Failed to write %d notifications", len(items))
+            # Keep them for the next flush, up to max_failed
+            with self._lock:
+                self._failed = items + self._failed
+                dropped = len(self._failed) - self.max_failed
+                if dropped > 0:
+                    del self._failed[:dropped]
+                    logger.error("Dropped %d notifications held for retry", dropped)
+        finally:
+            if db is not None:
+                db.close()
+
 
+notification_queue = NotificationQueue()
@@ -0,0 +1,111 @@
+"""
+In-process pub/sub for notification push delivery.
+
+Committed notifications are published here and fanned out to the SSE streams of
+their user. Each subscriber has a bounded queue; a subscriber that falls behind is
+cut off and resumes from its last-seen id on reconnect. A short per-user history
+lets most resumes skip the database. Like the other in-process caches, the bus only
+sees notifications written by this process.
+"""
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Set
+
+
+class Subscriber:
+    __slots__ = ("user_id", "queue", "loop", "overflowed")
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: "asyncio.Queue[Optional[dict]]" = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def _deliver(self, event: dict):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog and signal the stream to close; the client resumes from its last id
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class _History:
+    __slots__ = ("events", "floor")
+
+    def __init__(self, size: int, floor: int):
+        self.events: Deque[dict] = deque(maxlen=size)
+        # Every notification with an id above floor is in events
+        self.floor = floor
+
+    def append(self, event: dict):
+        if len(self.events) == self.events.maxlen:
+            self.floor = self.events[0]["id"]
+        self.events.append(event)
+
+
+class NotificationBus:
+    def __init__(self, queue_size: int = 100, history_size: int = 50, max_history_users: int = 10000):
+        self.queue_size = queue_size
+        self.history_size = history_size
+        self.max_history_users = max_history_users
+        self._subscribers: Dict[int, Set[Subscriber]] = {}
+        self._history: "OrderedDict[int, _History]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Subscriber:
+        """Register a subscriber; must be called from the event loop that will consume it."""
+        subscriber = Subscriber(user_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.user_id)
+            if subscribers:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.user_id]
+
+    def publish(self, events: List[dict]):
+        """Fan out committed notifications ({id, user_id, message, is_read}); safe from any thread."""
+        with self._lock:
+            targets = []
+            for event in sorted(events, key=lambda e: e["id"]):
+                history = self._history.get(event["user_id"])
+                if history is None:
+                    history = self._history[event["user_id"]] = _History(self.history_size, event["id"] - 1)
+                    if len(self._history) > self.max_history_users:
+                        self._history.popitem(last=False)
+                else:
+                    self._history.move_to_end(event["user_id"])
+                history.append(event)
+                targets.extend((subscriber, event) for subscriber in self._subscribers.get(event["user_id"], ()))
+        for subscriber, event in targets:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber._deliver, event)
+            except RuntimeError:
+                # Event loop already closed; the stream is gone
+                self.unsubscribe(subscriber)
+
+    def clear(self):
+        """Forget the history, as a restarted worker would; subscribers stay."""
+        with self._lock:
+            self._history.clear()
+
+    def since(self, user_id: int, last_id: int) -> Optional[List[dict]]:
+        """Notifications after last_id from history, or None if history does not reach back that far."""
+        with self._lock:
+            history = self._history.get(user_id)
+            if history is None or last_id < history.floor:
+                return None
+            return [event for event in history.events if event["id"] > last_id]
+
+
+notification_bus = NotificationBus()
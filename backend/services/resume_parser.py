@@ -1,10 +1,235 @@
 """
-Stub for future ML-based resume parsing.
-Currently unused but kept for extensibility.
+Resume ingestion: text extraction and skill extraction.
+
+Text is extracted on a process pool, since PDF and DOCX parsing is CPU-bound and
+holds the GIL, and matched against the whole skill vocabulary with the skill
+automaton. The pool starts on first use and the app shuts it down on exit. A batch
+is split into a few chunks per worker and each chunk carries the automaton, so
+extraction and matching both run on every core. Found skills are added to the
+student in bulk at EXTRACTED_SKILL_LEVEL; skills the student already has keep their
+level.
+
+    python -m backend.services.resume_parser resumes/   # files named <student_id>.<ext>
 """
+import argparse
+import asyncio
+import io
+import itertools
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from xml.etree import ElementTree
+
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import FitScore, Student, StudentSkill
+from ..utils.response_cache import response_cache
+from .search import reindex_students
+from .skill_automaton import SkillAutomaton, skill_automaton
+
+MAX_RESUME_BYTES = int(os.getenv("MAX_RESUME_BYTES", str(5 * 1024 * 1024)))
+# Decompressed size allowed for a DOCX's document.xml, so a small zip bomb cannot exhaust memory
+MAX_DOCX_XML_BYTES = int(os.getenv("MAX_DOCX_XML_BYTES", str(50 * 1024 * 1024)))
+# Students can raise it with /student/add-skill
+EXTRACTED_SKILL_LEVEL = 1
+SUPPORTED_SUFFIXES = (".pdf", ".docx", ".txt", ".md")
+
+RESUME_WORKERS = int(os.getenv("RESUME_WORKERS", str(os.cpu_count() or 2)))
+
+_extract_pool: Optional[ProcessPoolExecutor] = None
+_extract_pool_lock = threading.Lock()
+
+_DOCX_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class ResumeRejected(Exception):
+    pass
+
+
+def _docx_text(data: bytes) -> str:
+    too_large = ResumeRejected(f"DOCX text larger than {MAX_DOCX_XML_BYTES} bytes")
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            info = archive.getinfo("word/document.xml")
+            if info.file_size > MAX_DOCX_XML_BYTES:
+                raise too_large
+            # The declared size can lie; never inflate more than the cap
+            with archive.open(info) as member:
+                document = member.read(MAX_DOCX_XML_BYTES + 1)
+    except (zipfile.BadZipFile, KeyError, zlib.error, EOFError):
+        raise ResumeRejected("Not a valid DOCX file")
+    if len(document) > MAX_DOCX_XML_BYTES:
+        raise too_large
+    lines, line = [], []
+    for _, element in ElementTree.iterparse(io.BytesIO(document), events=("end",)):
+        if element.tag == _DOCX_NS + "t" and element.text:
+            line.append(element.text)
+        elif element.tag == _DOCX_NS + "p":
+            lines.append("".join(line))
+            line = []
+            element.clear()
+    return "\n".join(lines)
+
+
+def _pdf_text(data: bytes) -> str:
+    try:
+        from pypdf import PdfReader
+        from pypdf.errors import PdfReadError
+    except ImportError:
+        raise ResumeRejected("PDF resumes need the pypdf package")
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+    except (PdfReadError, ValueError):
+        raise ResumeRejected("Not a readable PDF file")
+
+
+def extract_text(filename: str, data: bytes) -> str:
+    suffix = os.path.splitext(filename.lower())[1]
+    if suffix == ".pdf":
+        return _pdf_text(data)
+    if suffix == ".docx":
+        return _docx_text(data)
+    if suffix in (".txt", ".md"):
+        return data.decode("utf-8", errors="replace")
+    raise ResumeRejected(
+        f"Unsupported resume format {suffix or filename!r}; use one of {', '.join(SUPPORTED_SUFFIXES)}"
+    )
+
+
+def parse_resume(filename: str, data: bytes, automaton: SkillAutomaton) -> List[int]:
+    """Ids of the known skills a resume mentions."""
+    return automaton.find(extract_text(filename, data))
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            # spawn rather than fork: the server process runs threads (notification queue, hash pool)
+            _extract_pool = ProcessPoolExecutor(
+                max_workers=RESUME_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _extract_pool
+
+
+def shutdown_extract_pool():
+    """Stop the extraction workers, if any were started; the next extraction starts new ones."""
+    global _extract_pool
+    with _extract_pool_lock:
+        pool, _extract_pool = _extract_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+async def extract_text_async(filename: str, data: bytes) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_pool(), extract_text, filename, data)
+
+
+def _parse_chunk(automaton: SkillAutomaton, files: Sequence[Tuple[str, bytes]]):
+    results = []
+    for filename, data in files:
+        try:
+            results.append(parse_resume(filename, data, automaton))
+        except ResumeRejected as exc:
+            results.append(exc)
+    return results
+
+
+def parse_resumes(
+    files: Sequence[Tuple[str, bytes]], automaton: SkillAutomaton
+) -> List[Union[List[int], ResumeRejected]]:
+    """Parse (filename, bytes) pairs on every worker; per file, in order, its skill ids or the rejection."""
+    if not files:
+        return []
+    # A few chunks per worker evens out uneven files; the automaton is pickled once per chunk
+    size = math.ceil(len(files) / (RESUME_WORKERS * 4))
+    chunks = [files[start : start + size] for start in range(0, len(files), size)]
+    return list(itertools.chain.from_iterable(_pool().map(_parse_chunk, itertools.repeat(automaton), chunks)))
+
+
+def add_extracted_skills(db: Session, skill_ids_by_student: Dict[int, List[int]]) -> List[dict]:
+    """Give students the extracted skills they do not have yet; returns the inserted rows.
+
+    Also rewrites their search documents. Fit scores are left to the caller. Does not commit.
+    """
+    student_ids = [student_id for student_id, skill_ids in skill_ids_by_student.items() if skill_ids]
+    if not student_ids:
+        return []
+    existing = set(
+        db.query(StudentSkill.student_id, StudentSkill.skill_id).filter(StudentSkill.student_id.in_(student_ids))
+    )
+    rows = [
+        {"student_id": student_id, "skill_id": skill_id, "level": EXTRACTED_SKILL_LEVEL}
+        for student_id in student_ids
+        for skill_id in dict.fromkeys(skill_ids_by_student[student_id])
+        if (student_id, skill_id) not in existing
+    ]
+    if rows:
+        db.execute(StudentSkill.__table__.insert(), rows)
+        reindex_students(db, {row["student_id"] for row in rows})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract skills from a directory of resumes")
+    parser.add_argument("directory", help="resumes named <student_id>.<ext>")
+    parser.add_argument("--batch-size", type=int, default=1000, help="resumes held in memory at once")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for name in sorted(os.listdir(args.directory)):
+        stem, suffix = os.path.splitext(name)
+        if stem.isdigit() and suffix.lower() in SUPPORTED_SUFFIXES:
+            paths.append((int(stem), os.path.join(args.directory, name)))
+        else:
+            print(f"{name}: skipped, expected <student_id>{'|'.join(SUPPORTED_SUFFIXES)}", file=sys.stderr)
+
+    db = SessionLocal()
+    try:
+        known = {student_id for (student_id,) in db.query(Student.id)}
+        automaton = skill_automaton.get(db)
+        added = failed = 0
+        for start in range(0, len(paths), args.batch_size):
+            student_ids, files = [], []
+            for student_id, path in paths[start : start + args.batch_size]:
+                if student_id not in known:
+                    failed += 1
+                    print(f"{path}: no such student", file=sys.stderr)
+                elif os.path.getsize(path) > MAX_RESUME_BYTES:
+                    failed += 1
+                    print(f"{path}: larger than {MAX_RESUME_BYTES} bytes", file=sys.stderr)
+                else:
+                    with open(path, "rb") as f:
+                        files.append((path, f.read()))
+                    student_ids.append(student_id)
 
+            found: Dict[int, List[int]] = {}
+            for student_id, (path, _), result in zip(student_ids, files, parse_resumes(files, automaton)):
+                if isinstance(result, ResumeRejected):
+                    failed += 1
+                    print(f"{path}: {result}", file=sys.stderr)
+                else:
+                    found.setdefault(student_id, []).extend(result)
+            rows = add_extracted_skills(db, found)
+            changed = {row["student_id"] for row in rows}
+            # Like bulk imports, changed students are rescored on first read
+            db.query(FitScore).filter(FitScore.student_id.in_(changed)).delete(synchronize_session=False)
+            response_cache.invalidate(db, *{("student", student_id) for student_id in changed})
+            db.commit()
+            added += len(rows)
+    finally:
+        db.close()
+        shutdown_extract_pool()
+    print(f"{len(paths)} resumes, {failed} failed, {added} skills added")
 
-def parse_resume(file_bytes: bytes):
-    # Placeholder logic; integrate ML/NLP models later.
-    return {"summary": "Resume parsing not implemented yet", "skills": []}
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Full-text search over opportunities and student profiles.
+
+On SQLite built with FTS5 each document type has an FTS5 table (rowid = entity id)
+ranked with bm25; on other databases documents are stored as weighted terms in
+search_terms and ranked by summed weight. Migration 5 picks the backend and backfills
+the index; the write paths call reindex_opportunities / reindex_students inside their
+own transaction, so the index commits or rolls back with the data.
+
+Every query term must match; the last one also matches as a prefix, so results
+narrow while the user is still typing.
+"""
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, inspect, literal, or_, select, text, union_all
+from sqlalchemy.orm import Session
+
+from ..models import Opportunity, OpportunitySkill, SearchTerm, Skill, Student, StudentSkill
+
+DOC_OPPORTUNITY = "opportunity"
+DOC_STUDENT = "student"
+
+# Indexed fields and their ranking weights, in FTS5 column order
+FIELDS = {
+    DOC_OPPORTUNITY: (("title", 10.0), ("creator_name", 2.0), ("skills", 5.0)),
+    DOC_STUDENT: (("name", 10.0), ("skills", 5.0), ("profile", 1.0)),
+}
+FTS_TABLES = {DOC_OPPORTUNITY: "opportunity_search", DOC_STUDENT: "student_search"}
+FTS_TOKENIZER = "porter unicode61 remove_diacritics 2"
+
+# Ids per DELETE / document load
+_BATCH_SIZE = 500
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Whether each database (by URL) has the FTS5 tables; decided once per process
+_fts_by_url: Dict[str, bool] = {}
+
+
+def tokenize(value: str) -> List[str]:
+    """Lowercased words with diacritics removed, like FTS5's unicode61 tokenizer."""
+    folded = "".join(ch for ch in unicodedata.normalize("NFKD", value or "") if not unicodedata.combining(ch))
+    return [token.lower() for token in _TOKEN.findall(folded)]
+
+
+def fts5_supported(conn) -> bool:
+    return conn.dialect.name == "sqlite" and bool(
+        conn.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar()
+    )
+
+
+def create_fts_tables(conn):
+    for doc_type, table in FTS_TABLES.items():
+        columns = ", ".join(name for name, _ in FIELDS[doc_type])
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5({columns}, tokenize='{FTS_TOKENIZER}')"
+        )
+
+
+def uses_fts(db: Session) -> bool:
+    bind = db.get_bind()
+    key = str(bind.engine.url)
+    if key not in _fts_by_url:
+        _fts_by_url[key] = bind.dialect.name == "sqlite" and inspect(db.connection()).has_table(
+            FTS_TABLES[DOC_OPPORTUNITY]
+        )
+    return _fts_by_url[key]
+
+
+def _batches(ids: Iterable[int]):
+    ids = list(dict.fromkeys(ids))
+    for start in range(0, len(ids), _BATCH_SIZE):
+        yield ids[start : start + _BATCH_SIZE]
+
+
+def _flatten(value) -> Iterable[str]:
+    """String leaves of a JSON profile field."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _flatten(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _flatten(item)
+
+
+def opportunity_documents(db: Session, ids: List[int]) -> Dict[int, Tuple[str, ...]]:
+    skills = defaultdict(list)
+    for opportunity_id, name in (
+        db.query(OpportunitySkill.opportunity_id, Skill.name)
+        .join(Skill, Skill.id == OpportunitySkill.skill_id)
+        .filter(OpportunitySkill.opportunity_id.in_(ids))
+    ):
+        skills[opportunity_id].append(name)
+    return {
+        opportunity_id: (title, creator_name, " ".join(skills[opportunity_id]))
+        for opportunity_id, title, creator_name in db.query(
+            Opportunity.id, Opportunity.title, Opportunity.creator_name
+        ).filter(Opportunity.id.in_(ids))
+    }
+
+
+def student_documents(db: Session, ids: List[int]) -> Dict[int, Tuple[str, ...]]:
+    skills = defaultdict(list)
+    for student_id, name in (
+        db.query(StudentSkill.student_id, Skill.name)
+        .join(Skill, Skill.id == StudentSkill.skill_id)
+        .filter(StudentSkill.student_id.in_(ids))
+    ):
+        skills[student_id].append(name)
+    rows = db.query(
+        Student.id, Student.name, Student.branch, Student.projects, Student.certifications, Student.interests
+    ).filter(Student.id.in_(ids))
+    # external_links holds URLs, which are not worth indexing
+    return {
+        student_id: (
+            name,
+            " ".join(skills[student_id]),
+            " ".join(_flatten([branch, projects, certifications, interests])),
+        )
+        for student_id, name, branch, projects, certifications, interests in rows
+    }
+
+
+_LOADERS = {DOC_OPPORTUNITY: opportunity_documents, DOC_STUDENT: student_documents}
+
+
+def _reindex(db: Session, doc_type: str, ids: Iterable[int]):
+    fts = uses_fts(db)
+    for batch in _batches(ids):
+        documents = _LOADERS[doc_type](db, batch)
+        if fts:
+            table = FTS_TABLES[doc_type]
+            columns = [name for name, _ in FIELDS[doc_type]]
+            db.execute(text(f"DELETE FROM {table} WHERE rowid IN ({', '.join(map(str, batch))})"))
+            if documents:
+                db.execute(
+                    text(
+                        f"INSERT INTO {table} (rowid, {', '.join(columns)}) "
+                        f"VALUES (:doc_id, {', '.join(':' + name for name in columns)})"
+                    ),
+                    [{"doc_id": doc_id, **dict(zip(columns, values))} for doc_id, values in documents.items()],
+                )
+            continue
+
+        db.query(SearchTerm).filter(SearchTerm.doc_type == doc_type, SearchTerm.doc_id.in_(batch)).delete(
+            synchronize_session=False
+        )
+        rows = []
+        for doc_id, values in documents.items():
+            weights = Counter()
+            for (_, weight), value in zip(FIELDS[doc_type], values):
+                for token in tokenize(value):
+                    weights[token] += weight
+            rows.extend(
+                {"doc_type": doc_type, "doc_id": doc_id, "term": term, "weight": weight}
+                for term, weight in weights.items()
+            )
+        if rows:
+            db.execute(SearchTerm.__table__.insert(), rows)
+
+
+def reindex_opportunities(db: Session, ids: Iterable[int]):
+    """Rewrite the search documents of these opportunities from the database (missing ids are dropped)."""
+    _reindex(db, DOC_OPPORTUNITY, ids)
+
+
+def reindex_students(db: Session, ids: Iterable[int]):
+    """Rewrite the search documents of these students from the database (missing ids are dropped)."""
+    _reindex(db, DOC_STUDENT, ids)
+
+
+def _fts_query(doc_type: str, terms: List[str]):
+    table = FTS_TABLES[doc_type]
+    weights = ", ".join(str(weight) for _, weight in FIELDS[doc_type])
+    match = " ".join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+    return (
+        text(f"SELECT rowid AS doc_id, -bm25({table}, {weights}) AS score FROM {table} WHERE {table} MATCH :match")
+        .bindparams(match=match)
+        .columns(doc_id=SearchTerm.doc_id.type, score=SearchTerm.weight.type)
+        .subquery()
+    )
+
+
+def _terms_query(doc_type: str, terms: List[str]):
+    *exact, prefix = terms
+    # Upper bound of the prefix range, so the primary key index serves it
+    prefix_end = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    conditions = [SearchTerm.term == term for term in exact]
+    conditions.append(and_(SearchTerm.term >= prefix, SearchTerm.term < prefix_end))
+    matches = union_all(
+        *(
+            select(SearchTerm.doc_id, SearchTerm.weight, literal(slot).label("slot")).where(
+                SearchTerm.doc_type == doc_type, condition
+            )
+            for slot, condition in enumerate(conditions)
+        )
+    ).subquery()
+    return (
+        select(matches.c.doc_id, func.sum(matches.c.weight).label("score"))
+        .group_by(matches.c.doc_id)
+        .having(func.count(matches.c.slot.distinct()) == len(conditions))
+        .subquery()
+    )
+
+
+def search(
+    db: Session, doc_type: str, q: str, limit: int, after: Optional[tuple] = None
+) -> List[Tuple[int, float]]:
+    """(doc id, score) of the best matches, best first (ties by id).
+
+    `after` is the (score, id) of the previous page's last hit.
+    """
+    terms = list(dict.fromkeys(tokenize(q)))
+    if not terms:
+        return []
+    hits = _fts_query(doc_type, terms) if uses_fts(db) else _terms_query(doc_type, terms)
+    query = select(hits.c.doc_id, hits.c.score)
+    if after is not None:
+        score, doc_id = after
+        query = query.where(or_(hits.c.score < score, and_(hits.c.score == score, hits.c.doc_id > doc_id)))
+    query = query.order_by(hits.c.score.desc(), hits.c.doc_id).limit(limit)
+    return [(doc_id, score) for doc_id, score in db.execute(query)]
@@ -0,0 +1,122 @@
+"""
+Multi-pattern skill extraction from free text.
+
+SkillAutomaton is an Aho–Corasick automaton over the case-folded names of every
+skill, so one pass over a text finds all the skills it mentions at a cost that
+depends on the text, not on the size of the vocabulary. Matches must start and end
+on word boundaries: "java" does not match inside "javascript", and "c" does not
+match inside "c++".
+
+skill_automaton keeps one automaton per process. It is built on first use and
+rebuilt on the next use after a commit creates skills.
+"""
+import threading
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models import Skill
+
+# Characters that continue a word besides letters and digits, for names like C++ and C#
+_WORD_SYMBOLS = "+#"
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch in _WORD_SYMBOLS
+
+
+def _fold(text: str) -> str:
+    # Same folding for names and texts: lower-cased, whitespace runs collapsed
+    return " ".join(text.lower().split())
+
+
+class SkillAutomaton:
+    __slots__ = ("_goto", "_fail", "_out", "_skills")
+
+    def __init__(self, skills: Iterable[Tuple[int, str]]):
+        """Build from (skill id, name) pairs."""
+        goto = [{}]
+        out: List[tuple] = [()]
+        self._skills: List[Tuple[int, str]] = []
+        for skill_id, name in skills:
+            key = _fold(name)
+            if not key:
+                continue
+            state = 0
+            for ch in key:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    out.append(())
+                state = next_state
+            out[state] += (len(self._skills),)
+            self._skills.append((skill_id, key))
+
+        # Failure links breadth first, so a state's suffix states are complete before it
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in goto[state].items():
+                queue.append(next_state)
+                suffix = fail[state]
+                while suffix and ch not in goto[suffix]:
+                    suffix = fail[suffix]
+                fail[next_state] = goto[suffix].get(ch, 0)
+                out[next_state] += out[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    def find(self, text: str) -> List[int]:
+        """Ids of the skills mentioned in text, in order of first mention."""
+        text = _fold(text)
+        goto, fail, out, skills = self._goto, self._fail, self._out, self._skills
+        found = {}
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern in out[state]:
+                skill_id, key = skills[pattern]
+                if skill_id in found:
+                    continue
+                start = end - len(key) + 1
+                if _is_word_char(key[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(key[-1]) and end + 1 < len(text) and _is_word_char(text[end + 1]):
+                    continue
+                found[skill_id] = None
+        return list(found)
+
+
+class SkillAutomatonCache:
+    __slots__ = ("_automaton", "_stale", "_lock")
+
+    def __init__(self):
+        self._automaton: Optional[SkillAutomaton] = None
+        self._stale = False
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> SkillAutomaton:
+        if self._automaton is None or self._stale:
+            with self._lock:
+                if self._automaton is None or self._stale:
+                    # Cleared before loading, so skills created meanwhile trigger another rebuild
+                    self._stale = False
+                    self._automaton = SkillAutomaton(db.query(Skill.id, Skill.name))
+        return self._automaton
+
+    def invalidate(self):
+        self._stale = True
+
+
+skill_automaton = SkillAutomatonCache()
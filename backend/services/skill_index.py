@@ -0,0 +1,96 @@
+"""
+In-process index of what each opportunity requires.
+
+Maps opportunity id -> required skill ids and skill id -> name so matching can answer
+"what does O need" without SQL. The index is per process: it is built at startup and
+kept current by this process's write paths that create skills and opportunities, so it
+misses rows written by other workers or the bulk import CLI. Lookups therefore only
+answer for what the index knows, and results that get stored (fit_scores) are computed
+from the database. Who holds a skill is always read from the database, which every
+process writes to.
+"""
+import threading
+from array import array
+from typing import Dict, Iterable, List
+
+from sqlalchemy.orm import Session
+
+from ..models import Opportunity, Skill, OpportunitySkill
+
+
+class SkillIndex:
+    __slots__ = ("ready", "_opportunity_skills", "_skill_names", "_lock")
+
+    def __init__(self):
+        self.ready = False
+        self._opportunity_skills: Dict[int, array] = {}
+        self._skill_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def build(self, db: Session):
+        # Writers wait on the lock while loading so no update is lost in the swap
+        with self._lock:
+            opportunity_skills, skill_names = self._load(db)
+            self._opportunity_skills = opportunity_skills
+            self._skill_names = skill_names
+            self.ready = True
+
+    @staticmethod
+    def _load(db: Session):
+        skill_names = {skill_id: name for skill_id, name in db.query(Skill.id, Skill.name).all()}
+        # Opportunities without required skills are known too, with an empty list
+        opportunity_skills: Dict[int, array] = {
+            opportunity_id: array("i") for (opportunity_id,) in db.query(Opportunity.id).all()
+        }
+        for opportunity_id, skill_id in (
+            db.query(OpportunitySkill.opportunity_id, OpportunitySkill.skill_id).order_by(OpportunitySkill.id).all()
+        ):
+            opportunity_skills.setdefault(opportunity_id, array("i")).append(skill_id)
+        return opportunity_skills, skill_names
+
+    # Write paths
+
+    def add_skill(self, skill_id: int, name: str):
+        with self._lock:
+            self._skill_names[skill_id] = name
+
+    def set_opportunity_skills(self, opportunity_id: int, skill_ids: Iterable[int]):
+        with self._lock:
+            self._opportunity_skills[opportunity_id] = array("i", skill_ids)
+
+    # Lookups
+
+    def opportunity_skill_ids(self, opportunity_id: int) -> List[int]:
+        return list(self._opportunity_skills.get(opportunity_id, ()))
+
+    def required_skill_names(self, opportunity_ids: Iterable[int]) -> Dict[int, List[str]]:
+        """Lowercased required skill names of the given opportunities that the index knows.
+
+        Opportunities created by another process are left out, as are those needing a
+        skill the index has no name for; callers look them up in the database.
+        """
+        names = self._skill_names
+        known = {}
+        for opportunity_id in opportunity_ids:
+            skill_ids = self._opportunity_skills.get(opportunity_id)
+            if skill_ids is not None and all(skill_id in names for skill_id in skill_ids):
+                known[opportunity_id] = [names[skill_id].lower() for skill_id in skill_ids]
+        return known
+
+    def check_consistency(self, db: Session) -> List[str]:
+        """Compare the index with the database; returns a description of every mismatch."""
+        opportunity_skills, skill_names = self._load(db)
+        problems = []
+        for skill_id in set(skill_names) | set(self._skill_names):
+            indexed_name, actual_name = self._skill_names.get(skill_id), skill_names.get(skill_id)
+            if indexed_name != actual_name:
+                problems.append(f"skill {skill_id}: name {indexed_name!r} != {actual_name!r}")
+        for opportunity_id in set(opportunity_skills) | set(self._opportunity_skills):
+            indexed = self.opportunity_skill_ids(opportunity_id)
+            actual = list(opportunity_skills.get(opportunity_id, ()))
+            if indexed != actual:
+                problems.append(f"opportunity {opportunity_id}: skills {indexed} != {actual}")
+        return problems
+
+
+skill_index = SkillIndex()
@@ -0,0 +1,266 @@
+"""
+Skill autocomplete and near-duplicate resolution.
+
+SkillLexicon holds every skill name and alias in memory:
+- a prefix trie whose nodes keep their best completions, ranked by how many students
+  and opportunities use the skill, so a suggestion is one walk down the trie;
+- a trigram index that yields fuzzy candidates for typos ("Pyhton"), ranked by
+  trigram overlap, to fill up short suggestion lists.
+
+resolve() maps a name that is not a skill to a canonical one on write: through an alias
+(skill_aliases rows, or DEFAULT_ALIASES when their target exists), then through the
+name with spaces and punctuation dropped ("Node JS" -> Node.js). Close spellings are
+only ever suggested, never resolved: Flash and Flask, or MSSQL and MySQL, are
+different skills one edit apart. Like the skill index the lexicon is per process,
+built at startup and kept current by the write paths.
+"""
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import OpportunitySkill, Skill, SkillAlias, StudentSkill
+
+# Completions kept per trie node, i.e. the most /skills/suggest returns
+MAX_SUGGESTIONS = 20
+
+# Trigram-overlap candidates ranked for a suggestion
+FUZZY_CANDIDATES = 20
+# Dice coefficient a fuzzy suggestion needs
+SUGGEST_MIN_SIMILARITY = 0.3
+
+# Common spellings, used when the skill they point to exists. Only unambiguous ones:
+# "tf" (TensorFlow or Terraform?) and the like need a skill_aliases row
+DEFAULT_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "golang": "go",
+    "py": "python",
+    "cpp": "c++",
+    "csharp": "c#",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "sklearn": "scikit-learn",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "dsa": "data structures and algorithms",
+    "oop": "object oriented programming",
+}
+
+
+def _key(name: str) -> str:
+    # Same folding as skills.skill_key
+    return " ".join(name.split()).lower()
+
+
+def _compact(key: str) -> str:
+    return "".join(ch for ch in key if ch.isalnum() or ch in "+#")
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+# Trie entries sort best first: most used, then shortest, then alphabetical
+_Entry = Tuple[int, int, str, int]  # (-popularity, len(key), key, skill_id)
+
+
+def _best(entries: Iterable[_Entry]) -> List[_Entry]:
+    best, seen = [], set()
+    for entry in sorted(entries):
+        if entry[3] not in seen:
+            seen.add(entry[3])
+            best.append(entry)
+            if len(best) == MAX_SUGGESTIONS:
+                break
+    return best
+
+
+class _TrieNode:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.top: List[_Entry] = []
+
+
+_STATE = ("_names", "_keys", "_aliases", "_popularity", "_root", "_terms", "_trigrams", "_compact")
+
+
+class SkillLexicon:
+    __slots__ = ("ready", "_lock") + _STATE
+
+    def __init__(self):
+        self.ready = False
+        self._lock = threading.Lock()
+        self._names: Dict[int, str] = {}
+        self._keys: Dict[str, int] = {}
+        self._aliases: Dict[str, int] = {}
+        self._popularity: Dict[int, int] = {}
+        self._root = _TrieNode()
+        # (key, skill_id) of every name and alias; the trigram index points into it
+        self._terms: List[Tuple[str, int]] = []
+        self._trigrams: Dict[str, List[int]] = {}
+        self._compact: Dict[str, Set[int]] = {}
+
+    def build(self, db: Session):
+        skills = db.query(Skill.id, Skill.name).all()
+        aliases = db.query(SkillAlias.alias, SkillAlias.skill_id).all()
+        popularity = Counter()
+        for link in (StudentSkill, OpportunitySkill):
+            for skill_id, count in db.query(link.skill_id, func.count()).group_by(link.skill_id):
+                popularity[skill_id] += count
+        # Writers wait on the lock while loading so no update is lost; readers see the
+        # old structures until the swap, since the new ones are built on a scratch lexicon
+        with self._lock:
+            loaded = SkillLexicon()
+            loaded._popularity = dict(popularity)
+            terminals: Dict[str, List[_Entry]] = {}
+            for skill_id, name in skills:
+                loaded._names[skill_id] = name
+                loaded._keys[_key(name)] = skill_id
+            for alias, skill_id in aliases:
+                loaded._aliases[alias] = skill_id
+            for key, skill_id in loaded._all_terms():
+                loaded._index_term(key, skill_id)
+                terminals.setdefault(key, []).append(loaded._entry(key, skill_id))
+            loaded._build_trie(terminals)
+            for name in _STATE:
+                setattr(self, name, getattr(loaded, name))
+            self.ready = True
+
+    def _all_terms(self) -> Iterable[Tuple[str, int]]:
+        yield from self._keys.items()
+        yield from self._aliases.items()
+        for alias, target in DEFAULT_ALIASES.items():
+            if alias not in self._keys and alias not in self._aliases and target in self._keys:
+                yield alias, self._keys[target]
+
+    def _entry(self, key: str, skill_id: int) -> _Entry:
+        return (-self._popularity.get(skill_id, 0), len(key), key, skill_id)
+
+    def _index_term(self, key: str, skill_id: int):
+        term = len(self._terms)
+        self._terms.append((key, skill_id))
+        for trigram in _trigrams(key):
+            self._trigrams.setdefault(trigram, []).append(term)
+        self._compact.setdefault(_compact(key), set()).add(skill_id)
+
+    def _build_trie(self, terminals: Dict[str, List[_Entry]]):
+        nodes = []
+        for key, entries in terminals.items():
+            node = self._root
+            for ch in key:
+                node = self._child(node, ch)
+            node.top = entries
+        # Children before parents, so each node merges its children's finished lists
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(node.children.values())
+        for node in reversed(nodes):
+            if not node.top and len(node.children) == 1:
+                # Inside a chain the list is the child's; lists are replaced, never mutated
+                node.top = next(iter(node.children.values())).top
+            else:
+                node.top = _best(node.top + [entry for child in node.children.values() for entry in child.top])
+
+    @staticmethod
+    def _child(node: _TrieNode, ch: str) -> _TrieNode:
+        child = node.children.get(ch)
+        if child is None:
+            child = node.children[ch] = _TrieNode()
+        return child
+
+    def _add_term(self, key: str, skill_id: int):
+        self._index_term(key, skill_id)
+        entry = self._entry(key, skill_id)
+        node = self._root
+        node.top = _best(node.top + [entry])
+        for ch in key:
+            node = self._child(node, ch)
+            node.top = _best(node.top + [entry])
+
+    # Write paths
+
+    def add_skill(self, skill_id: int, name: str):
+        with self._lock:
+            key = _key(name)
+            self._names[skill_id] = name
+            self._keys[key] = skill_id
+            self._add_term(key, skill_id)
+            for alias, target in DEFAULT_ALIASES.items():
+                if target == key and alias not in self._keys and alias not in self._aliases:
+                    self._add_term(alias, skill_id)
+
+    def add_alias(self, alias: str, skill_id: int):
+        with self._lock:
+            self._aliases[alias] = skill_id
+            self._add_term(alias, skill_id)
+
+    # Lookups
+
+    def _skill(self, skill_id: Optional[int]) -> Optional[Tuple[int, str]]:
+        return (skill_id, self._names[skill_id]) if skill_id is not None else None
+
+    def lookup(self, key: str) -> Optional[Tuple[int, str]]:
+        """(id, name) of the skill with this key, or that it is an alias of."""
+        skill_id = self._keys.get(key)
+        if skill_id is None:
+            skill_id = self._aliases.get(key)
+        if skill_id is None and DEFAULT_ALIASES.get(key) in self._keys:
+            skill_id = self._keys[DEFAULT_ALIASES[key]]
+        return self._skill(skill_id)
+
+    def _fuzzy_candidates(self, key: str) -> List[Tuple[int, str, int]]:
+        """(shared trigrams, term key, skill id), most shared first."""
+        shared = Counter()
+        for trigram in _trigrams(key):
+            shared.update(self._trigrams.get(trigram, ()))
+        return [(count, *self._terms[term]) for term, count in shared.most_common(FUZZY_CANDIDATES)]
+
+    def resolve(self, key: str) -> Optional[Tuple[int, str]]:
+        """(id, name) of the one skill a non-exact key stands for, if any."""
+        found = self.lookup(key)
+        if found:
+            return found
+        same_compact = self._compact.get(_compact(key), ())
+        # Two skills with the same compact form: the name is ambiguous, leave it alone
+        if len(same_compact) == 1:
+            return self._skill(next(iter(same_compact)))
+        return None
+
+    def suggest(self, q: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """Skills completing q, most used first; close spellings fill up a short list."""
+        key = _key(q)
+        if not key:
+            return []
+        node = self._root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                break
+        skill_ids = [entry[3] for entry in node.top[:limit]] if node is not None else []
+        if len(skill_ids) < limit and len(key) >= 3:
+            size = len(_trigrams(key))
+            similar = {}
+            for shared, term, skill_id in self._fuzzy_candidates(key):
+                similarity = 2 * shared / (size + len(_trigrams(term)))
+                if similarity >= SUGGEST_MIN_SIMILARITY and skill_id not in skill_ids:
+                    similar[skill_id] = max(similarity, similar.get(skill_id, 0))
+            skill_ids += sorted(similar, key=lambda skill_id: (-similar[skill_id], skill_id))[: limit - len(skill_ids)]
+        return [(skill_id, self._names[skill_id]) for skill_id in skill_ids]
+
+
+skill_lexicon = SkillLexicon()
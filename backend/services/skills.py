@@ -0,0 +1,137 @@
+"""
+Skill name canonicalization.
+
+Skills are identified by a case-folded key (lower-cased in Python, whitespace collapsed)
+stored in the name_key column behind the unique ux_skills_name_key index. A name without an exact match is mapped to an
+existing skill through the skill lexicon (aliases and punctuation-insensitive spellings)
+before a new skill is created; close spellings are not merged. Resolved names are cached in-process; skills
+created inside a transaction only enter the cache (and the skill index and lexicon) once
+it commits, which is also when the skill automaton is marked for rebuild.
+"""
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..database import dialect_insert
+from ..models import Skill
+from .skill_automaton import skill_automaton
+from .skill_index import skill_index
+from .skill_lexicon import skill_lexicon
+
+
+class ResolvedSkill(NamedTuple):
+    id: int
+    name: str
+
+
+def normalize_skill_name(name: str) -> str:
+    return " ".join(name.split())
+
+
+def skill_key(name: str) -> str:
+    return normalize_skill_name(name).lower()
+
+
+class SkillCache:
+    __slots__ = ("_by_key", "_lock")
+
+    def __init__(self):
+        self._by_key: Dict[str, ResolvedSkill] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ResolvedSkill]:
+        return self._by_key.get(key)
+
+    def put_many(self, skills: Iterable[ResolvedSkill]):
+        with self._lock:
+            for skill in skills:
+                self._by_key[skill_key(skill.name)] = skill
+
+    def invalidate(self, key: Optional[str] = None):
+        with self._lock:
+            if key is None:
+                self._by_key.clear()
+            else:
+                self._by_key.pop(key, None)
+
+
+skill_cache = SkillCache()
+
+_PENDING_KEY = "pending_skills"
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_created_skills(session: Session):
+    created = session.info.pop(_PENDING_KEY, None)
+    if created:
+        skill_cache.put_many(created)
+        for skill in created:
+            skill_index.add_skill(skill.id, skill.name)
+            skill_lexicon.add_skill(skill.id, skill.name)
+        skill_automaton.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_created_skills(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _query_keys(db: Session, keys: Iterable[str]):
+    return db.query(Skill.id, Skill.name, Skill.name_key).filter(Skill.name_key.in_(keys))
+
+
+def resolve_skills(db: Session, names: List[str]) -> List[ResolvedSkill]:
+    """Resolve or create skills by name, in input order.
+
+    Costs at most one SELECT for cache misses and one INSERT ... ON CONFLICT DO NOTHING
+    for names that match no skill, alias or punctuation-insensitive spelling. Does not commit.
+    """
+    keys = [skill_key(name) for name in names]
+    found: Dict[str, ResolvedSkill] = {}
+    for key in keys:
+        cached = skill_cache.get(key) or skill_lexicon.lookup(key)
+        if cached:
+            found[key] = ResolvedSkill(*cached)
+
+    misses = {key for key in keys if key not in found}
+    if misses:
+        rows = {key: ResolvedSkill(*row) for *row, key in _query_keys(db, misses)}
+        # Skills this transaction created stay out of the cache until it commits
+        pending = set(db.info.get(_PENDING_KEY, ()))
+        skill_cache.put_many(row for row in rows.values() if row not in pending)
+        found.update(rows)
+
+    new_names = {}
+    for name, key in zip(names, keys):
+        if key in found or key in new_names:
+            continue
+        canonical = skill_lexicon.resolve(key)
+        if canonical:
+            found[key] = ResolvedSkill(*canonical)
+        else:
+            new_names[key] = normalize_skill_name(name)
+    if new_names:
+        stmt = (
+            dialect_insert(db, Skill)
+            .values([{"name": name, "name_key": key} for key, name in new_names.items()])
+            .on_conflict_do_nothing()
+            .returning(Skill.id, Skill.name, Skill.name_key)
+        )
+        created = {key: ResolvedSkill(*row) for *row, key in db.execute(stmt)}
+        db.info.setdefault(_PENDING_KEY, []).extend(created.values())
+        found.update(created)
+        # Rows skipped by ON CONFLICT were inserted concurrently; read them back
+        raced = [key for key in new_names if key not in found]
+        if raced:
+            found.update((key, ResolvedSkill(*row)) for *row, key in _query_keys(db, raced))
+
+    unresolved = [name for name, key in zip(names, keys) if key not in found]
+    if unresolved:
+        raise LookupError(f"Could not find or create skills {unresolved!r}")
+    return [found[key] for key in keys]
+
+
+def resolve_skill(db: Session, name: str) -> ResolvedSkill:
+    return resolve_skills(db, [name])[0]
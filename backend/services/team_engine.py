@@ -1,18 +1,110 @@
-from typing import List
+import itertools
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
-from ..models import Project, Team, Student, StudentSkill, Skill
-from .notification import create_notification
+from ..models import Project, Team, Student, StudentSkill
+from .assignment import min_cost_assignment
+from .notification import create_notifications
+from .skills import resolve_skills
+
+# Above roles x candidates cells the optimal solver gets slow; fall back to greedy
+MAX_ASSIGNMENT_CELLS = int(os.getenv("TEAM_MAX_ASSIGNMENT_CELLS", "250000"))
+
+
+class Candidate(NamedTuple):
+    student_id: int
+    name: str
+    user_id: int
+    cgpa: float
+
+
+def _load_candidate_pool(db: Session, skill_ids: Iterable[int]):
+    """Load every holder of the given skills once.
+
+    Read from the database rather than the skill index: teams are stored, and the index
+    misses students whose skills another worker or the bulk import CLI wrote.
+    Returns (holders, candidates): skill id -> [(level, student_id)] and student id -> Candidate.
+    """
+    holders: Dict[int, List[tuple]] = defaultdict(list)
+    candidates: Dict[int, Candidate] = {}
+    rows = (
+        db.query(StudentSkill.skill_id, StudentSkill.level, Student.id, Student.name, Student.user_id, Student.cgpa)
+        .join(Student, Student.id == StudentSkill.student_id)
+        .filter(StudentSkill.skill_id.in_(set(skill_ids)))
+        .all()
+    )
+    for skill_id, level, student_id, name, user_id, cgpa in rows:
+        holders[skill_id].append((level, student_id))
+        candidates[student_id] = Candidate(student_id, name, user_id, cgpa)
+    return holders, candidates
+
+
+def _ranked_holders(holders, candidates, skill_id: int) -> List[tuple]:
+    """Holders of a skill best first: level, then CGPA, then lowest id."""
+    return sorted(
+        (
+            (level, student_id)
+            for level, student_id in holders.get(skill_id, ())
+            if student_id in candidates
+        ),
+        key=lambda pair: (-pair[0], -candidates[pair[1]].cgpa, pair[1]),
+    )
 
 
-def _find_or_create_skill(db: Session, skill_name: str) -> Skill:
-    skill = db.query(Skill).filter(Skill.name.ilike(skill_name)).first()
-    if not skill:
-        skill = Skill(name=skill_name)
-        db.add(skill)
-        db.commit()
-        db.refresh(skill)
-    return skill
+def _assign_greedy(role_skill_ids: List[int], holders, candidates) -> List[Optional[int]]:
+    ranked = {skill_id: _ranked_holders(holders, candidates, skill_id) for skill_id in set(role_skill_ids)}
+    taken = set()
+    assignment = []
+    for skill_id in role_skill_ids:
+        choice = next((student_id for _, student_id in ranked[skill_id] if student_id not in taken), None)
+        if choice is not None:
+            taken.add(choice)
+        assignment.append(choice)
+    return assignment
+
+
+def _assign_optimal(role_skill_ids: List[int], holders, candidates) -> List[Optional[int]]:
+    """Role -> student assignment maximizing total skill level, CGPA as tie-breaker."""
+    n_roles = len(role_skill_ids)
+    ranked = {skill_id: _ranked_holders(holders, candidates, skill_id) for skill_id in set(role_skill_ids)}
+
+    # An optimal solution only ever uses a role's top n_roles holders: the others
+    # can always be swapped for a free, at least as good, top holder.
+    levels: Dict[int, Dict[int, int]] = defaultdict(dict)
+    pool = []
+    seen = set()
+    for skill_id, pairs in ranked.items():
+        for level, student_id in pairs[:n_roles]:
+            levels[skill_id][student_id] = level
+            if student_id not in seen:
+                seen.add(student_id)
+                pool.append(student_id)
+
+    if n_roles * len(pool) > MAX_ASSIGNMENT_CELLS:
+        return _assign_greedy(role_skill_ids, holders, candidates)
+
+    # Level dominates: the CGPA total across all roles stays below one level step
+    scale = 10 * n_roles + 1
+    cost = []
+    for skill_id in role_skill_ids:
+        role_levels = levels[skill_id]
+        row = [
+            -(role_levels[student_id] * scale + candidates[student_id].cgpa) if student_id in role_levels else 0.0
+            for student_id in pool
+        ]
+        # One "unfilled" column per role keeps the problem feasible
+        row.extend([0.0] * n_roles)
+        cost.append(row)
+
+    assignment = []
+    for skill_id, column in zip(role_skill_ids, min_cost_assignment(cost)):
+        student_id = pool[column] if column is not None and column < len(pool) else None
+        assignment.append(student_id if student_id in levels[skill_id] else None)
+    return assignment
 
 
 def generate_team(
@@ -20,60 +112,122 @@ def generate_team(
     project_title: str,
     faculty_id: int,
     required_roles: List[dict],
+    mode: str = "optimal",
 ):
     project = Project(title=project_title, faculty_id=faculty_id)
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    db.flush()
 
-    assigned_students = set()
-    team_members = []
+    skills = resolve_skills(db, [role_req["skill_name"] for role_req in required_roles])
+    role_skill_ids = [skill.id for skill in skills]
+    holders, candidates = _load_candidate_pool(db, role_skill_ids)
+    if mode == "greedy":
+        assignment = _assign_greedy(role_skill_ids, holders, candidates)
+    else:
+        assignment = _assign_optimal(role_skill_ids, holders, candidates)
 
-    for role_req in required_roles:
-        skill_name = role_req["skill_name"]
-        role_label = role_req["role"]
-        skill = _find_or_create_skill(db, skill_name)
-
-        candidate = (
-            db.query(Student)
-            .join(StudentSkill, Student.id == StudentSkill.student_id)
-            .filter(StudentSkill.skill_id == skill.id)
-            .filter(Student.id.notin_(assigned_students))
-            .order_by(StudentSkill.level.desc())
-            .first()
-        )
-
-        if not candidate:
+    team_members = []
+    for role_req, student_id in zip(required_roles, assignment):
+        if student_id is None:
             continue
-
-        # Check for duplicate team assignment (student already in this project)
-        existing_team = (
-            db.query(Team)
-            .filter(Team.project_id == project.id, Team.student_id == candidate.id)
-            .first()
-        )
-        if existing_team:
-            continue  # Skip if student already assigned to this project
-
-        team_entry = Team(project_id=project.id, student_id=candidate.id, role=role_label)
-        db.add(team_entry)
-        db.commit()
-        db.refresh(team_entry)
-        assigned_students.add(candidate.id)
-
-        create_notification(
-            db,
-            user_id=candidate.user_id,
-            message=f"You have been added to project '{project.title}' as {role_label}",
-        )
-
+        candidate = candidates[student_id]
+        db.add(Team(project_id=project.id, student_id=student_id, role=role_req["role"]))
         team_members.append(
             {
-                "student_id": candidate.id,
+                "student_id": student_id,
                 "student_name": candidate.name,
-                "role": role_label,
+                "role": role_req["role"],
             }
         )
+    create_notifications(
+        db,
+        [
+            {
+                "user_id": candidates[member["student_id"]].user_id,
+                "message": f"You have been added to project '{project_title}' as {member['role']}",
+            }
+            for member in team_members
+        ],
+        commit=False,
+    )
+    db.commit()
 
     return project, team_members
 
+
+def generate_teams(db: Session, projects: List[dict], max_projects_per_student: int = 1):
+    """Form teams for many projects in one pass over a shared candidate pool.
+
+    Roles are drafted round by round; within a round the project with the lowest
+    total skill level so far picks first, which keeps teams balanced. A student
+    joins at most `max_projects_per_student` projects. Everything, including the
+    notifications, is written in a single transaction.
+    """
+    all_names = [role_req["skill_name"] for spec in projects for role_req in spec["required_roles"]]
+    skill_ids = iter([skill.id for skill in resolve_skills(db, all_names)])
+    role_skill_ids = [[next(skill_ids) for _ in spec["required_roles"]] for spec in projects]
+
+    holders, candidates = _load_candidate_pool(db, {skill_id for ids in role_skill_ids for skill_id in ids})
+    ranked = {
+        skill_id: [student_id for _, student_id in _ranked_holders(holders, candidates, skill_id)]
+        for skill_id in {skill_id for ids in role_skill_ids for skill_id in ids}
+    }
+    levels = {(skill_id, student_id): level for skill_id, pairs in holders.items() for level, student_id in pairs}
+    capacity = defaultdict(lambda: max_projects_per_student)
+    # Per skill, everything before the cursor has no capacity left
+    cursors = dict.fromkeys(ranked, 0)
+
+    strength = [0] * len(projects)
+    members = [set() for _ in projects]
+    picks: List[List[Optional[int]]] = [[None] * len(ids) for ids in role_skill_ids]
+
+    for round_no in range(max((len(ids) for ids in role_skill_ids), default=0)):
+        drafting = [i for i, ids in enumerate(role_skill_ids) if round_no < len(ids)]
+        drafting.sort(key=lambda i: (strength[i], i))
+        for i in drafting:
+            skill_id = role_skill_ids[i][round_no]
+            order = ranked[skill_id]
+            position = cursors[skill_id]
+            while position < len(order) and capacity[order[position]] <= 0:
+                position += 1
+            cursors[skill_id] = position
+            choice = None
+            for student_id in itertools.islice(order, position, None):
+                if capacity[student_id] > 0 and student_id not in members[i]:
+                    choice = student_id
+                    break
+            if choice is None:
+                continue
+            capacity[choice] -= 1
+            members[i].add(choice)
+            strength[i] += levels[(skill_id, choice)]
+            picks[i][round_no] = choice
+
+    project_ids = db.scalars(
+        insert(Project).returning(Project.id, sort_by_parameter_order=True),
+        [{"title": spec["title"], "faculty_id": spec["faculty_id"]} for spec in projects],
+    ).all()
+
+    results = []
+    team_rows = []
+    notification_rows = []
+    for spec, project_id, chosen in zip(projects, project_ids, picks):
+        team_members = []
+        for role_req, student_id in zip(spec["required_roles"], chosen):
+            if student_id is None:
+                continue
+            candidate = candidates[student_id]
+            team_rows.append({"project_id": project_id, "student_id": student_id, "role": role_req["role"]})
+            notification_rows.append(
+                {
+                    "user_id": candidate.user_id,
+                    "message": f"You have been added to project '{spec['title']}' as {role_req['role']}",
+                }
+            )
+            team_members.append({"student_id": student_id, "student_name": candidate.name, "role": role_req["role"]})
+        results.append({"project_id": project_id, "title": spec["title"], "team": team_members})
+    if team_rows:
+        db.execute(Team.__table__.insert(), team_rows)
+    create_notifications(db, notification_rows, commit=False)
+    db.commit()
+    return results
@@ -0,0 +1,213 @@
+"""
+Shared fixtures.
+
+The engine binds DATABASE_URL at import, so it is pointed at a scratch file before the
+backend is imported. Every test starts from a copy of a freshly migrated database, with
+the per-process skill index, lexicon and caches rebuilt from it. Tests using `client`
+run twice: with plain Sessions and with ASYNC_DB-style AsyncSessions on the same file.
+"""
+import contextlib
+import os
+import shutil
+import tempfile
+import threading
+
+_TMP = tempfile.mkdtemp(prefix="backend-tests-")
+DB_PATH = os.path.join(_TMP, "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+# The cheapest cost bcrypt accepts; hashing is not what these tests are about
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend import database, models
+from backend.database import SessionLocal, async_database_url, create_async_session_factory, engine
+from backend.main import app
+from backend.migrations import upgrade
+from backend.services.notification_bus import notification_bus
+from backend.services.skill_automaton import skill_automaton
+from backend.services.skill_index import skill_index
+from backend.services.skill_lexicon import skill_lexicon
+from backend.services.skills import resolve_skills, skill_cache
+from backend.utils.password import hash_password
+from backend.utils.response_cache import response_cache
+
+PASSWORD = "secret"
+_TEMPLATE_PATH = os.path.join(_TMP, "template.db")
+
+
+def _remove_sidecars(path: str):
+    for suffix in ("-wal", "-shm"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path + suffix)
+
+
+@pytest.fixture(scope="session")
+def _template():
+    upgrade()
+    # Closing every connection checkpoints the WAL into the file
+    engine.dispose()
+    shutil.copyfile(DB_PATH, _TEMPLATE_PATH)
+    return _TEMPLATE_PATH
+
+
+def rebuild_process_state():
+    """Reload what each process keeps in memory, as a freshly started worker would."""
+    db = SessionLocal()
+    try:
+        skill_index.build(db)
+        skill_lexicon.build(db)
+    finally:
+        db.close()
+    skill_cache.invalidate()
+    skill_automaton.invalidate()
+    response_cache.clear()
+    notification_bus.clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_db(_template):
+    engine.dispose()
+    _remove_sidecars(DB_PATH)
+    shutil.copyfile(_template, DB_PATH)
+    rebuild_process_state()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(params=["sync", "async"])
+def client(request, monkeypatch):
+    if request.param == "sync":
+        with TestClient(app) as test_client:
+            yield test_client
+        return
+    async_engine, async_session = create_async_session_factory(async_database_url(database.DATABASE_URL))
+    monkeypatch.setattr(database, "async_engine", async_engine)
+    monkeypatch.setattr(database, "AsyncSessionLocal", async_session)
+    with TestClient(app) as test_client:
+        try:
+            yield test_client
+        finally:
+            # aiosqlite connections belong to the client's event loop
+            test_client.portal.call(async_engine.dispose)
+
+
+class SqlCounter:
+    """Counts statements sent to the engine, except the background notification writer's."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, *args):
+        if threading.current_thread().name != "notification-writer":
+            self.statements.append(statement)
+
+
+@pytest.fixture
+def count_sql():
+    """count_sql() is a context manager yielding a SqlCounter that counts while it is open."""
+
+    @contextlib.contextmanager
+    def counting():
+        counter = SqlCounter()
+        engines = [engine] + ([database.async_engine.sync_engine] if database.async_engine is not None else [])
+        for counted in engines:
+            event.listen(counted, "before_cursor_execute", counter)
+        try:
+            yield counter
+        finally:
+            for counted in engines:
+                event.remove(counted, "before_cursor_execute", counter)
+
+    return counting
+
+
+class Factory:
+    """Rows written straight to the database, as another process or the CLI would.
+
+    Skills go through resolve_skills, so they reach the skill index and lexicon on
+    commit; student skills and opportunities only reach them through rebuild().
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._password = hash_password(PASSWORD)
+        self._serial = 0
+
+    def _user(self, role: models.UserRole) -> models.User:
+        self._serial += 1
+        user = models.User(email=f"{role.value}{self._serial}@test.example", password=self._password, role=role)
+        self.db.add(user)
+        self.db.flush()
+        return user
+
+    def skills(self, *names: str) -> list:
+        skills = resolve_skills(self.db, list(names))
+        self.db.commit()
+        return skills
+
+    def student(self, cgpa: float = 8.0, skills: dict = None, name: str = None) -> models.Student:
+        user = self._user(models.UserRole.student)
+        student = models.Student(
+            user_id=user.id, name=name or f"Student {self._serial}", branch="CSE", year=3, cgpa=cgpa
+        )
+        self.db.add(student)
+        self.db.flush()
+        skills = skills or {}
+        for skill, level in zip(resolve_skills(self.db, list(skills)), skills.values()):
+            self.db.add(models.StudentSkill(student_id=student.id, skill_id=skill.id, level=level))
+        self.db.commit()
+        return student
+
+    def faculty(self) -> models.Faculty:
+        user = self._user(models.UserRole.faculty)
+        faculty = models.Faculty(user_id=user.id, name=f"Faculty {self._serial}", department="Computer Science")
+        self.db.add(faculty)
+        self.db.commit()
+        return faculty
+
+    def company(self) -> models.Company:
+        user = self._user(models.UserRole.company)
+        company = models.Company(user_id=user.id, name=f"Company {self._serial}")
+        self.db.add(company)
+        self.db.commit()
+        return company
+
+    def opportunity(self, skills=(), min_cgpa: float = 0, company: models.Company = None, title: str = None):
+        company = company or self.company()
+        self._serial += 1
+        opportunity = models.Opportunity(
+            title=title or f"Opportunity {self._serial}",
+            creator_name=company.name,
+            type=models.OpportunityType.internship,
+            min_cgpa=min_cgpa,
+            company_id=company.id,
+        )
+        self.db.add(opportunity)
+        self.db.flush()
+        for skill in resolve_skills(self.db, list(skills)):
+            self.db.add(models.OpportunitySkill(opportunity_id=opportunity.id, skill_id=skill.id))
+        self.db.commit()
+        return opportunity
+
+    rebuild = staticmethod(rebuild_process_state)
+
+
+@pytest.fixture
+def factory(db):
+    return Factory(db)
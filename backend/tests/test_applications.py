@@ -0,0 +1,100 @@
+import pytest
+
+from backend.models import Application, ApplicationStatus, FitScore, Notification
+from backend.utils.cursor import NEXT_CURSOR_HEADER
+
+# Python 4 and SQL 2 required: scores tie in pairs across the skill sets below
+SKILL_SETS = [{"Python": 4, "SQL": 2}, {}, {"Python": 4}, {"Python": 4, "SQL": 2}, {"SQL": 2}, {}, {"Python": 4}]
+
+
+def _queue(factory, db):
+    """An opportunity with applicants applied in an order unrelated to their fit."""
+    opportunity = factory.opportunity(["Python", "SQL"], min_cgpa=7)
+    students = [factory.student(cgpa=8, skills=skills) for skills in SKILL_SETS]
+    applications = [Application(student_id=student.id, opportunity_id=opportunity.id) for student in students]
+    db.add_all(applications)
+    db.commit()
+    return opportunity, [application.id for application in applications]
+
+
+def _pages(client, url: str, limit: int, **params) -> list:
+    rows, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        rows += response.json()
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return rows
+
+
+def _set_status(client, opportunity_id: int, application_ids: list, status: str):
+    payload = {"application_ids": application_ids, "status": status}
+    return client.post(f"/applications/opportunity/{opportunity_id}/status", json=payload)
+
+
+def test_queue_is_best_fit_first_with_ties_by_application(client, factory, db):
+    opportunity, _ = _queue(factory, db)
+    url = f"/applications/opportunity/{opportunity.id}"
+
+    queue = client.get(url).json()
+
+    # Unscored pairs were scored on the way
+    assert db.query(FitScore).filter_by(opportunity_id=opportunity.id).count() == len(SKILL_SETS)
+    keys = [(-row["fit_score"], row["application_id"]) for row in queue]
+    assert keys == sorted(keys)
+    assert len({row["fit_score"] for row in queue}) < len(queue)
+    assert _pages(client, url, 2) == queue
+
+
+def test_queue_in_application_order_and_by_status(client, factory, db):
+    opportunity, application_ids = _queue(factory, db)
+    url = f"/applications/opportunity/{opportunity.id}"
+    assert _set_status(client, opportunity.id, application_ids[1:3], "shortlisted").status_code == 200
+
+    applied = client.get(url, params={"sort": "applied"}).json()
+    assert [row["application_id"] for row in applied] == application_ids
+    assert _pages(client, url, 3, sort="applied") == applied
+
+    shortlisted = client.get(url, params={"status": "shortlisted"}).json()
+    assert sorted(row["application_id"] for row in shortlisted) == application_ids[1:3]
+    assert {row["status"] for row in shortlisted} == {"shortlisted"}
+
+
+def test_status_changes_follow_the_allowed_transitions(client, factory, db):
+    opportunity, ids = _queue(factory, db)
+    other, other_ids = _queue(factory, db)
+
+    response = _set_status(client, opportunity.id, [ids[0], ids[1], ids[0], other_ids[0], 999999], "shortlisted")
+    assert response.json() == {"status": "shortlisted", "updated": [ids[0], ids[1]], "skipped": [other_ids[0], 999999]}
+
+    # Shortlisted and applied can be rejected; a rejection is final
+    response = _set_status(client, opportunity.id, [ids[0], ids[2]], "rejected")
+    assert response.json()["updated"] == [ids[0], ids[2]]
+    response = _set_status(client, opportunity.id, [ids[0], ids[1]], "shortlisted")
+    assert response.json() == {"status": "shortlisted", "updated": [], "skipped": [ids[0], ids[1]]}
+
+    assert _set_status(client, opportunity.id, [ids[3]], "applied").status_code == 400
+    assert _set_status(client, 999999, [ids[3]], "rejected").status_code == 404
+    assert _set_status(client, opportunity.id, [], "rejected").status_code == 422
+
+    db.expire_all()
+    statuses = {application.id: application.status for application in db.query(Application)}
+    assert [statuses[application_id] for application_id in ids[:4]] == [
+        ApplicationStatus.rejected,
+        ApplicationStatus.shortlisted,
+        ApplicationStatus.rejected,
+        ApplicationStatus.applied,
+    ]
+    assert statuses[other_ids[0]] == ApplicationStatus.applied
+
+
+@pytest.mark.parametrize("status", ["shortlisted", "rejected"])
+def test_each_moved_applicant_is_notified_once(client, factory, db, status):
+    opportunity, ids = _queue(factory, db)
+
+    _set_status(client, opportunity.id, ids[:3] + ids[:3], status)
+    _set_status(client, opportunity.id, ids[:3], status)
+
+    messages = [message for (message,) in db.query(Notification.message)]
+    assert messages == [f"Your application to {opportunity.title} was {status}"] * 3
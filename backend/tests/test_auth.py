@@ -0,0 +1,111 @@
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+from sqlalchemy import update
+
+from backend import auth
+from backend.auth import get_current_user, get_token_claims
+from backend.database import engine
+from backend.models import User, UserRole
+from backend.utils.jwt_handler import create_access_token
+
+STUDENT = {
+    "email": "ada@test.example",
+    "password": "pw",
+    "role": "student",
+    "name": "Ada",
+    "branch": "CSE",
+    "year": 2,
+    "cgpa": 9.1,
+}
+
+
+def test_register_and_login(client):
+    assert client.post("/register", json=STUDENT).status_code == 200
+    assert client.post("/register", json=STUDENT).status_code == 400
+
+    assert client.post("/login", json={"email": STUDENT["email"], "password": "pw"}).json()["access_token"]
+    assert client.post("/login", json={"email": STUDENT["email"], "password": "nope"}).status_code == 401
+    assert client.post("/login", json={"email": "nobody@test.example", "password": "pw"}).status_code == 401
+
+
+def test_login_rehashes_a_hash_of_another_cost(client, db):
+    client.post("/register", json=STUDENT)
+    user = db.query(User).filter(User.email == STUDENT["email"]).one()
+    user.password = bcrypt.using(rounds=5).hash("pw")
+    db.commit()
+
+    assert client.post("/login", json={"email": STUDENT["email"], "password": "pw"}).status_code == 200
+    db.expire_all()
+    assert "$04$" in db.get(User, user.id).password
+
+
+def test_register_waiting_for_a_locked_database_does_not_stall_the_event_loop(client):
+    # Another connection holds the write lock; register waits for it (busy_timeout)
+    blocker = sqlite3.connect(engine.url.database)
+    blocker.execute("BEGIN IMMEDIATE")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        try:
+            pending = pool.submit(client.post, "/register", json=STUDENT)
+            time.sleep(0.3)
+            start = time.perf_counter()
+            assert client.get("/").status_code == 200
+            elapsed = time.perf_counter() - start
+            assert not pending.done()
+        finally:
+            blocker.rollback()
+            blocker.close()
+        assert pending.result().status_code == 200
+    assert elapsed < 0.25
+
+
+
+@pytest.fixture
+def current_user(db):
+    """current_user(user) resolves a fresh token for user the way a route would."""
+    auth._token_cache.clear()
+    auth._user_cache.clear()
+
+    def resolve(user: User):
+        token = create_access_token({"sub": str(user.id), "role": user.role.value})
+        return get_current_user(get_token_claims(token), db)
+
+    yield resolve
+    auth._user_cache.clear()
+
+
+def test_identity_is_cached_until_the_user_changes(factory, db, current_user, count_sql):
+    user = db.get(User, factory.student().user_id)
+    assert current_user(user).email == user.email
+    with count_sql() as sql:
+        assert current_user(user).email == user.email
+    assert sql.count == 0
+
+    user.email = "renamed@test.example"
+    db.commit()
+    assert current_user(user).email == "renamed@test.example"
+
+    db.delete(user)
+    db.flush()
+    with pytest.raises(HTTPException) as error:
+        current_user(user)
+    assert error.value.status_code == 401
+    db.rollback()
+
+
+@pytest.mark.parametrize("bulk", ["query", "statement"])
+def test_bulk_user_updates_clear_cached_identities(factory, db, current_user, bulk):
+    user = db.get(User, factory.faculty().user_id)
+    assert current_user(user).role == UserRole.faculty
+
+    if bulk == "query":
+        db.query(User).filter(User.id == user.id).update({User.role: UserRole.company}, synchronize_session=False)
+    else:
+        db.execute(update(User).where(User.id == user.id).values(role=UserRole.company))
+    db.commit()
+
+    assert current_user(user).role == UserRole.company
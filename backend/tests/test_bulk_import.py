@@ -0,0 +1,192 @@
+import io
+
+from backend import models, schemas
+from backend.services import bulk_import
+from backend.services.bulk_import import import_rows, read_rows
+from backend.services.search import DOC_OPPORTUNITY, DOC_STUDENT, search
+from backend.services.skill_index import skill_index
+from backend.utils.password import hash_password
+
+USERS = schemas.ImportKind.users
+STUDENT_SKILLS = schemas.ImportKind.student_skills
+OPPORTUNITIES = schemas.ImportKind.opportunities
+
+
+def _student(email: str, **fields) -> dict:
+    return {
+        "email": email, "password": "secret", "role": "student", "name": "Ada", "branch": "CSE", "year": 3, "cgpa": 8.5,
+        **fields,
+    }
+
+
+def _errors(report) -> dict:
+    return {error.row: error.error for error in report.errors}
+
+
+def test_invalid_rows_are_reported_and_the_rest_imported(factory, db):
+    taken = factory.student()
+    jsonl = io.StringIO('{"email": "broken"\n[1, 2]\n')
+    records = [
+        _student("ada@import.example"),
+        _student("not-an-email"),
+        _student("ada@import.example"),
+        _student(db.get(models.User, taken.user_id).email),
+        {"email": "bob@import.example", "password": "secret", "role": "student", "name": "Bob"},
+        {"email": "acme@import.example", "password": "secret", "role": "company"},
+        _student("hash@import.example", password="x", password_hash=hash_password("x")),
+        {key: value for key, value in _student("weak@import.example", password_hash="x").items() if key != "password"},
+        {"email": "lab@import.example", "password": "x", "role": "faculty", "name": "Lab", "department": "EE"},
+        *read_rows(jsonl, schemas.ImportFormat.jsonl),
+    ]
+
+    report = import_rows(db, USERS, records, chunk_size=4)
+
+    assert (report.rows, report.imported, report.error_count) == (11, 2, 9)
+    errors = _errors(report)
+    assert sorted(errors) == [2, 3, 4, 5, 6, 7, 8, 10, 11]
+    assert errors[2].startswith("email:")
+    assert errors[3] == "Duplicate email in file (row 1)"
+    assert errors[4] == "Email already registered"
+    assert errors[5] == "Student details required"
+    assert errors[6] == "Company name required"
+    assert errors[7] == "Give either password or password_hash, not both"
+    assert errors[8] == "password_hash is not a supported hash"
+    assert errors[10].startswith("Invalid JSON")
+    assert errors[11] == "Expected a JSON object"
+    assert {email for (email,) in db.query(models.User.email).filter(models.User.email.like("%@import.example"))} == {
+        "ada@import.example",
+        "lab@import.example",
+    }
+    student = db.query(models.Student).filter_by(name="Ada").one()
+    assert [doc_id for doc_id, _ in search(db, DOC_STUDENT, "Ada", 10)] == [student.id]
+
+
+def test_csv_rows_carry_lists_and_skip_empty_cells(factory, db):
+    company = factory.company()
+    csv = io.StringIO(
+        "title,creator_name,type,min_cgpa,required_skills,company_id\n"
+        f"Pastry intern,Acme,internship,,Baking; Piping ;,{company.id}\n"
+    )
+
+    (record,) = read_rows(csv, schemas.ImportFormat.csv)
+
+    assert record == {
+        "title": "Pastry intern",
+        "creator_name": "Acme",
+        "type": "internship",
+        "required_skills": ["Baking", "Piping"],
+        "company_id": str(company.id),
+    }
+
+
+def test_failed_chunk_is_rolled_back_and_reported_row_by_row(factory, db, monkeypatch):
+    company = factory.company()
+    rows = [
+        {"title": f"Role {i}", "creator_name": company.name, "type": "project", "company_id": company.id}
+        for i in range(6)
+    ]
+    rows[3]["company_id"] = 999999
+    reindex = bulk_import.reindex_opportunities
+    calls = []
+
+    def failing_second_chunk(session, ids):
+        calls.append(ids)
+        reindex(session, ids)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+
+    monkeypatch.setattr(bulk_import, "reindex_opportunities", failing_second_chunk)
+
+    report = import_rows(db, OPPORTUNITIES, rows, chunk_size=2)
+
+    assert (report.rows, report.imported, report.error_count) == (6, 4, 2)
+    # Row 4 was rejected before the write, so it is reported once, for its own reason
+    assert _errors(report) == {3: "Chunk failed: RuntimeError: disk full", 4: "Company not found"}
+    titles = [title for (title,) in db.query(models.Opportunity.title).order_by(models.Opportunity.id)]
+    assert titles == ["Role 0", "Role 1", "Role 4", "Role 5"]
+    imported = [opportunity_id for (opportunity_id,) in db.query(models.Opportunity.id)]
+    assert set(skill_index.required_skill_names(imported + [max(imported) + 1])) == set(imported)
+    assert {doc_id for doc_id, _ in search(db, DOC_OPPORTUNITY, "Role", 10)} == set(imported)
+
+
+def test_reimported_student_skills_update_in_place(factory, db):
+    student = factory.student(skills={"Python": 2})
+    other = factory.student(name="Grace")
+    email = db.get(models.User, other.user_id).email
+
+    first = import_rows(
+        db,
+        STUDENT_SKILLS,
+        [
+            {"student_id": student.id, "skill_name": "python", "level": 4},
+            {"email": email, "skill_name": "Go", "level": 1},
+            {"email": email, "skill_name": "Go", "level": 3},
+            {"email": "nobody@import.example", "skill_name": "Go", "level": 3},
+            {"skill_name": "Go", "level": 3},
+            {"student_id": 999999, "skill_name": "Go", "level": 3},
+            {"student_id": student.id, "skill_name": "Go", "level": 9},
+        ],
+    )
+    second = import_rows(db, STUDENT_SKILLS, [{"email": email, "skill_name": "GO", "level": 5}])
+
+    assert (first.imported, second.imported) == (3, 1)
+    errors = _errors(first)
+    assert errors[4] == "No student with this email"
+    assert errors[5] == "student_id or email is required"
+    assert errors[6] == "Student not found"
+    assert errors[7].startswith("level:")
+    levels = {(row.student_id, row.skill.name): row.level for row in db.query(models.StudentSkill)}
+    assert levels == {(student.id, "Python"): 4, (other.id, "Go"): 5}
+    assert db.query(models.StudentSkill).count() == 2
+    assert [doc_id for doc_id, _ in search(db, DOC_STUDENT, "go", 10)] == [other.id]
+
+
+def test_skill_import_drops_fit_scores_and_cached_profiles(client, factory, db):
+    student = factory.student(skills={"Python": 3})
+    untouched = factory.student(skills={"Python": 3})
+    factory.opportunity(["Python", "Go"])
+    for student_id in (student.id, untouched.id):
+        assert client.get(f"/matching/{student_id}").status_code == 200
+    profile = client.get(f"/student/{student.id}")
+    db.expire_all()
+    assert db.query(models.FitScore).count() == 2
+
+    report = import_rows(db, STUDENT_SKILLS, [{"student_id": student.id, "skill_name": "Go", "level": 4}])
+
+    assert report.imported == 1
+    assert [row.student_id for row in db.query(models.FitScore)] == [untouched.id]
+    response = client.get(f"/student/{student.id}", headers={"If-None-Match": profile.headers["ETag"]})
+    assert response.status_code == 200
+    assert sorted(response.json()["skills"]) == ["Go", "Python"]
+    assert client.get(f"/matching/{student.id}").json()[0]["fit_score"] == 100
+
+
+def test_opportunity_import_reaches_the_skill_index_and_the_catalog(client, factory, db):
+    faculty = factory.faculty()
+    catalog = client.get("/opportunity/all")
+
+    report = import_rows(
+        db,
+        OPPORTUNITIES,
+        [
+            {
+                "title": "Compiler",
+                "creator_name": "Lab",
+                "type": "project",
+                "faculty_id": faculty.id,
+                "required_skills": ["Rust", "rust", "LLVM"],
+                "is_internal": True,
+            },
+            {"title": "Both", "creator_name": "Lab", "type": "project", "faculty_id": faculty.id, "company_id": 1},
+            {"title": "Neither", "creator_name": "Lab", "type": "project"},
+            {"title": "Bad", "creator_name": "Lab", "type": "project", "faculty_id": faculty.id, "min_cgpa": 11},
+        ],
+    )
+
+    assert report.imported == 1
+    assert sorted(_errors(report)) == [2, 3, 4]
+    opportunity = db.query(models.Opportunity).filter_by(title="Compiler").one()
+    assert skill_index.required_skill_names([opportunity.id]) == {opportunity.id: ["rust", "llvm"]}
+    response = client.get("/opportunity/all", headers={"If-None-Match": catalog.headers["ETag"]})
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()] == ["Compiler"]
@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+import time
+
+from sqlalchemy import func, text
+
+from backend.database import SessionLocal, engine
+from backend.models import Notification, NotificationCounter, StudentSkill
+from backend.services.notification import create_notifications, unread_count
+
+WRITERS = 4
+READERS = 4
+WRITES = 25
+
+
+def _run_concurrently(*targets):
+    errors = []
+
+    def guarded(target):
+        try:
+            target()
+        except Exception as error:  # noqa: BLE001 - every failure is what the test reports
+            errors.append(error)
+
+    threads = [threading.Thread(target=guarded, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_connections_use_the_sqlite_profile(db):
+    assert db.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    assert db.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+    assert db.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    assert db.execute(text("PRAGMA foreign_keys")).scalar() == 1
+
+
+def test_concurrent_readers_and_writers_do_not_hit_lock_errors(factory, db):
+    user_ids = [factory.student().user_id for _ in range(WRITERS)]
+    writing = threading.Event()
+
+    def writer(user_id):
+        def write():
+            session = SessionLocal()
+            try:
+                writing.set()
+                for i in range(WRITES):
+                    create_notifications(session, [{"user_id": user_id, "message": f"Update {i}"}])
+            finally:
+                session.close()
+
+        return write
+
+    def reader():
+        session = SessionLocal()
+        try:
+            writing.wait()
+            for _ in range(WRITES):
+                session.query(func.count(Notification.id)).scalar()
+                unread_count(session, user_ids[0])
+                session.rollback()
+        finally:
+            session.close()
+
+    errors = _run_concurrently(*[writer(user_id) for user_id in user_ids], *[reader] * READERS)
+
+    assert errors == []
+    assert db.query(func.count(Notification.id)).scalar() == WRITERS * WRITES
+    assert {counter.user_id: counter.unread for counter in db.query(NotificationCounter)} == {
+        user_id: WRITES for user_id in user_ids
+    }
+    assert engine.pool.checkedout() == 1  # only the db fixture's connection
+
+
+def test_readers_are_not_blocked_by_a_writer(factory, db):
+    factory.student()
+    blocker = sqlite3.connect(engine.url.database)
+    blocker.execute("BEGIN IMMEDIATE")
+    blocker.execute("DELETE FROM student_skills")
+    try:
+        start = time.perf_counter()
+        assert db.query(func.count(StudentSkill.student_id)).scalar() is not None
+        elapsed = time.perf_counter() - start
+    finally:
+        blocker.rollback()
+        blocker.close()
+    assert elapsed < 0.5
+
+
+def test_concurrent_api_reads_and_writes(client, factory, db):
+    student_ids = [factory.student(skills={"Python": 3}).id for _ in range(WRITERS)]
+    company = factory.company()
+    company = {"creator_name": company.name, "company_id": company.id}
+    # Give the fixture session's connection back, so the pool check below only sees the app
+    db.rollback()
+
+    def add_skills(student_id):
+        def write():
+            for i in range(5):
+                response = client.post(
+                    "/student/add-skill", json={"student_id": student_id, "skill_name": f"Skill {i}", "level": 2}
+                )
+                assert response.status_code == 200, response.text
+
+        return write
+
+    def create_opportunities():
+        for i in range(5):
+            response = client.post(
+                "/opportunity/create",
+                json={"title": f"Role {i}", "type": "project", **company},
+            )
+            assert response.status_code == 200, response.text
+
+    def read():
+        for student_id in student_ids * 2:
+            assert client.get(f"/matching/{student_id}").status_code == 200
+            assert client.get("/opportunity/all").status_code == 200
+
+    errors = _run_concurrently(
+        *[add_skills(student_id) for student_id in student_ids], create_opportunities, read, read
+    )
+
+    assert errors == []
+    stats = client.get("/health/db").json()
+    assert stats["engine"]["checkedout"] == 0
@@ -0,0 +1,109 @@
+from backend.database import SessionLocal
+from backend.models import FitScore, Opportunity, Student
+from backend.services import fit_score_cache
+from backend.services.fit_score_cache import get_student_fit_scores
+from backend.services.matching_engine import calculate_fit_score
+
+FIELDS = ("fit_score", "eligible", "missing_skills", "reason")
+
+
+def _stored(db) -> dict:
+    db.expire_all()
+    return {
+        (row.student_id, row.opportunity_id): tuple(getattr(row, field) for field in FIELDS)
+        for row in db.query(FitScore)
+    }
+
+
+def _fresh(db) -> dict:
+    db.expire_all()
+    return {
+        (student.id, opportunity.id): tuple(calculate_fit_score(db, student, opportunity)[field] for field in FIELDS)
+        for student in db.query(Student)
+        for opportunity in db.query(Opportunity)
+    }
+
+
+def _campus(factory):
+    company = factory.company()
+    students = [
+        factory.student(cgpa=7.0, skills={"Python": 3}),
+        factory.student(cgpa=9.0, skills={"Go": 2, "SQL": 4}),
+        factory.student(cgpa=8.0),
+    ]
+    for skills, min_cgpa in ((["Python", "SQL"], 6), (["Go"], 8), ([], 0)):
+        factory.opportunity(skills, min_cgpa=min_cgpa, company=company)
+    return company, students
+
+
+def _score_everything(client, students):
+    for student in students:
+        assert client.get(f"/matching/{student.id}").status_code == 200
+
+
+def test_adding_a_skill_recomputes_the_students_scores(client, factory, db):
+    _, students = _campus(factory)
+    _score_everything(client, students)
+    before = _stored(db)
+
+    response = client.post("/student/add-skill", json={"student_id": students[0].id, "skill_name": "SQL", "level": 2})
+    assert response.status_code == 200
+    after = _stored(db)
+    assert after == _fresh(db)
+    assert after != before
+
+
+def test_creating_an_opportunity_scores_its_column(client, factory, db):
+    company, students = _campus(factory)
+    _score_everything(client, students)
+
+    response = client.post(
+        "/opportunity/create",
+        json={
+            "title": "Data intern",
+            "creator_name": company.name,
+            "type": "internship",
+            "min_cgpa": 7.5,
+            "required_skills": ["sql", "Python"],
+            "company_id": company.id,
+        },
+    )
+    assert response.status_code == 200
+    opportunity_id = response.json()["id"]
+    stored = _stored(db)
+    assert {student_id for student_id, column in stored if column == opportunity_id} == {s.id for s in students}
+    assert stored == _fresh(db)
+
+
+def test_missing_pairs_are_scored_on_read(factory, db):
+    _, students = _campus(factory)
+    for student in students:
+        get_student_fit_scores(db, student)
+    # Written behind the cache's back, e.g. by the bulk importer
+    factory.opportunity(["Python"], min_cgpa=5)
+    db.query(FitScore).filter(FitScore.student_id == students[1].id).delete()
+    db.commit()
+
+    for student in students:
+        get_student_fit_scores(db, student)
+    assert _stored(db) == _fresh(db)
+
+
+def test_pairs_scored_by_a_concurrent_request_are_kept(factory, db, monkeypatch):
+    _, students = _campus(factory)
+    calculate = fit_score_cache.calculate_fit_scores
+
+    def racing(session, student, opportunities, **kwargs):
+        # Another request scores the same student between our read and our insert
+        other = SessionLocal()
+        try:
+            monkeypatch.setattr(fit_score_cache, "calculate_fit_scores", calculate)
+            get_student_fit_scores(other, other.get(Student, student.id))
+        finally:
+            other.close()
+        return calculate(session, student, opportunities, **kwargs)
+
+    monkeypatch.setattr(fit_score_cache, "calculate_fit_scores", racing)
+
+    assert len(get_student_fit_scores(db, students[0])) == 3
+    assert _stored(db) == {pair: value for pair, value in _fresh(db).items() if pair[0] == students[0].id}
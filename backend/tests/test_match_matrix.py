@@ -0,0 +1,68 @@
+import random
+
+import numpy as np
+import pytest
+
+from backend.models import Opportunity, Student
+from backend.services.match_matrix import MatchMatrix, build_match_matrix, verify_against_engine
+from backend.services.matching_engine import calculate_fit_score
+
+SKILLS = ["Python", "SQL", "Go", "Rust", "Docker", "React", "Java"]
+CGPAS = [6.0, 7.0, 7.5, 8.0, 9.5]
+
+
+def _campus(factory, students: int = 30, opportunities: int = 15):
+    rng = random.Random(7)
+    company = factory.company()
+    for _ in range(students):
+        held = rng.sample(SKILLS, rng.randrange(len(SKILLS) + 1))
+        factory.student(cgpa=rng.choice(CGPAS), skills={name: rng.randint(1, 5) for name in held})
+    for _ in range(opportunities):
+        # Minimums equal to student CGPAs exercise the >= boundary
+        factory.opportunity(rng.sample(SKILLS, rng.randrange(4)), min_cgpa=rng.choice(CGPAS), company=company)
+
+
+def _engine_scores(db, matrix: MatchMatrix):
+    students = {student.id: student for student in db.query(Student)}
+    opportunities = {opportunity.id: opportunity for opportunity in db.query(Opportunity)}
+    scores = np.zeros(matrix.scores.shape)
+    eligible = np.zeros(matrix.eligible.shape, dtype=bool)
+    for row, student_id in enumerate(matrix.student_ids.tolist()):
+        for column, opportunity_id in enumerate(matrix.opportunity_ids.tolist()):
+            match = calculate_fit_score(db, students[student_id], opportunities[opportunity_id])
+            scores[row, column], eligible[row, column] = match["fit_score"], match["eligible"]
+    return scores, eligible
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 2000), (1, 7), (2, 7)], ids=["inline", "chunked", "pool"])
+def test_matrix_equals_calculate_fit_score_for_every_pair(factory, db, workers, chunk_size):
+    _campus(factory)
+
+    matrix = build_match_matrix(db, workers=workers, chunk_size=chunk_size)
+
+    assert matrix.student_ids.tolist() == sorted(student_id for (student_id,) in db.query(Student.id))
+    assert matrix.opportunity_ids.tolist() == sorted(opportunity_id for (opportunity_id,) in db.query(Opportunity.id))
+    scores, eligible = _engine_scores(db, matrix)
+    np.testing.assert_array_equal(matrix.scores / 100, scores)
+    np.testing.assert_array_equal(matrix.eligible, eligible)
+
+
+def test_saved_matrix_loads_back_unchanged(factory, db, tmp_path):
+    _campus(factory, students=12, opportunities=11)
+    matrix = build_match_matrix(db, workers=1)
+
+    path = str(tmp_path / "matches.npz")
+    matrix.save(path)
+    loaded = MatchMatrix.load(path)
+    for name in MatchMatrix._fields:
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(matrix, name))
+    assert verify_against_engine(db, loaded, samples=50) == []
+    with pytest.raises(KeyError):
+        loaded.fit_score(int(matrix.student_ids.max()) + 1, int(matrix.opportunity_ids[0]))
+
+
+def test_empty_campus(db):
+    matrix = build_match_matrix(db, workers=1)
+
+    assert matrix.scores.shape == (0, 0)
+    assert verify_against_engine(db, matrix, samples=10) == []
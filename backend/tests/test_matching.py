@@ -0,0 +1,175 @@
+import base64
+import json
+
+import pytest
+
+from backend.models import Opportunity, OpportunityType
+from backend.services.matching_engine import (
+    calculate_fit_score,
+    calculate_fit_scores,
+    calculate_student_fit_scores,
+    rank_students,
+)
+from backend.utils.cursor import NEXT_CURSOR_HEADER
+
+REQUIREMENTS = [["Python"], ["Python", "Go"], ["Rust"], [], ["SQL", "Python", "Docker"]]
+
+
+def _campus(factory, opportunities: int):
+    student = factory.student(cgpa=7.5, skills={"Python": 4, "SQL": 3})
+    company = factory.company()
+    for i in range(opportunities):
+        factory.opportunity(REQUIREMENTS[i % len(REQUIREMENTS)], min_cgpa=[6, 8][i % 2], company=company)
+    factory.rebuild()
+    return student
+
+
+def test_batch_scores_equal_per_opportunity_scores(factory, db):
+    student = _campus(factory, 10)
+    opportunities = db.query(Opportunity).order_by(Opportunity.id).all()
+
+    assert calculate_fit_scores(db, student, opportunities) == [
+        calculate_fit_score(db, student, opportunity) for opportunity in opportunities
+    ]
+
+
+def test_batch_scoring_query_count_is_constant(factory, db, count_sql):
+    counts = []
+    for total in (5, 40):
+        student = _campus(factory, total)
+        opportunities = db.query(Opportunity).all()
+        with count_sql() as sql:
+            calculate_fit_scores(db, student, opportunities)
+        counts.append(sql.count)
+    assert counts[0] == counts[1] <= 2
+
+
+def test_matching_endpoint_query_count(client, factory, count_sql):
+    counts = []
+    for total in (5, 40):
+        student = _campus(factory, total)
+        # The first read scores every pair and stores the rows; the second only reads them back
+        with count_sql() as first:
+            response = client.get(f"/matching/{student.id}")
+        assert response.status_code == 200
+        with count_sql() as second:
+            client.get(f"/matching/{student.id}")
+        counts.append((first.count, second.count))
+    assert counts == [(7, 3), (7, 3)]
+
+
+def _unpruned_ranking(db, opportunity, limit, min_score):
+    scored = [
+        (student_id, match["fit_score"])
+        for student_id, match in calculate_student_fit_scores(db, opportunity)
+        if match["fit_score"] >= min_score
+    ]
+    return sorted(scored, key=lambda pair: (-pair[1], pair[0]))[:limit]
+
+
+# Around 30 (no required skill, CGPA met) and 70 (every skill, CGPA missed) pruning kicks in
+@pytest.mark.parametrize("min_score", [0, 20, 23.33, 30, 30.01, 50, 70, 70.01, 100])
+def test_rank_students_equals_unpruned_ranking(factory, db, min_score):
+    opportunity = factory.opportunity(["Python", "Go", "Rust"], min_cgpa=7)
+    skill_sets = [{}, {"Python": 3}, {"Go": 2, "Rust": 5}, {"Python": 1, "Go": 1, "Rust": 1}, {"Java": 4}]
+    for i, skills in enumerate(skill_sets):
+        for cgpa in (6.5, 7, 9):
+            factory.student(cgpa=cgpa + i / 100, skills=skills)
+    factory.rebuild()
+
+    ranked = [(row["student_id"], row["fit_score"]) for row in rank_students(db, opportunity, 50, min_score)]
+    assert ranked == _unpruned_ranking(db, opportunity, 50, min_score)
+    assert rank_students(db, opportunity, 4, min_score) == rank_students(db, opportunity, 50, min_score)[:4]
+
+
+def _paged(client, url: str, limit: int) -> list:
+    """Every row of a listing, following X-Next-Cursor one page at a time."""
+    rows, cursor = [], None
+    separator = "&" if "?" in url else "?"
+    while True:
+        response = client.get(f"{url}{separator}limit={limit}" + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page) <= limit
+        rows += page
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return rows
+
+
+def _mixed_campus(factory, db):
+    student = _campus(factory, 23)
+    faculty = factory.faculty()
+    for i, skills in enumerate(REQUIREMENTS):
+        opportunity = factory.opportunity(skills, min_cgpa=[6, 8][i % 2])
+        opportunity.type, opportunity.is_internal = OpportunityType.project, True
+        opportunity.company_id, opportunity.faculty_id = None, faculty.id
+    db.commit()
+    return student
+
+
+@pytest.mark.parametrize("limit", [1, 4, 7])
+def test_keyset_pages_cover_every_match_once_in_order(client, factory, db, limit):
+    student = _mixed_campus(factory, db)
+    everything = client.get(f"/matching/{student.id}").json()
+
+    paged = _paged(client, f"/matching/{student.id}", limit)
+
+    assert paged == everything
+    keys = [(-row["fit_score"], row["opportunity_id"]) for row in paged]
+    assert keys == sorted(keys) and len(set(keys)) == len(keys) == 28
+    # Many opportunities share a score, so pages split runs of ties on opportunity_id
+    cuts = [(paged[i - 1]["fit_score"], paged[i]["fit_score"]) for i in range(limit, len(paged), limit)]
+    assert any(before == after for before, after in cuts)
+
+
+@pytest.mark.parametrize(
+    "filters, keep",
+    [
+        ("eligible_only=true", lambda row, opportunity: row["eligible"]),
+        ("type=project", lambda row, opportunity: opportunity.type == OpportunityType.project),
+        ("is_internal=false", lambda row, opportunity: not opportunity.is_internal),
+        ("is_internal=true&eligible_only=true", lambda row, opportunity: opportunity.is_internal and row["eligible"]),
+    ],
+)
+def test_filters_apply_to_every_page(client, factory, db, filters, keep):
+    student = _mixed_campus(factory, db)
+    opportunities = {opportunity.id: opportunity for opportunity in db.query(Opportunity)}
+    everything = client.get(f"/matching/{student.id}").json()
+
+    paged = _paged(client, f"/matching/{student.id}?{filters}", 3)
+
+    expected = [row for row in everything if keep(row, opportunities[row["opportunity_id"]])]
+    assert paged == expected and 0 < len(expected) < len(everything)
+
+
+def _token(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        _token({"fit_score": 50, "id": 1}),
+        _token([[50], 1]),
+        _token([50, {"id": 1}]),
+        _token(["50", 1]),
+        _token([50, 1.5]),
+        _token([50, True]),
+        _token([None, 1]),
+        _token([50, 2**64]),
+        base64.urlsafe_b64encode(b"[NaN, 1]").decode(),
+        _token([50]),
+        _token([50, 1, 2]),
+    ],
+)
+def test_crafted_cursors_are_rejected(client, factory, cursor):
+    student = factory.student()
+
+    assert client.get(f"/matching/{student.id}?limit=5&cursor={cursor}").status_code == 400
+
+
+@pytest.mark.parametrize("values", [[{"id": 1}], [[1]], [1.5], [True], ["1"], [1, 2]])
+def test_crafted_id_cursors_are_rejected(client, values):
+    assert client.get(f"/opportunity/all?limit=5&cursor={_token(values)}").status_code == 400
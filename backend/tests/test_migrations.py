@@ -0,0 +1,133 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, func, insert, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.migrations import LATEST_VERSION, check_schema_version, schema_version, upgrade
+from backend.services.search import DOC_OPPORTUNITY, DOC_STUDENT, search
+
+# The tables as the project first created them, before any migration existed
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY, email VARCHAR NOT NULL UNIQUE, password VARCHAR NOT NULL, role VARCHAR(7) NOT NULL
+);
+CREATE TABLE students (
+    id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL UNIQUE REFERENCES users (id), name VARCHAR NOT NULL,
+    branch VARCHAR NOT NULL, year INTEGER NOT NULL, cgpa FLOAT NOT NULL
+);
+CREATE TABLE companies (
+    id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL UNIQUE REFERENCES users (id), name VARCHAR NOT NULL,
+    description VARCHAR
+);
+CREATE TABLE skills (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL UNIQUE);
+CREATE TABLE student_skills (
+    id INTEGER PRIMARY KEY, student_id INTEGER NOT NULL REFERENCES students (id),
+    skill_id INTEGER NOT NULL REFERENCES skills (id), level INTEGER NOT NULL
+);
+CREATE TABLE opportunities (
+    id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, creator_name VARCHAR NOT NULL, type VARCHAR(10) NOT NULL,
+    min_cgpa FLOAT NOT NULL, company_id INTEGER REFERENCES companies (id), faculty_id INTEGER,
+    is_internal BOOLEAN NOT NULL
+);
+CREATE TABLE opportunity_skills (
+    id INTEGER PRIMARY KEY, opportunity_id INTEGER NOT NULL REFERENCES opportunities (id),
+    skill_id INTEGER NOT NULL REFERENCES skills (id)
+);
+INSERT INTO users VALUES (1, 'ada@test.example', 'x', 'student'), (2, 'acme@test.example', 'x', 'company');
+INSERT INTO students VALUES (1, 1, 'Ada', 'CSE', 3, 8.5);
+INSERT INTO companies VALUES (1, 2, 'Acme', NULL);
+INSERT INTO opportunities VALUES (1, 'Pastry intern', 'Acme', 'internship', 7.0, 1, NULL, 0);
+"""
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    """Engine on a database with the baseline schema and a few rows, never migrated."""
+    path = str(tmp_path / "baseline.db")
+    with sqlite3.connect(path) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+    bind = create_engine(f"sqlite:///{path}")
+    yield bind
+    bind.dispose()
+
+
+def _execute(bind, sql: str):
+    with bind.begin() as conn:
+        conn.exec_driver_sql(sql)
+
+
+def test_skill_keys_are_folded_in_python(baseline):
+    # lower() in SQLite only folds ASCII, so the old key index let both spellings in
+    _execute(baseline, "INSERT INTO skills VALUES (1, 'Éclair'), (2, 'éclair'), (3, 'Python')")
+    _execute(baseline, "INSERT INTO student_skills VALUES (1, 1, 2, 3)")
+    _execute(baseline, "INSERT INTO opportunity_skills VALUES (1, 1, 1)")
+
+    assert upgrade(baseline) == LATEST_VERSION
+
+    with baseline.begin() as conn:
+        assert conn.execute(select(models.Skill.id, models.Skill.name, models.Skill.name_key)).all() == [
+            (1, "Éclair", "éclair"),
+            (3, "Python", "python"),
+        ]
+        assert conn.execute(select(models.StudentSkill.skill_id)).scalars().all() == [1]
+        assert conn.execute(select(models.OpportunitySkill.skill_id)).scalars().all() == [1]
+    with pytest.raises(IntegrityError), baseline.begin() as conn:
+        conn.execute(insert(models.Skill).values(name="ÉCLAIR", name_key="éclair"))
+    assert "ux_skills_name_key" in {index["name"] for index in inspect(baseline).get_indexes("skills")}
+
+
+def test_baseline_database_upgrades_to_the_latest_schema(baseline):
+    assert upgrade(baseline) == LATEST_VERSION
+
+    tables = set(inspect(baseline).get_table_names())
+    assert {table.name for table in models.Base.metadata.sorted_tables} <= tables
+    assert {"projects", "certifications", "interests", "external_links"} <= {
+        column["name"] for column in inspect(baseline).get_columns("students")
+    }
+    # Rows that predate the search index were backfilled into it
+    with Session(baseline) as db:
+        assert search(db, DOC_OPPORTUNITY, "pastry", 10)[0][0] == 1
+        assert search(db, DOC_STUDENT, "ada", 10)[0][0] == 1
+    with baseline.connect() as conn:
+        versions = conn.execute(select(schema_version.c.version).order_by(schema_version.c.version)).scalars().all()
+    assert versions == list(range(1, LATEST_VERSION + 1))
+
+    # Nothing is pending, so a second run applies nothing
+    assert upgrade(baseline) == LATEST_VERSION
+    with baseline.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(schema_version)).scalar() == LATEST_VERSION
+
+
+def test_workers_refuse_an_outdated_schema(baseline):
+    with pytest.raises(RuntimeError, match="at version None"):
+        check_schema_version(baseline)
+
+    assert upgrade(baseline, target=LATEST_VERSION - 1) == LATEST_VERSION - 1
+    with pytest.raises(RuntimeError, match=f"at version {LATEST_VERSION - 1}, expected {LATEST_VERSION}"):
+        check_schema_version(baseline)
+
+    upgrade(baseline)
+    check_schema_version(baseline)
+
+
+def test_merged_skills_leave_one_link_per_student_and_opportunity(baseline):
+    _execute(baseline, "INSERT INTO skills VALUES (1, 'Python'), (2, 'python'), (3, 'PYTHON'), (4, 'Go')")
+    # Ada holds three spellings; the highest level survives on the lowest link
+    _execute(baseline, "INSERT INTO student_skills VALUES (1, 1, 2, 2), (2, 1, 3, 5), (3, 1, 1, 3), (4, 1, 4, 1)")
+    _execute(baseline, "INSERT INTO opportunity_skills VALUES (1, 1, 3), (2, 1, 1), (3, 1, 4)")
+
+    upgrade(baseline)
+
+    with baseline.connect() as conn:
+        links = conn.execute(
+            select(models.StudentSkill.id, models.StudentSkill.skill_id, models.StudentSkill.level)
+            .order_by(models.StudentSkill.id)
+        ).all()
+        assert links == [(1, 1, 5), (4, 4, 1)]
+        assert conn.execute(
+            select(models.OpportunitySkill.id, models.OpportunitySkill.skill_id).order_by(models.OpportunitySkill.id)
+        ).all() == [(1, 1), (3, 4)]
+        assert conn.execute(select(models.Skill.id).order_by(models.Skill.id)).scalars().all() == [1, 4]
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+
+from backend.models import Notification
+from backend.routes.notification import stream_notifications
+from backend.services.notification import create_notifications
+from backend.services.notification_bus import NotificationBus, notification_bus
+
+
+def _event(notification_id: int, user_id: int = 1) -> dict:
+    return {"id": notification_id, "user_id": user_id, "message": f"Update {notification_id}", "is_read": False}
+
+
+def _drain(subscriber) -> list:
+    events = []
+    while not subscriber.queue.empty():
+        event = subscriber.queue.get_nowait()
+        events.append(event and event["id"])
+    return events
+
+
+def test_published_events_reach_only_their_users_subscribers():
+    async def scenario():
+        bus = NotificationBus()
+        first, second, other = bus.subscribe(1), bus.subscribe(1), bus.subscribe(2)
+        # Commits publish from worker threads
+        publisher = threading.Thread(target=bus.publish, args=([_event(5), _event(4), _event(6, user_id=3)],))
+        publisher.start()
+        publisher.join()
+        await asyncio.sleep(0)
+        bus.unsubscribe(second)
+        bus.publish([_event(7)])
+        await asyncio.sleep(0)
+        return _drain(first), _drain(second), _drain(other)
+
+    assert asyncio.run(scenario()) == ([4, 5, 7], [4, 5], [])
+
+
+def test_a_subscriber_that_falls_behind_is_cut_off():
+    async def scenario():
+        bus = NotificationBus(queue_size=2)
+        subscriber = bus.subscribe(1)
+        bus.publish([_event(i) for i in range(1, 5)])
+        await asyncio.sleep(0)
+        return _drain(subscriber), subscriber.overflowed
+
+    # The backlog is dropped for the end-of-stream marker; the client resumes from its last id
+    assert asyncio.run(scenario()) == ([None], True)
+
+
+def test_history_answers_only_above_its_floor():
+    bus = NotificationBus(history_size=3, max_history_users=2)
+    bus.publish([_event(i) for i in (10, 11, 12)])
+
+    assert [event["id"] for event in bus.since(1, 10)] == [11, 12]
+    assert bus.since(1, 12) == []
+    # Nothing older than the first event published is known
+    assert [event["id"] for event in bus.since(1, 9)] == [10, 11, 12]
+    assert bus.since(1, 8) is None
+
+    bus.publish([_event(13), _event(14)])
+    assert bus.since(1, 10) is None
+    assert [event["id"] for event in bus.since(1, 11)] == [12, 13, 14]
+
+    # The least recently published user's history goes first
+    bus.publish([_event(20, user_id=2), _event(21, user_id=3)])
+    assert bus.since(1, 13) is None
+    assert [event["id"] for event in bus.since(3, 20)] == [21]
+
+    bus.clear()
+    assert bus.since(3, 20) is None
+
+
+class _Request:
+    """Stands in for the SSE request: connected for the first `checks` disconnect checks."""
+
+    def __init__(self, checks: int = 0):
+        self.checks = checks
+
+    async def is_disconnected(self) -> bool:
+        self.checks -= 1
+        return self.checks < 0
+
+
+def _stream(user_id: int, request: _Request, publish=(), **resume) -> list:
+    async def consume():
+        response = await stream_notifications(user_id, request, **{"last_id": None, "last_event_id": None, **resume})
+        received = []
+        async for chunk in response.body_iterator:
+            received.append(chunk)
+            if publish and len(received) == 1:
+                publish()
+        return received
+
+    return [int(chunk.split("\n")[0][len("id: "):]) for chunk in asyncio.run(consume())]
+
+
+def test_reconnect_replays_from_the_bus_without_the_database(factory, db, count_sql):
+    user_id = factory.student().user_id
+    create_notifications(db, [{"user_id": user_id, "message": f"Update {i}"} for i in range(4)])
+    ids = sorted(notification_id for (notification_id,) in db.query(Notification.id))
+
+    with count_sql() as sql:
+        assert _stream(user_id, _Request(), last_event_id=ids[1]) == ids[2:]
+    assert sql.count == 0
+    # The header wins over the query parameter
+    assert _stream(user_id, _Request(), last_event_id=ids[2], last_id=ids[0]) == ids[3:]
+    assert _stream(user_id, _Request(), last_id=ids[0]) == ids[1:]
+
+
+def test_reconnect_past_the_history_reads_the_database(factory, db, count_sql):
+    user_id = factory.student().user_id
+    # Written before this worker started, so the bus never saw them
+    db.add_all([Notification(user_id=user_id, message=f"Old {i}") for i in range(3)])
+    db.commit()
+    ids = sorted(notification_id for (notification_id,) in db.query(Notification.id))
+
+    with count_sql() as sql:
+        assert _stream(user_id, _Request(), last_event_id=ids[0]) == ids[1:]
+    assert sql.count > 0
+
+
+def test_live_events_after_the_replay_are_not_sent_twice(factory, db):
+    user_id = factory.student().user_id
+    create_notifications(db, [{"user_id": user_id, "message": f"Update {i}"} for i in range(3)])
+    ids = sorted(notification_id for (notification_id,) in db.query(Notification.id))
+
+    def publish_more():
+        # Arrives while the replay is being sent: one the replay covers, then a new one
+        notification_bus.publish([{**_event(ids[-1], user_id), "message": "Update 2"}])
+        create_notifications(db, [{"user_id": user_id, "message": "Live"}])
+
+    received = _stream(user_id, _Request(checks=2), publish=publish_more, last_event_id=ids[0])
+
+    assert received == ids[1:] + [ids[-1] + 1]
@@ -0,0 +1,122 @@
+import threading
+
+from sqlalchemy import func
+
+from backend.database import SessionLocal
+from backend.models import Notification, NotificationCounter
+from backend.services.notification import NotificationQueue, create_notifications
+
+THREADS = 8
+PER_THREAD = 50
+
+
+def _unread_by_user(db) -> dict:
+    return dict(
+        db.query(Notification.user_id, func.count())
+        .filter(Notification.is_read.is_(False))
+        .group_by(Notification.user_id)
+        .all()
+    )
+
+
+def _counters(db) -> dict:
+    return {counter.user_id: counter.unread for counter in db.query(NotificationCounter)}
+
+
+def _run_threads(target, count: int):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_enqueues_and_direct_writes_are_all_stored(factory, db):
+    user_ids = [factory.student().user_id for _ in range(3)]
+    writer = NotificationQueue(batch_size=32, flush_interval=0.01)
+    writer.start()
+
+    def produce(thread: int):
+        if thread % 2:
+            for i in range(PER_THREAD):
+                writer.enqueue(user_ids[i % len(user_ids)], f"queued {thread}-{i}")
+            return
+        session = SessionLocal()
+        try:
+            for i in range(PER_THREAD // 5):
+                item = {"user_id": user_ids[i % len(user_ids)], "message": f"direct {thread}-{i}"}
+                create_notifications(session, [item])
+        finally:
+            session.close()
+
+    _run_threads(produce, THREADS)
+    writer.stop()
+
+    messages = [message for (message,) in db.query(Notification.message)]
+    assert len(messages) == len(set(messages)) == THREADS // 2 * (PER_THREAD + PER_THREAD // 5)
+    assert _counters(db) == _unread_by_user(db)
+
+
+def test_a_failed_flush_is_retried_not_dropped(factory, db):
+    user_id = factory.student().user_id
+    failures = []
+
+    def flaky_session():
+        if not failures:
+            failures.append(True)
+            raise RuntimeError("database unavailable")
+        return SessionLocal()
+
+    writer = NotificationQueue(session_factory=flaky_session, flush_interval=0.01)
+    writer.start()
+    for i in range(5):
+        writer.enqueue(user_id, f"Update {i}")
+    writer.stop()
+
+    assert failures
+    assert sorted(message for (message,) in db.query(Notification.message)) == [f"Update {i}" for i in range(5)]
+    assert _counters(db) == {user_id: 5}
+
+
+def test_retries_hold_at_most_max_failed_notifications(factory, db):
+    user_id = factory.student().user_id
+
+    def unavailable():
+        raise RuntimeError("database unavailable")
+
+    writer = NotificationQueue(session_factory=unavailable, max_failed=3)
+    for i in range(5):
+        writer.enqueue(user_id, f"Update {i}")
+    assert db.query(Notification).count() == 0
+
+    writer.session_factory = SessionLocal
+    writer.enqueue(user_id, "Recovered")
+
+    # The oldest were dropped; the rest went out with the next write
+    messages = [message for (message,) in db.query(Notification.message).order_by(Notification.id)]
+    assert messages == ["Update 2", "Update 3", "Update 4", "Recovered"]
+
+
+def test_stop_reports_a_worker_still_flushing(factory, db):
+    user_id = factory.student().user_id
+    release = threading.Event()
+
+    def slow_session():
+        if threading.current_thread().name == "notification-writer":
+            release.wait()
+        return SessionLocal()
+
+    writer = NotificationQueue(session_factory=slow_session, flush_interval=0.01)
+    writer.start()
+    writer.enqueue(user_id, "Queued")
+
+    assert writer.stop(timeout=0.05) is False
+    assert writer.running
+    # While the worker finishes, new notifications are written directly
+    writer.enqueue(user_id, "Direct")
+    assert [message for (message,) in db.query(Notification.message)] == ["Direct"]
+
+    release.set()
+    assert writer.stop() is True
+    assert not writer.running
+    assert sorted(message for (message,) in db.query(Notification.message)) == ["Direct", "Queued"]
@@ -0,0 +1,68 @@
+from sqlalchemy import func
+
+from backend.models import Notification, NotificationCounter
+from backend.services.notification import create_notifications, mark_read, unread_count
+
+
+def _counter(db, user_id: int):
+    db.expire_all()
+    return db.get(NotificationCounter, user_id).unread
+
+
+def _actual_unread(db, user_id: int) -> int:
+    return db.query(func.count()).filter(Notification.user_id == user_id, Notification.is_read.is_(False)).scalar()
+
+
+def _notify(db, user_id: int, message: str) -> int:
+    """Write one notification; returns its id."""
+    create_notifications(db, [{"user_id": user_id, "message": message}])
+    return db.query(func.max(Notification.id)).scalar()
+
+
+def test_counter_follows_creates_and_mark_read(factory, db):
+    user_id = factory.student().user_id
+    create_notifications(db, [{"user_id": user_id, "message": f"Update {i}"} for i in range(3)])
+    assert _counter(db, user_id) == 3
+    last_id = _notify(db, user_id, "Latest")
+    assert _counter(db, user_id) == 4
+
+    assert mark_read(db, user_id, last_id - 1) == 3
+    assert _counter(db, user_id) == 1
+    # Reading the last unread notification takes the counter to zero
+    assert mark_read(db, user_id, last_id) == 1
+    assert _counter(db, user_id) == _actual_unread(db, user_id) == 0
+
+    _notify(db, user_id, "After zero")
+    assert _counter(db, user_id) == _actual_unread(db, user_id) == 1
+
+
+def test_missing_counter_is_seeded_from_the_table(factory, db):
+    user_id = factory.student().user_id
+    # Rows from before counters existed
+    db.add_all([Notification(user_id=user_id, message=f"Old {i}") for i in range(2)])
+    db.commit()
+
+    _notify(db, user_id, "New")
+    assert _counter(db, user_id) == 3
+
+
+def test_updates_do_not_count_rows_once_the_counter_exists(factory, db, count_sql):
+    user_id = factory.student().user_id
+    first_id = _notify(db, user_id, "First")
+
+    with count_sql() as sql:
+        _notify(db, user_id, "Second")
+        mark_read(db, user_id, first_id)
+    assert not [statement for statement in sql.statements if "count(" in statement.lower()]
+    assert _counter(db, user_id) == 1
+
+
+def test_mark_read_through_the_api(client, factory, db):
+    user_id = factory.student().user_id
+    create_notifications(db, [{"user_id": user_id, "message": f"Update {i}"} for i in range(2)])
+    newest = max(notification.id for notification in db.query(Notification))
+
+    assert client.get(f"/notifications/{user_id}/unread-count").json() == {"unread": 2}
+    assert client.post(f"/notifications/{user_id}/mark-read", params={"up_to_id": newest}).json() == {"unread": 0}
+    assert client.get(f"/notifications/{user_id}/unread-count").json() == {"unread": 0}
+    assert unread_count(db, user_id) == _actual_unread(db, user_id) == 0
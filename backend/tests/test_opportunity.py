@@ -0,0 +1,36 @@
+import pytest
+
+from backend.models import Opportunity
+from backend.utils.cursor import encode_cursor
+from backend.utils.response_cache import response_cache
+
+SKILLS = [["Python", "SQL"], ["Go"], [], ["Rust", "Docker", "Python"]]
+
+
+def _add_opportunities(factory, db, total: int):
+    company = factory.company()
+    for i in range(total - db.query(Opportunity).count()):
+        factory.opportunity(SKILLS[i % len(SKILLS)], company=company)
+
+
+def _statements(client, count_sql, url: str):
+    # Count a miss: a cached response would not read the catalog at all
+    response_cache.clear()
+    with count_sql() as sql:
+        response = client.get(url)
+    assert response.status_code == 200, response.text
+    return sql.count, len(response.json())
+
+
+@pytest.mark.parametrize("query", ["", "limit=5", "limit=20&cursor={cursor}", "skill=python&cgpa=9&limit=20"])
+def test_catalog_statements_do_not_grow_with_the_page(client, factory, db, count_sql, query):
+    counts = []
+    for total in (8, 48):
+        _add_opportunities(factory, db, total)
+        cursor = encode_cursor(db.query(Opportunity.id).order_by(Opportunity.id).first()[0])
+        counts.append(_statements(client, count_sql, "/opportunity/all?" + query.format(cursor=cursor)))
+
+    (small, small_rows), (large, large_rows) = counts
+    assert large_rows >= small_rows > 0
+    # Version lookup, the page and one selectin query per relationship level
+    assert small == large <= 4
@@ -0,0 +1,166 @@
+"""A cached response is never served after a write, whichever process makes it."""
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from backend import database
+from backend.database import engine
+from backend.migrations import main as migrations_main, upgrade
+from backend.utils.response_cache import response_cache
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _get(client, url: str, etag: str = None):
+    return client.get(url, headers={"If-None-Match": etag} if etag else {})
+
+
+def _bulk_import(kind: str, *rows: dict):
+    subprocess.run(
+        [sys.executable, "-m", "backend.services.bulk_import", kind, "-"],
+        input="".join(json.dumps(row) + "\n" for row in rows),
+        text=True,
+        cwd=_ROOT,
+        check=True,
+        capture_output=True,
+    )
+
+
+def _close_connections(client, db):
+    """Close every connection to the database file, which checkpoints the WAL into it."""
+    db.close()
+    engine.dispose()
+    if database.async_engine is not None:
+        client.portal.call(database.async_engine.dispose)
+
+
+def _replace_database(client, db, source: str = None):
+    """Swap the database file under the running app: a copy of source, or a newly migrated one."""
+    _close_connections(client, db)
+    path = engine.url.database
+    for suffix in ("", "-wal", "-shm"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path + suffix)
+    if source:
+        shutil.copyfile(source, path)
+    else:
+        upgrade()
+
+
+def test_matching_etag_returns_304(client, factory):
+    student = factory.student(skills={"Python": 3})
+    not_modified = response_cache.not_modified
+
+    first = _get(client, f"/student/{student.id}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert _get(client, f"/student/{student.id}", etag).status_code == 304
+    assert _get(client, f"/student/{student.id}", f'W/{etag}, "other"').status_code == 304
+    assert _get(client, f"/student/{student.id}", '"other"').status_code == 200
+    assert response_cache.not_modified == not_modified + 2
+
+
+def test_profile_writes_invalidate_the_student(client, factory):
+    student = factory.student(skills={"Python": 3})
+    factory.skills("Go")
+    url = f"/student/{student.id}"
+    etag = _get(client, url).headers["ETag"]
+
+    client.put(f"{url}/profile", json={"interests": ["Compilers"]})
+    response = _get(client, url, etag)
+    assert response.status_code == 200
+    assert response.json()["interests"] == ["Compilers"]
+    etag = response.headers["ETag"]
+
+    client.post("/student/add-skill", json={"student_id": student.id, "skill_name": "Rust", "level": 2})
+    response = _get(client, url, etag)
+    assert response.status_code == 200
+    assert sorted(response.json()["skills"]) == ["Python", "Rust"]
+    etag = response.headers["ETag"]
+
+    client.post(f"{url}/resume", files={"file": ("cv.txt", b"Shipped services in Go and Rust", "text/plain")})
+    response = _get(client, url, etag)
+    assert response.status_code == 200
+    assert sorted(response.json()["skills"]) == ["Go", "Python", "Rust"]
+
+
+def test_opportunity_create_invalidates_the_listing(client, factory):
+    company = factory.company()
+    etag = _get(client, "/opportunity/all").headers["ETag"]
+
+    client.post(
+        "/opportunity/create",
+        json={"title": "Intern", "creator_name": company.name, "type": "internship", "company_id": company.id},
+    )
+    response = _get(client, "/opportunity/all", etag)
+    assert response.status_code == 200
+    assert [opportunity["title"] for opportunity in response.json()] == ["Intern"]
+
+
+def test_writes_from_another_process_invalidate_the_cache(client, factory):
+    company = factory.company()
+    student = factory.student(skills={"Python": 3})
+    listing = _get(client, "/opportunity/all")
+    profile = _get(client, f"/student/{student.id}")
+    assert listing.json() == []
+
+    # The CLI importer, as a separate process next to the running server
+    _bulk_import(
+        "opportunities",
+        {"title": "Imported", "creator_name": company.name, "type": "internship", "company_id": company.id},
+    )
+    _bulk_import("student_skills", {"student_id": student.id, "skill_name": "Go", "level": 4})
+
+    response = _get(client, "/opportunity/all", listing.headers["ETag"])
+    assert response.status_code == 200
+    assert [opportunity["title"] for opportunity in response.json()] == ["Imported"]
+    response = _get(client, f"/student/{student.id}", profile.headers["ETag"])
+    assert response.status_code == 200
+    assert sorted(response.json()["skills"]) == ["Go", "Python"]
+
+
+def test_filtered_listings_are_cached_separately(client, factory):
+    company = factory.company()
+    factory.opportunity(["Python"], company=company, title="Python role")
+    factory.opportunity(["Rust"], company=company, title="Rust role")
+    hits = response_cache.hits
+
+    for _ in range(2):
+        assert [row["title"] for row in _get(client, "/opportunity/all?skill=Rust").json()] == ["Rust role"]
+        assert len(_get(client, "/opportunity/all").json()) == 2
+    assert response_cache.hits == hits + 2
+
+
+def test_a_recreated_database_does_not_revalidate_old_etags(client, factory, db):
+    student = factory.student(name="Ada")
+    etag = _get(client, f"/student/{student.id}").headers["ETag"]
+
+    _replace_database(client, db)
+    # The same id at the same version, in a database with a new epoch
+    assert factory.student(name="Grace").id == student.id
+
+    response = _get(client, f"/student/{student.id}", etag)
+    assert response.status_code == 200
+    assert response.json()["name"] == "Grace"
+
+
+def test_a_new_epoch_after_a_restore_invalidates_later_etags(client, factory, db, tmp_path):
+    student = factory.student()
+    url = f"/student/{student.id}"
+    _close_connections(client, db)
+    backup = str(tmp_path / "backup.db")
+    shutil.copyfile(engine.url.database, backup)
+    assert client.put(f"{url}/profile", json={"interests": ["Compilers"]}).status_code == 200
+    etag = _get(client, url).headers["ETag"]
+
+    _replace_database(client, db, backup)
+    migrations_main(["--new-cache-epoch"])
+    # Back at the version the ETag was issued for, with other content
+    assert client.put(f"{url}/profile", json={"interests": ["Gardening"]}).status_code == 200
+
+    response = _get(client, url, etag)
+    assert response.status_code == 200
+    assert response.json()["interests"] == ["Gardening"]
@@ -0,0 +1,151 @@
+import io
+import os
+import subprocess
+import sys
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.models import StudentSkill
+from backend.services import resume_parser
+from backend.services.resume_parser import MAX_RESUME_BYTES, ResumeRejected, extract_text, parse_resumes
+from backend.services.skill_automaton import SkillAutomaton
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _docx(*paragraphs: str) -> bytes:
+    body = "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", f'<w:document xmlns:w="{_W}"><w:body>{body}</w:body></w:document>')
+    return buffer.getvalue()
+
+
+def test_text_is_extracted_per_format():
+    assert extract_text("cv.txt", "Go and Rust".encode()) == "Go and Rust"
+    assert extract_text("CV.MD", b"# Python") == "# Python"
+    assert extract_text("cv.docx", _docx("Go developer", "Rust")) == "Go developer\nRust"
+
+
+@pytest.mark.parametrize(
+    "filename, data",
+    [("cv.exe", b"MZ"), ("cv", b"text"), ("cv.docx", b"not a zip"), ("cv.pdf", b"%PDF-garbage")],
+)
+def test_unreadable_files_are_rejected(filename, data):
+    with pytest.raises(ResumeRejected):
+        extract_text(filename, data)
+
+
+def test_docx_zip_bomb_is_rejected_before_inflating(monkeypatch):
+    monkeypatch.setattr(resume_parser, "MAX_DOCX_XML_BYTES", 64 * 1024)
+    bomb = _docx("0" * 1024 * 1024)
+    assert len(bomb) < 8 * 1024
+
+    with pytest.raises(ResumeRejected, match="larger than"):
+        extract_text("cv.docx", bomb)
+
+
+def test_docx_size_header_is_not_trusted(monkeypatch):
+    monkeypatch.setattr(resume_parser, "MAX_DOCX_XML_BYTES", 64 * 1024)
+    # Declares a tiny document.xml but inflates to 1 MiB
+    original = zipfile.ZipFile.getinfo
+
+    def lying_getinfo(archive, name):
+        info = original(archive, name)
+        info.file_size = 10
+        return info
+
+    monkeypatch.setattr(zipfile.ZipFile, "getinfo", lying_getinfo)
+    with pytest.raises(ResumeRejected):
+        extract_text("cv.docx", _docx("0" * 1024 * 1024))
+
+
+def test_skills_match_on_word_boundaries():
+    automaton = SkillAutomaton(
+        [(1, "Java"), (2, "JavaScript"), (3, "C"), (4, "C++"), (5, "Go"), (6, "Machine Learning")]
+    )
+
+    assert automaton.find("JavaScript and C++ with some go-lang and machine\n  learning") == [2, 4, 5, 6]
+    assert automaton.find("Java, C and Google") == [1, 3]
+    assert automaton.find("Django; cobol") == []
+
+
+def test_batches_are_parsed_in_order_with_rejections():
+    automaton = SkillAutomaton([(1, "Go"), (2, "Rust")])
+
+    results = parse_resumes([("a.txt", b"Rust"), ("b.exe", b""), ("c.docx", _docx("Go, Rust"))], automaton)
+    assert results[0] == [2]
+    assert isinstance(results[1], ResumeRejected)
+    assert results[2] == [1, 2]
+
+
+def test_upload_adds_the_skills_the_student_lacks(client, factory, db):
+    student = factory.student(skills={"Go": 4})
+    factory.skills("Rust", "Java")
+
+    resume = _docx("Go and Rust, JavaScript")
+    response = client.post(f"/student/{student.id}/resume", files={"file": ("cv.docx", resume, "application/zip")})
+    assert response.status_code == 200
+    assert response.json() == {"student_id": student.id, "skills_found": ["Go", "Rust"], "skills_added": ["Rust"]}
+    levels = {row.skill.name: row.level for row in db.query(StudentSkill).filter_by(student_id=student.id)}
+    assert levels == {"Go": 4, "Rust": resume_parser.EXTRACTED_SKILL_LEVEL}
+
+
+def test_upload_rejections(client, factory):
+    student = factory.student()
+    url = f"/student/{student.id}/resume"
+
+    assert client.post("/student/999999/resume", files={"file": ("cv.txt", b"Go")}).status_code == 404
+    assert client.post(url, files={"file": ("cv.exe", b"MZ")}).status_code == 415
+    assert client.post(url, files={"file": ("cv.docx", b"not a zip")}).status_code == 415
+    assert client.post(url, data={"other": "field"}).status_code == 400
+    oversized = b"x" * (MAX_RESUME_BYTES + 1)
+    assert client.post(url, files={"file": ("cv.txt", oversized)}).status_code == 413
+
+
+def test_oversized_upload_without_content_length_is_cut_off(client, factory):
+    student = factory.student()
+    boundary = "resume-boundary"
+
+    def body():
+        yield f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="cv.txt"\r\n\r\n'.encode()
+        for _ in range(MAX_RESUME_BYTES // (1024 * 1024) + 2):
+            yield b"x" * 1024 * 1024
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        f"/student/{student.id}/resume",
+        content=body(),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+    assert response.status_code == 413
+
+
+def test_app_shutdown_stops_the_extraction_pool(factory):
+    student = factory.student()
+    with TestClient(app) as client:
+        assert client.post(f"/student/{student.id}/resume", files={"file": ("cv.txt", b"Go")}).status_code == 200
+        assert resume_parser._extract_pool is not None
+    assert resume_parser._extract_pool is None
+
+
+def test_cli_ingestion_invalidates_cached_profiles(client, factory, tmp_path):
+    student = factory.student(skills={"Python": 3})
+    factory.skills("Go")
+    profile = client.get(f"/student/{student.id}")
+    (tmp_path / f"{student.id}.txt").write_text("Wrote services in Go")
+
+    subprocess.run(
+        [sys.executable, "-m", "backend.services.resume_parser", str(tmp_path)],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+    )
+
+    response = client.get(f"/student/{student.id}", headers={"If-None-Match": profile.headers["ETag"]})
+    assert response.status_code == 200
+    assert sorted(response.json()["skills"]) == ["Go", "Python"]
@@ -0,0 +1,107 @@
+import pytest
+
+from backend.models import SearchTerm
+from backend.services import search
+from backend.utils.cursor import NEXT_CURSOR_HEADER
+
+ADA = {
+    "email": "ada@search.example",
+    "password": "secret",
+    "role": "student",
+    "name": "Ada Lovelace",
+    "branch": "CSE",
+    "year": 3,
+    "cgpa": 9.1,
+}
+
+
+@pytest.fixture(params=["fts", "terms"])
+def index(request, monkeypatch):
+    """Each test runs on the FTS5 tables and on the search_terms fallback."""
+    if request.param == "terms":
+        monkeypatch.setattr(search, "uses_fts", lambda db: False)
+    return request.param
+
+
+def _create(client, company, title: str, *skills: str) -> int:
+    payload = {
+        "title": title,
+        "creator_name": company.name,
+        "type": "internship",
+        "required_skills": list(skills),
+        "company_id": company.id,
+    }
+    response = client.post("/opportunity/create", json=payload)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def _search(client, kind: str, q: str, **params) -> list:
+    response = client.get(f"/search/{kind}", params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _ids(client, kind: str, q: str) -> list:
+    return [row["id"] for row in _search(client, kind, q)]
+
+
+def test_created_opportunities_are_found_best_match_first(client, factory, db, index):
+    company = factory.company()
+    titled = _create(client, company, "Python developer", "Docker")
+    skilled = _create(client, company, "Backend intern", "Python")
+    cafe = _create(client, company, "Café barista", "Latte art")
+
+    # A title match outranks a skill match
+    assert _ids(client, "opportunities", "python") == [titled, skilled]
+    # The last word matches as a prefix, the others in full
+    assert _ids(client, "opportunities", "pyth") == [titled, skilled]
+    assert _ids(client, "opportunities", "python dock") == [titled]
+    assert _ids(client, "opportunities", "pyth docker") == []
+    assert _ids(client, "opportunities", "CAFE lat") == [cafe]
+    assert _ids(client, "opportunities", "!!!") == []
+    # Only the fallback writes search_terms
+    assert (db.query(SearchTerm).count() > 0) == (index == "terms")
+
+
+def test_results_page_by_score_then_id(client, factory, index):
+    company = factory.company()
+    ids = [_create(client, company, title) for title in ("Rust", "Rust tools", "Rust", "Embedded Rust tools", "Rust")]
+
+    everything = _search(client, "opportunities", "rust", limit=100)
+
+    assert sorted(row["id"] for row in everything) == ids
+    keys = [(-row["score"], row["id"]) for row in everything]
+    assert keys == sorted(keys)
+    assert len({row["score"] for row in everything}) < len(everything)
+    pages, cursor = [], None
+    while True:
+        response = client.get(
+            "/search/opportunities", params={"q": "rust", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        )
+        pages += response.json()
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+    assert pages == everything
+    assert client.get("/search/opportunities", params={"q": "rust", "cursor": "garbage"}).status_code == 400
+
+
+def test_student_documents_follow_registration_profile_and_skills(client, index):
+    assert client.post("/register", json=ADA).status_code == 200
+    (student_id,) = _ids(client, "students", "lovelace")
+
+    profile = {"interests": ["Robotics"], "projects": [{"title": "Rover", "tech_stack": ["ROS"]}]}
+    assert client.put(f"/student/{student_id}/profile", json=profile).status_code == 200
+    assert _ids(client, "students", "robotics") == [student_id]
+    assert _ids(client, "students", "ada rover") == [student_id]
+
+    assert client.put(f"/student/{student_id}/profile", json={"interests": ["Gardening"]}).status_code == 200
+    assert _ids(client, "students", "robotics") == []
+    assert _ids(client, "students", "garden") == [student_id]
+    assert _ids(client, "students", "rover") == [student_id]
+
+    payload = {"student_id": student_id, "skill_name": "Kubernetes", "level": 3}
+    assert client.post("/student/add-skill", json=payload).status_code == 200
+    (hit,) = _search(client, "students", "kube")
+    assert (hit["id"], hit["name"], hit["skills"]) == (student_id, "Ada Lovelace", ["Kubernetes"])
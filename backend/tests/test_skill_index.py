@@ -0,0 +1,60 @@
+"""The skill index only sees this process's writes; rows written elsewhere must not be missed."""
+from backend.models import FitScore
+from backend.services.matching_engine import calculate_fit_score, calculate_fit_scores, rank_students
+from backend.services.skill_index import skill_index
+
+
+def test_opportunity_written_by_another_process_is_scored_from_the_database(client, factory, db):
+    student = factory.student(cgpa=8, skills={"Python": 4})
+    factory.skills("Rust", "Go")
+    factory.rebuild()
+    # Like `python -m backend.services.bulk_import opportunities` next to a running server
+    opportunity = factory.opportunity(["Rust", "Go"], min_cgpa=7)
+    assert skill_index.required_skill_names([opportunity.id]) == {}
+
+    assert calculate_fit_score(db, student, opportunity)["fit_score"] == 30
+    assert calculate_fit_scores(db, student, [opportunity])[0]["fit_score"] == 30
+    assert [row["fit_score"] for row in rank_students(db, opportunity)] == [30]
+
+    response = client.get(f"/matching/{student.id}")
+    assert [(row["opportunity_id"], row["fit_score"]) for row in response.json()] == [(opportunity.id, 30)]
+    assert db.get(FitScore, (student.id, opportunity.id)).fit_score == 30
+
+
+def test_index_answers_for_known_opportunities_only(factory):
+    python_only = factory.opportunity(["Python"])
+    no_skills = factory.opportunity([])
+    factory.rebuild()
+    unknown = factory.opportunity(["Python"])
+
+    assert skill_index.required_skill_names([python_only.id, no_skills.id, unknown.id]) == {
+        python_only.id: ["python"],
+        no_skills.id: [],
+    }
+
+
+def test_team_formation_sees_students_written_by_another_process(client, factory):
+    faculty = factory.faculty()
+    factory.student(skills={"Python": 2})
+    factory.rebuild()
+    imported = factory.student(skills={"Python": 5})
+
+    response = client.post(
+        "/team/auto-generate",
+        json={
+            "faculty_id": faculty.id,
+            "title": "Compiler",
+            "required_roles": [{"role": "Backend", "skill_name": "Python"}],
+        },
+    )
+    assert response.status_code == 200
+    assert [member["student_id"] for member in response.json()["team"]] == [imported.id]
+
+
+def test_consistency_check_reports_rows_written_elsewhere(factory, db):
+    factory.opportunity(["Python"])
+    factory.rebuild()
+    assert skill_index.check_consistency(db) == []
+
+    factory.opportunity(["Python"])
+    assert len(skill_index.check_consistency(db)) == 1
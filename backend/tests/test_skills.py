@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import insert
+
+from backend.models import Skill
+from backend.services.skill_lexicon import skill_lexicon
+from backend.services.skills import resolve_skill, resolve_skills, skill_cache
+
+
+@pytest.mark.parametrize(
+    "existing, typed",
+    [("Flask", "Flash"), ("MySQL", "MSSQL"), ("Swift", "Shift"), ("Scala", "Scale"), ("Redis", "Regis")],
+)
+def test_close_spellings_stay_distinct_skills(factory, db, existing, typed):
+    skill = factory.skills(existing)[0]
+
+    resolved = resolve_skill(db, typed)
+    assert resolved.id != skill.id
+    assert resolved.name == typed
+
+
+@pytest.mark.parametrize(
+    "existing, typed",
+    [("JavaScript", "javascript"), ("Node.js", "Node JS"), ("Node.js", "nodejs"), ("JavaScript", "js"), ("C++", "cpp")],
+)
+def test_case_punctuation_and_aliases_resolve_to_the_skill(factory, db, existing, typed):
+    skill = factory.skills(existing)[0]
+
+    assert resolve_skill(db, typed) == skill
+
+
+def test_ambiguous_abbreviation_is_not_aliased(factory, db):
+    tensorflow, terraform = factory.skills("TensorFlow", "Terraform")
+
+    assert resolve_skill(db, "tf").id not in (tensorflow.id, terraform.id)
+
+
+def test_alias_rows_resolve_on_write(client, factory, db):
+    terraform = factory.skills("Terraform")[0]
+    response = client.post("/skills/aliases", json={"alias": "tf", "skill_name": "terraform"})
+    assert response.status_code == 200
+
+    assert resolve_skill(db, "TF") == terraform
+
+
+def test_suggestions_still_tolerate_typos(client, factory):
+    factory.skills("Python", "Flask")
+
+    assert "Python" in [skill["name"] for skill in client.get("/skills/suggest", params={"q": "Pyhton"}).json()]
+    assert skill_lexicon.suggest("Flas")[0][1] == "Flask"
+
+
+@pytest.mark.parametrize("typed", ["Éclair", "éclair", "ÉCLAIR"])
+def test_non_ascii_skill_written_by_another_process_resolves(db, typed):
+    # Not in this process's cache or lexicon, as if another worker had created it
+    db.execute(insert(Skill).values(name="Éclair", name_key="éclair"))
+    db.commit()
+
+    assert resolve_skill(db, typed).name == "Éclair"
+    assert db.query(Skill).count() == 1
+
+
+def test_non_ascii_skills_through_the_api(client, factory):
+    student = factory.student()
+    company = factory.company()
+
+    response = client.post("/student/add-skill", json={"student_id": student.id, "skill_name": "Ñandú", "level": 3})
+    assert response.status_code == 200
+    response = client.post(
+        "/opportunity/create",
+        json={
+            "title": "Field guide",
+            "creator_name": company.name,
+            "type": "project",
+            "required_skills": ["ÑANDÚ"],
+            "company_id": company.id,
+        },
+    )
+    assert response.status_code == 200
+    catalog = client.get("/opportunity/all", params={"skill": "ñandú"}).json()
+    assert [row["title"] for row in catalog] == ["Field guide"]
+    assert client.get(f"/matching/{student.id}").json()[0]["fit_score"] == 100
+
+
+@pytest.mark.parametrize("existing", [0, 8, 15])
+def test_fifteen_skills_resolve_in_at_most_two_statements(factory, db, count_sql, existing):
+    names = [f"Tool {i}" for i in range(15)]
+    # Written by another process, so neither cached nor in the lexicon
+    if existing:
+        db.execute(insert(Skill), [{"name": name, "name_key": name.lower()} for name in names[:existing]])
+        db.commit()
+    skill_cache.invalidate()
+
+    with count_sql() as sql:
+        skills = resolve_skills(db, [name.upper() for name in names])
+    db.commit()
+    assert [skill.name for skill in skills] == names[:existing] + [name.upper() for name in names[existing:]]
+    # One SELECT for the cache misses, one INSERT for the names no row matched
+    assert sql.count == 1 + (existing < 15) <= 2
+
+    with count_sql() as sql:
+        resolve_skills(db, names)
+    assert sql.count == 0
@@ -0,0 +1,122 @@
+import itertools
+import random
+
+import pytest
+
+from backend.models import Team
+from backend.services.assignment import min_cost_assignment
+from backend.services.team_engine import Candidate, _assign_optimal
+
+
+def _project(faculty, title: str, *skills: str) -> dict:
+    return {
+        "faculty_id": faculty.id,
+        "title": title,
+        "required_roles": [{"role": f"{skill} {i}", "skill_name": skill} for i, skill in enumerate(skills)],
+    }
+
+
+def _batch(client, *projects: dict, **options):
+    response = client.post("/team/auto-generate/batch", json={"projects": list(projects), **options})
+    assert response.status_code == 200, response.text
+    return response.json()["projects"]
+
+
+def _members(result: dict) -> list:
+    return [member["student_id"] for member in result["team"]]
+
+
+def test_batch_drafts_round_robin_weakest_team_first(client, factory):
+    faculty = factory.faculty()
+    ids = {level: factory.student(skills={"Python": level}).id for level in (5, 4, 3, 2)}
+
+    first, second = _batch(
+        client, _project(faculty, "A", "Python", "Python"), _project(faculty, "B", "Python", "Python")
+    )
+
+    # B picks first in round two, having drafted the weaker student in round one
+    assert _members(first) == [ids[5], ids[2]]
+    assert _members(second) == [ids[4], ids[3]]
+
+
+def test_students_join_at_most_max_projects(client, factory, db):
+    faculty = factory.faculty()
+    star = factory.student(skills={"Python": 5, "Go": 5}).id
+    python = factory.student(skills={"Python": 2}).id
+    go = factory.student(skills={"Go": 2}).id
+    projects = [_project(faculty, "A", "Python"), _project(faculty, "B", "Go"), _project(faculty, "C", "Python", "Go")]
+
+    capped = _batch(client, *projects)
+    assert [_members(result) for result in capped] == [[star], [go], [python]]
+
+    shared = _batch(client, *projects, max_projects_per_student=2)
+    assert [_members(result) for result in shared] == [[star], [star], [python, go]]
+    # A student fills at most one role per project
+    assert db.query(Team).filter(Team.project_id == shared[2]["project_id"]).count() == 2
+
+    response = client.post("/team/auto-generate/batch", json={"projects": projects, "max_projects_per_student": 0})
+    assert response.status_code == 422
+
+
+def test_batch_rejects_a_per_project_mode(client, factory):
+    faculty = factory.faculty()
+    factory.student(skills={"Python": 3})
+
+    response = client.post(
+        "/team/auto-generate/batch",
+        json={"projects": [{**_project(faculty, "A", "Python"), "mode": "greedy"}]},
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "projects", 0, "mode"]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_min_cost_assignment_matches_brute_force(seed):
+    rng = random.Random(seed)
+    rows = rng.randint(1, 5)
+    columns = rng.randint(rows, 6)
+    cost = [[rng.choice([rng.randint(-9, 9), rng.uniform(-9, 9)]) for _ in range(columns)] for _ in range(rows)]
+
+    assignment = min_cost_assignment(cost)
+
+    assert len(set(assignment)) == rows
+    best = min(sum(cost[i][j] for i, j in enumerate(pick)) for pick in itertools.permutations(range(columns), rows))
+    assert sum(cost[i][j] for i, j in enumerate(assignment)) == pytest.approx(best)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_optimal_team_matches_brute_force(seed):
+    rng = random.Random(seed)
+    skills = list(range(1, rng.randint(2, 4) + 1))
+    candidates = {
+        student_id: Candidate(student_id, f"Student {student_id}", student_id, rng.choice([6.0, 7.5, 8.0, 9.5]))
+        for student_id in range(1, rng.randint(1, 6) + 1)
+    }
+    holders = {skill_id: [] for skill_id in skills}
+    for student_id in candidates:
+        for skill_id in rng.sample(skills, rng.randint(0, len(skills))):
+            holders[skill_id].append((rng.randint(1, 5), student_id))
+    roles = [rng.choice(skills) for _ in range(rng.randint(1, 4))]
+    levels = {(skill_id, student_id): level for skill_id, pairs in holders.items() for level, student_id in pairs}
+
+    def totals(assignment):
+        picked = [(skill_id, student_id) for skill_id, student_id in zip(roles, assignment) if student_id is not None]
+        return sum(levels[pair] for pair in picked), sum(candidates[student_id].cgpa for _, student_id in picked)
+
+    assignment = _assign_optimal(roles, holders, candidates)
+
+    chosen = [student_id for student_id in assignment if student_id is not None]
+    assert len(set(chosen)) == len(chosen)
+    assert all(
+        student_id is None or (skill_id, student_id) in levels for skill_id, student_id in zip(roles, assignment)
+    )
+    options = [[None] + [student_id for _, student_id in holders[skill_id]] for skill_id in roles]
+    best = max(
+        totals(pick)
+        for pick in itertools.product(*options)
+        if len({student_id for student_id in pick if student_id}) == sum(student_id is not None for student_id in pick)
+    )
+    level, cgpa = totals(assignment)
+    assert level == best[0]
+    assert cgpa == pytest.approx(best[1])
@@ -0,0 +1,40 @@
+import base64
+import json
+import math
+from typing import Optional
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# JSON values accepted per sort key type; bool is an int subclass but never a key
+_ACCEPTED = {int: (int,), float: (int, float)}
+# Beyond this SQLite cannot bind an integer
+_MAX_INT = 2**63 - 1
+
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset cursor token for the sort key of the last row on a page."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _valid(value, kind: type) -> bool:
+    if isinstance(value, bool) or not isinstance(value, _ACCEPTED[kind]):
+        return False
+    return math.isfinite(value) if isinstance(value, float) else abs(value) <= _MAX_INT
+
+
+def decode_cursor(token: Optional[str], *types: type) -> Optional[tuple]:
+    """Sort key of a cursor from encode_cursor; `types` are its values' types (int or float)."""
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not all(_valid(value, kind) for value, kind in zip(values, types)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(values)
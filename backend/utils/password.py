@@ -1,6 +1,27 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# min/max pinned to the configured cost so hashes at any other cost are rehashed on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small thread pool hashes in parallel without blocking the event loop
+_hash_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2))),
+    thread_name_prefix="bcrypt",
+)
 
 
 def hash_password(password: str) -> str:
@@ -10,3 +31,51 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also returns a new hash when the stored one uses an outdated cost."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def hash_passwords(passwords: Iterable[str]) -> List[str]:
+    """Hash many passwords in parallel on the hash pool, preserving order."""
+    return list(_hash_pool.map(hash_password, passwords))
+
+
+def is_password_hash(value: str) -> bool:
+    """Whether value is a hash this context can verify (e.g. exported from another system)."""
+    return pwd_context.identify(value) is not None
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_hash_pool, hash_password, password)
+
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_pool, verify_and_update, plain_password, hashed_password
+    )
+
+
+def measure_hash_seconds(rounds: int = BCRYPT_ROUNDS, samples: int = 3) -> float:
+    """Median wall time of one bcrypt hash at the given cost on this machine."""
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate_rounds(target_seconds: float = 0.25, min_rounds: int = 10, max_rounds: int = 15) -> int:
+    """Highest bcrypt cost whose hash time stays within target_seconds."""
+    rounds = min_rounds
+    while rounds < max_rounds and measure_hash_seconds(rounds + 1) <= target_seconds:
+        rounds += 1
+    return rounds
+
+
+if __name__ == "__main__":
+    print(f"BCRYPT_ROUNDS={BCRYPT_ROUNDS}: {measure_hash_seconds() * 1000:.0f} ms per hash")
+    print(f"Suggested BCRYPT_ROUNDS for a 250 ms budget: {calibrate_rounds()}")
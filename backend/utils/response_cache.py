@@ -0,0 +1,211 @@
+"""
+ETag revalidation and an in-process cache of rendered JSON responses.
+
+Every cached resource belongs to an entity, e.g. ("student", 5) or ("opportunities",),
+whose version counter lives in the cache_versions table. Write paths bump it with
+invalidate() inside their own transaction, so the bump commits together with the
+change, whichever worker or CLI process makes it. A response's ETag is derived from its
+key, that version and the database's epoch, so a request whose If-None-Match still
+matches gets a 304 after a single primary-key lookup, and the rendered bytes are kept in
+a per-process LRU bounded by their total size. Only successful responses are cached, so creating an entity needs
+no invalidation unless it shows up in a cached collection.
+
+The version is read before the response is built: a write committing meanwhile bumps
+it, so whatever was built is never served under the newer version.
+
+The epoch is a random value drawn when the database is created (migration 10). A
+recreated database starts its versions over under a new epoch, so ETags issued for
+the old one never match; after restoring a backup, draw a new one with
+`python -m backend.migrations --new-cache-epoch`.
+"""
+import hashlib
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from ..database import dialect_insert, run_db
+from ..models import CacheVersion
+
+RESPONSE_CACHE_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# Clients must revalidate, which is a 304 while the entity is unchanged
+CACHE_CONTROL = "no-cache"
+
+# The cache_versions row holding the database's epoch; entity keys never start with "_"
+EPOCH_ENTITY = "_epoch"
+
+# (database epoch, entity version)
+Version = Tuple[int, int]
+
+
+class _Entry(NamedTuple):
+    version: Version
+    etag: str
+    body: bytes
+    headers: Dict[str, str]
+
+
+def _entity_key(entity: Tuple) -> str:
+    return ":".join(map(str, entity))
+
+
+def read_version(db: Session, entity: Tuple) -> Version:
+    key = _entity_key(entity)
+    versions = dict(
+        db.query(CacheVersion.entity, CacheVersion.version).filter(CacheVersion.entity.in_([EPOCH_ENTITY, key]))
+    )
+    return versions.get(EPOCH_ENTITY, 0), versions.get(key, 0)
+
+
+def new_epoch(db: Session) -> int:
+    """Draw a new epoch for the database in db's transaction, so no earlier ETag matches."""
+    epoch = secrets.randbits(31)
+    stmt = dialect_insert(db, CacheVersion).values(entity=EPOCH_ENTITY, version=epoch)
+    db.execute(stmt.on_conflict_do_update(index_elements=[CacheVersion.entity], set_={"version": epoch}))
+    return epoch
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def invalidate(db: Session, *entities: Tuple):
+        """Bump the entities' versions in db's transaction; call before the write commits.
+
+        Runs whether or not this process caches, since other workers may.
+        """
+        if not entities:
+            return
+        stmt = dialect_insert(db, CacheVersion).values(
+            [{"entity": key, "version": 1} for key in sorted({_entity_key(entity) for entity in entities})]
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[CacheVersion.entity],
+                set_={"version": CacheVersion.version + 1},
+            )
+        )
+
+    def etag(self, key: Hashable, version: Version) -> str:
+        digest = hashlib.blake2b(f"{key!r}|{version}".encode(), digest_size=12).hexdigest()
+        return f'"{digest}"'
+
+    def get(self, key: Hashable, version: Version) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version != version:
+                self._size -= len(entry.body)
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, entry: _Entry):
+        size = len(entry.body)
+        # One huge response should not flush everything else
+        if size > self.max_bytes // 4:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old.body)
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+        }
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_BYTES)
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as If-None-Match requires
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+async def cached_json(
+    request: Request,
+    db: Session,
+    entity: Tuple,
+    load: Callable[[], Awaitable[Any]],
+    variant: Hashable = (),
+    headers: Optional[Callable[[Any], Dict[str, str]]] = None,
+):
+    """Serve load()'s result as JSON through the response cache.
+
+    variant tells apart responses of one entity, e.g. the query of a filtered list;
+    headers(result) adds response headers, which are cached along with the body.
+    """
+    if not response_cache.enabled:
+        result = await load()
+        return result if headers is None else JSONResponse(jsonable_encoder(result), headers=headers(result))
+
+    key = (entity, variant)
+    version = await run_db(db, read_version, entity)
+    etag = response_cache.etag(key, version)
+    if _matches(request.headers.get("if-none-match"), etag):
+        response_cache.not_modified += 1
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+    entry = response_cache.get(key, version)
+    if entry is None:
+        result = await load()
+        entry = _Entry(
+            version=version,
+            etag=etag,
+            body=JSONResponse(jsonable_encoder(result)).body,
+            headers=headers(result) if headers is not None else {},
+        )
+        response_cache.put(key, entry)
+    return Response(
+        content=entry.body,
+        media_type="application/json",
+        headers={**entry.headers, "ETag": entry.etag, "Cache-Control": CACHE_CONTROL},
+    )